@@ -1,34 +1,88 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 
-from src.database.connect import Database
+from src.database.connect import AsyncDatabase, Database, PoolTimeoutError
+from src.database.redis_pool import RedisPool
+from src.workers.redis_queue import RedisQueue
+from src.sql_query.sql_pagination import InvalidCursorError, NEXT_CURSOR_HEADER
 from src.api.api_user import router as api_user
-from src.api.api_auth import router as api_auth
+from src.api.api_auth import router as api_auth, reload_jwt_keys
+from src.services.sv_auth import password_verifier
+from src.services.sv_image import image_pipeline
+from src.services.sv_last_viewed import last_viewed_buffer
 from src.api.api_memo import router as api_memo
 from src.api.api_tab import router as api_tab
 from src.api.api_bookmark import router as api_bookmark
 from src.api.api_tag import router as api_tag
 from src.api.api_todo import router as api_todo
 from src.api.api_notification import router as api_notification
+from src.api.api_search import router as api_search
 
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import os
+import signal
 import uvicorn
 
 load_dotenv()
 
+
+def reload_config(signum, frame):
+    # `kill -HUP <pid>` re-reads .env and rebuilds JWT key material
+    load_dotenv(override=True)
+    reload_jwt_keys()
+    print("Reloaded JWT key material")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, reload_config)
+
+    # One Redis pool for the whole process, injected via get_redis_queue
+    app.state.redis_pool = RedisPool()
+    app.state.redis_queue = RedisQueue(client=app.state.redis_pool.client)
+    try:
+        yield
+    finally:
+        app.state.redis_pool.close()
+        # Flush buffered bookmark views while the pool is still open
+        last_viewed_buffer.shutdown()
+        db_con.close()
+        await AsyncDatabase().close()
+        password_verifier.shutdown()
+        image_pipeline.shutdown()
+
+
 app = FastAPI(
     title="AxionSync API",
     description="AxionSync Backend API",
     version="1.0.0",
     docs_url=None,  # Disable default docs
     redoc_url=None,  # Disable default redoc
+    lifespan=lifespan,
 )
 
 db_con = Database()
 
-load_dotenv()
+
+@app.exception_handler(PoolTimeoutError)
+def database_busy_handler(request: Request, exc: PoolTimeoutError):
+    # All pooled connections are checked out; ask the client to retry
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(InvalidCursorError)
+def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +90,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 ################################ ตัวจัดการ API Router ################################
@@ -49,6 +104,7 @@ app.include_router(api_bookmark)
 app.include_router(api_tag)
 app.include_router(api_todo)
 app.include_router(api_notification)
+app.include_router(api_search)
 
 
 ####################################################################################
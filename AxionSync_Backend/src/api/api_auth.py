@@ -2,13 +2,17 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
 from src.models.entity.en_user import User
 from src.models.function.ft_auth import LoginRequest
-from src.services.sv_auth import AuthService
+from src.services.sv_auth import AuthService, LoginThrottledError
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
 from jwcrypto import jwt, jwk
+from collections import OrderedDict
 import base64
 import os
 import ast
 import json
+import threading
+import time
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 sv_auth = AuthService()
@@ -43,15 +47,83 @@ def _jwt_secret_from_keys(keys: list[str]) -> str:
     return keys[0] if keys else "default-dev-secret-change-me"
 
 
-def _jwt_key():
-    """Get JWT key for token signing/verification"""
-    keys = _parse_api_keys(os.getenv("X_API_KEY"))
-    secret = (keys[0] if keys else "default-dev-secret-change-me").encode()
+def _build_jwt_key(keys: list[str]):
+    """Build the HS256 JWK from the configured API keys"""
+    secret = _jwt_secret_from_keys(keys).encode()
     k_b64u = base64.urlsafe_b64encode(secret).rstrip(b"=")
     return jwk.JWK(kty="oct", k=k_b64u.decode())
 
 
-def require_bearer(
+class _VerifiedTokenCache:
+    """
+    Bounded LRU of verified token -> claims.
+
+    Entries are dropped once the token's `exp` has passed, so a hit is
+    always a token that would still verify. Max size is read from
+    JWT_CACHE_SIZE (default: 10000).
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[dict, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> dict | None:
+        now = int(time.time())
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            claims, exp = entry
+            if exp <= now:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def put(self, token: str, claims: dict, exp: int):
+        with self._lock:
+            self._entries[token] = (claims, exp)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Key material is built once and swapped atomically on reload_jwt_keys()
+_allowed_keys: list[str] = []
+_signing_key = None
+_token_cache = _VerifiedTokenCache(int(os.getenv("JWT_CACHE_SIZE", 10000)))
+
+
+def reload_jwt_keys():
+    """
+    (Re)build API keys and the JWT signing key from X_API_KEY.
+
+    Called once at import and again on SIGHUP (see main.py). Cached claims
+    are discarded since they were verified against the previous key.
+    """
+    global _allowed_keys, _signing_key
+    keys = _parse_api_keys(os.getenv("X_API_KEY"))
+    _allowed_keys, _signing_key = keys, _build_jwt_key(keys)
+    _token_cache.clear()
+
+
+def _jwt_key():
+    """Get JWT key for token signing/verification"""
+    return _signing_key
+
+
+reload_jwt_keys()
+
+
+# ===========================
+#    SECURITY DEPENDENCIES
+# ===========================
+async def require_bearer(
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
 ):
     """Dependency to extract and verify JWT, return claims with user info"""
@@ -61,14 +133,18 @@ def require_bearer(
             detail="Missing or invalid Authorization header",
         )
     token_str = credentials.credentials
+    claims = _token_cache.get(token_str)
+    if claims is not None:
+        return claims
     try:
-        key = _jwt_key()
-        verified = jwt.JWT(key=key, jwt=token_str)
+        verified = jwt.JWT(key=_jwt_key(), jwt=token_str)
         claims = json.loads(verified.claims)
-        if int(claims.get("exp", 0)) <= int(datetime.now(timezone.utc).timestamp()):
+        exp = int(claims.get("exp", 0))
+        if exp <= int(datetime.now(timezone.utc).timestamp()):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired"
             )
+        _token_cache.put(token_str, claims, exp)
         return claims
     except HTTPException:
         raise
@@ -80,8 +156,7 @@ def require_bearer(
 
 def require_api_key(x_api_key: str | None = Depends(api_key_scheme)):
     """Dependency to verify API key for public endpoints like registration"""
-    allowed_keys = _parse_api_keys(os.getenv("X_API_KEY"))
-    if not allowed_keys or (x_api_key not in allowed_keys):
+    if not _allowed_keys or (x_api_key not in _allowed_keys):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key"
         )
@@ -90,13 +165,25 @@ def require_api_key(x_api_key: str | None = Depends(api_key_scheme)):
 
 @router.post("/login")
 def login(req: LoginRequest, x_api_key: str | None = Depends(api_key_scheme)):
-    allowed_keys = _parse_api_keys(os.getenv("X_API_KEY"))
-    if not allowed_keys or (x_api_key not in allowed_keys):
+    if not _allowed_keys or (x_api_key not in _allowed_keys):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key"
         )
 
-    user = sv_auth.login(req.username, req.password)
+    try:
+        user = sv_auth.login(req.username, req.password)
+    except LoginThrottledError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please retry",
+            headers={"Retry-After": "1"},
+        )
+    except BrokenProcessPool:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login temporarily unavailable, please retry",
+            headers={"Retry-After": "1"},
+        )
     if not user:
         return {"success": False, "message": "Invalid credentials"}
 
@@ -112,11 +199,8 @@ def login(req: LoginRequest, x_api_key: str | None = Depends(api_key_scheme)):
         "exp": int(exp.timestamp()),
     }
 
-    secret = _jwt_secret_from_keys(allowed_keys).encode()
-    k_b64u = base64.urlsafe_b64encode(secret).rstrip(b"=")
-    key = jwk.JWK(kty="oct", k=k_b64u.decode())
     token = jwt.JWT(header={"alg": "HS256", "typ": "JWT"}, claims=payload)
-    token.make_signed_token(key)
+    token.make_signed_token(_jwt_key())
     serialized = token.serialize()
 
     return {
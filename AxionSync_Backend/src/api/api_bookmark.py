@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status, UploadFile, File
 from src.models.entity.en_bookmark import (
     Bookmark,
     CreateBookmarkRequest,
@@ -9,38 +9,40 @@ from src.models.entity.en_bookmark import (
 )
 from src.models.entity.en_user import User
 from src.services.sv_bookmark import BookmarkService
+from src.services.sv_upload import UploadTooLargeError
+from src.services.sv_blob import IMAGE_EXTENSIONS, cover_store
+from src.services.sv_image import image_pipeline
 from src.api.api_auth import require_bearer
+from src.services.sv_etag import ETagService, etag_matches, not_modified, set_etag
+from src.sql_query.sql_collection_version import BOOKMARK_COLLECTION
+from src.sql_query.sql_pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER
 from datetime import datetime, timezone
-from pathlib import Path
-import os
-import uuid
+import asyncio
 
 router = APIRouter(prefix="/bookmarks", tags=["Bookmark"])
 sv_bookmark = BookmarkService()
-
-# Directory for bookmark cover images (in frontend public folder)
-# __file__ -> .../AxionSync_Backend/src/api/api_bookmark.py
-# parents[0]=.../api, [1]=.../src, [2]=.../AxionSync_Backend, [3]=.../AxionSync
-UPLOAD_DIR = (
-    Path(__file__).resolve().parents[3]
-    / "AxionSync_Frontend"
-    / "public"
-    / "bookmark"
-    / "cover"
-)
+sv_etag = ETagService()
 
 
 # ===========================
 #    API ENDPOINTS
 # ===========================
 @router.get("/", response_model=list[Bookmark])
-def get_bookmarks(
+async def get_bookmarks(
+    response: Response,
     type: str | None = None,
     status: str | None = None,
     include_deleted: bool = False,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    if_none_match: str | None = Header(None),
     claims: dict = Depends(require_bearer),
 ):
-    """Get all bookmarks for the authenticated user"""
+    """
+    Get a page of bookmarks for the authenticated user (next page cursor in X-Next-Cursor).
+
+    Answers 304 Not Modified when If-None-Match carries the current ETag.
+    """
     user_id = claims.get("uid")
     if not user_id:
         raise HTTPException(
@@ -61,8 +63,57 @@ def get_bookmarks(
             detail=f"Invalid status. Must be one of: {', '.join(BOOKMARK_STATUSES)}",
         )
 
-    return sv_bookmark.get_bookmarks(
-        user_id, bookmark_type=type, status=status, include_deleted=include_deleted
+    etag = await sv_etag.get_etag_async(
+        user_id, BOOKMARK_COLLECTION, type, status, include_deleted, limit, cursor
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    bookmarks, next_cursor = await sv_bookmark.get_bookmarks_async(
+        user_id,
+        limit=limit,
+        bookmark_type=type,
+        status=status,
+        include_deleted=include_deleted,
+        cursor=cursor,
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    set_etag(response, etag)
+    return bookmarks
+
+
+@router.get("/search", response_model=list[Bookmark])
+def search_bookmarks(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: str | None = None,
+    status_filter: str | None = Query(None, alias="status"),
+    limit: int = 20,
+    claims: dict = Depends(require_bearer),
+):
+    """Typo-tolerant bookmark lookup by name (for autocomplete), best matches first"""
+    user_id = claims.get("uid")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+        )
+
+    # Validate type if provided
+    if type and type not in BOOKMARK_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid type. Must be one of: {', '.join(BOOKMARK_TYPES)}",
+        )
+
+    # Validate status if provided
+    if status_filter and status_filter not in BOOKMARK_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid status. Must be one of: {', '.join(BOOKMARK_STATUSES)}",
+        )
+
+    return sv_bookmark.search_bookmarks(
+        user_id, q, limit=limit, bookmark_type=type, status=status_filter
     )
 
 
@@ -91,7 +142,7 @@ def get_bookmark(bookmark_id: int, claims: dict = Depends(require_bearer)):
     if bookmark.user.id != user_id and not bookmark.public:
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    # Update last viewed timestamp
+    # Record the view (buffered, written in batches off the request path)
     sv_bookmark.update_last_viewed(bookmark_id)
 
     return bookmark
@@ -162,7 +213,6 @@ def create_bookmark(req: CreateBookmarkRequest, claims: dict = Depends(require_b
         short_review=req.short_review,
         status=req.status,
         public=req.public,
-        cover_image=req.cover_image,
         tag_ids=req.tag_ids,
     )
 
@@ -245,7 +295,6 @@ def update_bookmark(
         short_review=req.short_review,
         status=req.status,
         public=req.public,
-        cover_image=req.cover_image,
         tag_ids=req.tag_ids,
         update_watch_from=req.watch_from is not None,
         update_mood=req.mood is not None,
@@ -338,48 +387,49 @@ async def upload_cover_image(
     user_id = claims.get("uid")
 
     # Check ownership
-    existing = sv_bookmark.get_bookmark_by_id(bookmark_id)
+    existing = await asyncio.to_thread(sv_bookmark.get_bookmark_by_id, bookmark_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Bookmark not found")
     if existing.user.id != user_id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
     # Validate file type
-    allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
-    if file.content_type not in allowed_types:
+    if file.content_type not in IMAGE_EXTENSIONS:
         raise HTTPException(
             status_code=400, detail="Invalid file type. Use JPEG, PNG, GIF, or WebP"
         )
 
-    # Create unique filename
-    ext = file.filename.split(".")[-1] if file.filename else "jpg"
-    unique_filename = f"bookmark_{bookmark_id}_{uuid.uuid4().hex[:8]}.{ext}"
-
-    # Ensure upload directory exists
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-    # Save file
-    file_path = UPLOAD_DIR / unique_filename
-
+    # Stream into the content-addressed store (size-capped, deduplicated)
     try:
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        stored = await cover_store.store(file, IMAGE_EXTENSIONS[file.content_type])
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
 
-    # Update bookmark's cover_image in database
-    updated_bookmark = sv_bookmark.update_cover_image(bookmark_id, unique_filename)
+    # Update bookmark's cover_image in database (releases the previous cover)
+    # Blocking DB calls run on a thread so the event loop keeps serving
+    updated_bookmark = await asyncio.to_thread(
+        sv_bookmark.update_cover_image, bookmark_id, stored.filename
+    )
 
     if not updated_bookmark:
-        # Clean up file if database update fails
-        if file_path.exists():
-            os.remove(file_path)
+        # Give the reference back; the file is removed by blob GC if unused
+        await asyncio.to_thread(cover_store.release, stored.filename)
         raise HTTPException(status_code=500, detail="Failed to update bookmark cover")
 
+    # Render thumbnail/WebP in the background; recorded once ready
+    image_pipeline.submit(
+        stored.path,
+        "cover",
+        lambda thumbnail, webp: sv_bookmark.update_cover_derivatives(
+            bookmark_id, stored.filename, thumbnail, webp
+        ),
+    )
+
     return {
         "success": True,
-        "cover_image": unique_filename,
+        "cover_image": stored.filename,
         "bookmark": updated_bookmark,
     }
 
@@ -1,27 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from src.models.entity.en_memo import CreateMemoRequest, Memo, UpdateMemoRequest
 from src.models.entity.en_user import User
 from src.services.sv_memo import MemoService
 from src.api.api_auth import require_bearer
+from src.services.sv_etag import ETagService, etag_matches, not_modified, set_etag
+from src.sql_query.sql_collection_version import MEMO_COLLECTION
+from src.sql_query.sql_pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER
 from pydantic import BaseModel
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/memos", tags=["Memo"])
 sv_memo = MemoService()
+sv_etag = ETagService()
 
 
 # ===========================
 #    API ENDPOINTS
 # ===========================
 @router.get("/", response_model=list[Memo])
-def get_memos(tab_id: int | None = None, claims: dict = Depends(require_bearer)):
-    """Get all memos for the authenticated user, optionally filtered by tab_id"""
+async def get_memos(
+    response: Response,
+    tab_id: int | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    if_none_match: str | None = Header(None),
+    claims: dict = Depends(require_bearer),
+):
+    """
+    Get a page of memos for the authenticated user, optionally filtered by tab_id.
+
+    Answers 304 Not Modified when If-None-Match carries the current ETag.
+    """
     user_id = claims.get("uid")
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
-    return sv_memo.get_memos(user_id, tab_id=tab_id)
+    etag = await sv_etag.get_etag_async(
+        user_id, MEMO_COLLECTION, tab_id, limit, cursor
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    memos, next_cursor = await sv_memo.get_memos_async(
+        user_id, limit=limit, tab_id=tab_id, cursor=cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    set_etag(response, etag)
+    return memos
 
 
 @router.get("/{memo_id}", response_model=Memo | None)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from src.models.entity.en_notification import (
     TodoNotification,
     UserDeviceToken,
@@ -13,7 +13,8 @@ from src.models.entity.en_notification import (
 from src.models.entity.en_user import User
 from src.services.sv_notification import NotificationService
 from src.services.sv_todo import TodoService
-from src.api.api_auth import require_bearer
+from src.api.api_auth import require_bearer, require_api_key
+from src.sql_query.sql_pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER
 from src.workers.redis_queue import RedisQueue
 from datetime import datetime, timezone
 
@@ -43,31 +44,57 @@ def validate_platform(platform: str):
         )
 
 
+# ===========================
+#    DEPENDENCIES
+# ===========================
+def get_redis_queue(request: Request) -> RedisQueue:
+    """Notification queue on the app-wide Redis pool (opened in the lifespan handler)"""
+    return request.app.state.redis_queue
+
+
 # ===========================
 #    NOTIFICATION ENDPOINTS
 # ===========================
 @router.get("/", response_model=list[TodoNotification])
 def get_notifications(
-    include_sent: bool = False, claims: dict = Depends(require_bearer)
+    response: Response,
+    include_sent: bool = False,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    claims: dict = Depends(require_bearer),
 ):
-    """Get all notifications for the authenticated user"""
+    """Get a page of notifications for the authenticated user"""
     user_id = claims.get("uid")
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
-    return sv_notification.get_notifications(user_id, include_sent)
+    notifications, next_cursor = sv_notification.get_notifications(
+        user_id, include_sent, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return notifications
 
 
 @router.get("/upcoming", response_model=list[UpcomingNotification])
-def get_upcoming_notifications(hours: int = 24, claims: dict = Depends(require_bearer)):
+async def get_upcoming_notifications(hours: int = 24, claims: dict = Depends(require_bearer)):
     """Get upcoming notifications within the next N hours"""
     user_id = claims.get("uid")
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
-    return sv_notification.get_upcoming_notifications(user_id, hours)
+    return await sv_notification.get_upcoming_notifications_async(user_id, hours)
+
+
+@router.get("/queue/stats")
+def get_queue_stats(request: Request, _: bool = Depends(require_api_key)):
+    """Notification queue depths and Redis connection pool usage (API key)"""
+    return {
+        "queue": get_redis_queue(request).get_queue_stats(),
+        "pool": request.app.state.redis_pool.stats(),
+    }
 
 
 @router.get("/{notification_id}", response_model=TodoNotification | None)
@@ -103,9 +130,10 @@ def get_notifications_for_todo(todo_id: int, claims: dict = Depends(require_bear
 
 @router.post("/", response_model=TodoNotification)
 def create_notification(
-    req: CreateNotificationRequest, claims: dict = Depends(require_bearer)
+    req: CreateNotificationRequest,
+    claims: dict = Depends(require_bearer),
 ):
-    """Create a new notification and schedule it in Redis"""
+    """Create a new notification (scheduled in Redis by the outbox relay)"""
     user_id = claims.get("uid")
     if not user_id:
         raise HTTPException(
@@ -143,16 +171,6 @@ def create_notification(
             detail="Failed to create notification",
         )
 
-    # Schedule notification in Redis queue
-    try:
-        redis_queue = RedisQueue()
-        payload = sv_notification.create_notification_job_payload(notification)
-        delay_seconds = (req.notify_time - datetime.now(timezone.utc)).total_seconds()
-        redis_queue.schedule_notification(payload, int(delay_seconds))
-    except Exception as e:
-        # Log error but don't fail the request
-        print(f"Warning: Failed to schedule notification in Redis: {e}")
-
     return notification
 
 
@@ -197,19 +215,6 @@ def update_notification(
             detail="Failed to update notification",
         )
 
-    # Reschedule in Redis if notify_time changed
-    if req.notify_time:
-        try:
-            redis_queue = RedisQueue()
-            redis_queue.cancel_notification(notification_id)
-            payload = sv_notification.create_notification_job_payload(notification)
-            delay_seconds = (
-                req.notify_time - datetime.now(timezone.utc)
-            ).total_seconds()
-            redis_queue.schedule_notification(payload, int(delay_seconds))
-        except Exception as e:
-            print(f"Warning: Failed to reschedule notification in Redis: {e}")
-
     return notification
 
 
@@ -225,13 +230,6 @@ def delete_notification(notification_id: int, claims: dict = Depends(require_bea
     if existing.user_id != user_id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    # Cancel Redis job
-    try:
-        redis_queue = RedisQueue()
-        redis_queue.cancel_notification(notification_id)
-    except Exception as e:
-        print(f"Warning: Failed to cancel notification in Redis: {e}")
-
     success = sv_notification.delete_notification(notification_id)
     if not success:
         raise HTTPException(
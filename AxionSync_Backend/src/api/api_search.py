@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from src.models.entity.en_search import SearchResult, SEARCH_TYPES
+from src.services.sv_search import SearchService, DEFAULT_SEARCH_LIMIT
+from src.sql_query.sql_pagination import NEXT_CURSOR_HEADER
+from src.api.api_auth import require_bearer
+
+router = APIRouter(prefix="/search", tags=["Search"])
+sv_search = SearchService()
+
+
+# ===========================
+#    API ENDPOINTS
+# ===========================
+@router.get("/", response_model=list[SearchResult])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    type: list[str] | None = Query(None),
+    limit: int = DEFAULT_SEARCH_LIMIT,
+    cursor: str | None = None,
+    claims: dict = Depends(require_bearer),
+):
+    """
+    Full-text search across the authenticated user's memos, todos and bookmarks.
+
+    Supports web-search syntax ("quoted phrases", OR, -exclude). Filter by
+    entity kind with repeated `type` parameters. Results are ranked by
+    relevance; the next page's cursor is returned in the X-Next-Cursor header.
+
+    Each `headline` is HTML: the matched user text is HTML-escaped and the
+    only markup is the <mark></mark> around matches, so it can be rendered
+    as-is without exposing markup stored in memos, todos or bookmarks.
+    """
+    user_id = claims.get("uid")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+        )
+    if type:
+        invalid = [kind for kind in type if kind not in SEARCH_TYPES]
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid type. Must be one of: {', '.join(SEARCH_TYPES)}",
+            )
+
+    results, next_cursor = await sv_search.search(
+        user_id, q, types=type, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return results
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from src.api.api_auth import require_bearer
 from src.models.entity.en_tab import Tab, CreateTabRequest, UpdateTabRequest
 from src.services.sv_tab import TabService
+from src.services.sv_etag import ETagService, etag_matches, not_modified, set_etag
+from src.sql_query.sql_collection_version import TAB_COLLECTION
 
 router = APIRouter(prefix="/tabs", tags=["Tab"])
 
 
 @router.get("", response_model=list[Tab])
-def get_tabs(claims: dict = Depends(require_bearer)):
-    """Get all tabs for the authenticated user"""
+def get_tabs(
+    response: Response,
+    if_none_match: str | None = Header(None),
+    claims: dict = Depends(require_bearer),
+):
+    """Get all tabs for the authenticated user (304 if If-None-Match is current)"""
+    etag = ETagService().get_etag(claims["uid"], TAB_COLLECTION)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     tab_service = TabService()
-    return tab_service.get_tabs(claims["uid"])
+    tabs = tab_service.get_tabs(claims["uid"])
+    set_etag(response, etag)
+    return tabs
 
 
 @router.get("/{tab_id}", response_model=Tab)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from src.models.entity.en_todo import (
     Todo,
     TodoItem,
@@ -25,12 +25,16 @@ from src.models.entity.en_user import User
 from src.services.sv_todo import TodoService
 from src.services.sv_notification import NotificationService
 from src.api.api_auth import require_bearer
+from src.services.sv_etag import ETagService, etag_matches, not_modified, set_etag
+from src.sql_query.sql_collection_version import TODO_COLLECTION
+from src.sql_query.sql_pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER
 from src.workers.redis_queue import RedisQueue
 from datetime import datetime, timezone
 
 router = APIRouter(prefix="/todos", tags=["Todo"])
 sv_todo = TodoService()
 sv_notification = NotificationService()
+sv_etag = ETagService()
 
 
 # ===========================
@@ -106,13 +110,21 @@ def check_ownership_or_access(
 #    TODO CRUD ENDPOINTS
 # ===========================
 @router.get("/", response_model=list[Todo])
-def get_todos(
+async def get_todos(
+    response: Response,
     status_filter: str | None = None,
     priority: str | None = None,
     include_deleted: bool = False,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    if_none_match: str | None = Header(None),
     claims: dict = Depends(require_bearer),
 ):
-    """Get all todos for the authenticated user"""
+    """
+    Get a page of todos for the authenticated user (next page cursor in X-Next-Cursor).
+
+    Answers 304 Not Modified when If-None-Match carries the current ETag.
+    """
     user_id = claims.get("uid")
     if not user_id:
         raise HTTPException(
@@ -122,12 +134,24 @@ def get_todos(
     validate_status(status_filter)
     validate_priority(priority)
 
-    return sv_todo.get_todos(
+    etag = await sv_etag.get_etag_async(
+        user_id, TODO_COLLECTION, status_filter, priority, include_deleted, limit, cursor
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    todos, next_cursor = await sv_todo.get_todos_async(
         user_id,
         status=status_filter,
         priority=priority,
         include_deleted=include_deleted,
+        limit=limit,
+        cursor=cursor,
     )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    set_etag(response, etag)
+    return todos
 
 
 @router.get("/overdue", response_model=list[Todo])
@@ -164,10 +188,10 @@ def get_streak(claims: dict = Depends(require_bearer)):
 
 
 @router.get("/{todo_id}", response_model=Todo | None)
-def get_todo(todo_id: int, claims: dict = Depends(require_bearer)):
+async def get_todo(todo_id: int, claims: dict = Depends(require_bearer)):
     """Get a single todo by ID"""
     user_id = claims.get("uid")
-    todo = sv_todo.get_todo_by_id(todo_id)
+    todo = await sv_todo.get_todo_by_id_async(todo_id)
     check_ownership_or_access(todo, user_id)
     return todo
 
@@ -1,22 +1,18 @@
 from fastapi import APIRouter, Body, Depends, UploadFile, File, HTTPException
 from src.models.entity.en_user import User, UserUpdate, UserCreate
 from src.services.sv_user import UserService
+from src.services.sv_upload import UploadTooLargeError
+from src.services.sv_blob import AVATAR_DIR, IMAGE_EXTENSIONS, avatar_store
+from src.services.sv_image import image_pipeline
 from src.api.api_auth import require_bearer, require_api_key
-import os
-import uuid
-from pathlib import Path
+import asyncio
 
 router = APIRouter(prefix="/users", tags=["User"])
 sv_user = UserService()
 
 # Directory for profile pictures (in frontend public folder)
 # Path: AxionSync/AxionSync_Frontend/public/userProfilePicture
-UPLOAD_DIR = (
-    Path(__file__).resolve().parent.parent.parent.parent.parent
-    / "AxionSync_Frontend"
-    / "public"
-    / "userProfilePicture"
-)
+UPLOAD_DIR = AVATAR_DIR
 
 print(f"[INIT] Profile picture upload directory: {UPLOAD_DIR}")
 
@@ -98,46 +94,46 @@ async def upload_profile_picture(
         )
 
     # Validate file type
-    allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
-    if file.content_type not in allowed_types:
+    if file.content_type not in IMAGE_EXTENSIONS:
         raise HTTPException(
             status_code=400, detail="Invalid file type. Use JPEG, PNG, GIF, or WebP"
         )
 
-    # Create unique filename
-    ext = file.filename.split(".")[-1] if file.filename else "jpg"
-    unique_filename = f"{user_id}_{uuid.uuid4().hex[:8]}.{ext}"
-
-    print(
-        f"[UPLOAD] User {user_id} uploading file: {file.filename} -> {unique_filename}"
-    )
-
-    # Ensure upload directory exists
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-    # Save file
-    file_path = UPLOAD_DIR / unique_filename
+    print(f"[UPLOAD] User {user_id} uploading file: {file.filename}")
 
+    # Stream into the content-addressed store (size-capped, deduplicated)
     try:
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-        print(f"[UPLOAD] File saved to: {file_path}")
+        stored = await avatar_store.store(file, IMAGE_EXTENSIONS[file.content_type])
+        print(f"[UPLOAD] File stored as: {stored.path} ({stored.size} bytes)")
+    except UploadTooLargeError as e:
+        print(f"[UPLOAD] Rejected oversized file: {file.filename}")
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         print(f"[UPLOAD] Error saving file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
 
-    # Update user's picture_url in database
-    updated_user = sv_user.update_user_picture(user_id, unique_filename)
+    # Update user's picture_url in database (releases the previous picture)
+    # Blocking DB calls run on a thread so the event loop keeps serving
+    updated_user = await asyncio.to_thread(
+        sv_user.update_user_picture, user_id, stored.filename
+    )
 
     print(f"[UPLOAD] Updated user picture in database: {updated_user}")
 
     if not updated_user:
-        # Clean up file if database update fails
-        if file_path.exists():
-            os.remove(file_path)
-        print(f"[UPLOAD] Database update failed, cleaning up file")
+        # Give the reference back; the file is removed by blob GC if unused
+        await asyncio.to_thread(avatar_store.release, stored.filename)
+        print(f"[UPLOAD] Database update failed, releasing file")
         raise HTTPException(status_code=500, detail="Failed to update user picture")
 
-    print(f"[UPLOAD] Success! New picture_url: {unique_filename}")
-    return {"success": True, "picture_url": unique_filename, "user": updated_user}
+    # Render the avatar thumbnail in the background; recorded once ready
+    image_pipeline.submit(
+        stored.path,
+        "avatar",
+        lambda thumbnail, _webp: sv_user.update_picture_thumbnail(
+            user_id, stored.filename, thumbnail
+        ),
+    )
+
+    print(f"[UPLOAD] Success! New picture_url: {stored.filename}")
+    return {"success": True, "picture_url": stored.filename, "user": updated_user}
@@ -1,6 +1,12 @@
+import asyncio
 import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
 from dotenv import load_dotenv
+import asyncpg
 import psycopg2
+from psycopg2 import extensions, pool
 
 load_dotenv()  # โหลดค่าจาก .env
 
@@ -10,29 +16,262 @@ print(os.getenv("DB_USER"))
 print(os.getenv("DB_PASSWORD"))
 print(os.getenv("DB_PORT"))
 
-class Database:
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out within the pool timeout"""
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool.
+
+    Wraps psycopg2's ThreadedConnectionPool with a bounded checkout (callers
+    wait up to `timeout` seconds instead of failing immediately when every
+    connection is busy) and a health check on borrow.
+
+    Environment Variables:
+        DB_POOL_MIN: Connections opened up front (default: 1)
+        DB_POOL_MAX: Maximum open connections (default: 10)
+        DB_POOL_TIMEOUT: Seconds to wait for a free connection (default: 30)
+        DB_POOL_PING_IDLE: Ping connections idle longer than this many
+            seconds before handing them out (default: 30)
+    """
+
     def __init__(self):
-        self.connection = None
-        self.cursor = None
+        self.minconn = int(os.getenv("DB_POOL_MIN", 1))
+        self.maxconn = int(os.getenv("DB_POOL_MAX", 10))
+        self.timeout = float(os.getenv("DB_POOL_TIMEOUT", 30))
+        self.ping_idle = float(os.getenv("DB_POOL_PING_IDLE", 30))
+
+        self._pool = pool.ThreadedConnectionPool(
+            self.minconn,
+            self.maxconn,
+            host=os.getenv("DB_HOST"),
+            database=os.getenv("DB_NAME"),
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PASSWORD"),
+            port=os.getenv("DB_PORT"),
+        )
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._last_used: dict[int, float] = {}
+        self._in_use = 0
+        self._lock = threading.Lock()
+
+    def _is_healthy(self, conn) -> bool:
+        """Check a connection before handing it out"""
+        if conn.closed:
+            return False
+        status = conn.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            # Left mid-transaction by a previous borrower
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+
+        idle_for = time.monotonic() - self._last_used.get(id(conn), 0)
+        if idle_for < self.ping_idle:
+            return True
         try:
-            self.connection = psycopg2.connect(
-                host=os.getenv("DB_HOST"),
-                database=os.getenv("DB_NAME"),
-                user=os.getenv("DB_USER"),
-                password=os.getenv("DB_PASSWORD"),
-                port=os.getenv("DB_PORT")
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Borrow a healthy connection, waiting up to `timeout` seconds"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeoutError(
+                f"No database connection available within {self.timeout}s"
             )
-            self.connection.autocommit = True
-            self.cursor = self.connection.cursor()
-            print("Database connected")
+        try:
+            conn = self._pool.getconn()
+            if not self._is_healthy(conn):
+                self._last_used.pop(id(conn), None)
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+            conn.autocommit = False
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+        return conn
+
+    def putconn(self, conn, close: bool = False):
+        """Return a connection to the pool"""
+        close = close or bool(conn.closed)
+        try:
+            if close:
+                self._last_used.pop(id(conn), None)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+            self._pool.putconn(conn, close=close)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def closeall(self):
+        """Close every connection owned by the pool"""
+        self._pool.closeall()
+        self._last_used.clear()
+
+    def stats(self) -> dict:
+        """Get pool usage statistics"""
+        with self._lock:
+            in_use = self._in_use
+        return {
+            "min": self.minconn,
+            "max": self.maxconn,
+            "in_use": in_use,
+            "available": self.maxconn - in_use,
+        }
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Get the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+                print("Database connected")
+    return _pool
+
+
+class Database:
+    """
+    Pooled database access shared by all SQL* query classes.
+
+    Each `cursor()` block borrows its own connection for the duration of
+    the block and runs as a single transaction: committed when the block
+    exits normally, rolled back if it raises.
+
+    Usage:
+        with self.db.cursor() as cursor:
+            cursor.execute("SELECT ...", params)
+            return cursor.fetchall()
+    """
+
+    def __init__(self):
+        try:
+            get_pool()
         except Exception as e:
+            # Retried lazily on the next checkout
             print(f"Cannot connect to database: {e}")
 
+    @property
+    def pool(self) -> ConnectionPool:
+        return get_pool()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection scoped to one transaction"""
+        db_pool = self.pool
+        conn = db_pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                pass
+            raise
+        finally:
+            db_pool.putconn(conn)
+
+    @contextmanager
+    def cursor(self):
+        """Borrow a pooled connection and yield a cursor scoped to it"""
+        with self.connection() as conn:
+            cur = conn.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
 
     def close(self):
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
-            print("Database connection closed")
-            
+        global _pool
+        with _pool_lock:
+            if _pool is not None:
+                _pool.closeall()
+                _pool = None
+                print("Database connection closed")
+
+
+_async_pool: asyncpg.Pool | None = None
+_async_pool_lock: asyncio.Lock | None = None
+
+
+class AsyncDatabase:
+    """
+    asyncpg-backed database access for async FastAPI endpoints.
+
+    The pool is created lazily inside the running event loop on first use,
+    so query classes can be instantiated at import time like their sync
+    counterparts. Queries use asyncpg's $1, $2 ... placeholders.
+
+    Environment Variables:
+        DB_ASYNC_POOL_MIN: Connections opened up front (default: 1)
+        DB_ASYNC_POOL_MAX: Maximum open connections (default: 20)
+        DB_POOL_TIMEOUT: Seconds to wait for a free connection (default: 30)
+
+    Usage:
+        async with self.db.connection() as conn:
+            return await conn.fetch("SELECT ... WHERE id = $1", todo_id)
+    """
+
+    async def get_pool(self) -> asyncpg.Pool:
+        """Get the process-wide asyncpg pool, creating it on first use"""
+        global _async_pool, _async_pool_lock
+        if _async_pool is not None:
+            return _async_pool
+        if _async_pool_lock is None:
+            _async_pool_lock = asyncio.Lock()
+        async with _async_pool_lock:
+            if _async_pool is None:
+                _async_pool = await asyncpg.create_pool(
+                    host=os.getenv("DB_HOST"),
+                    database=os.getenv("DB_NAME"),
+                    user=os.getenv("DB_USER"),
+                    password=os.getenv("DB_PASSWORD"),
+                    port=int(os.getenv("DB_PORT", 5432)),
+                    min_size=int(os.getenv("DB_ASYNC_POOL_MIN", 1)),
+                    max_size=int(os.getenv("DB_ASYNC_POOL_MAX", 20)),
+                )
+                print("Async database connected")
+        return _async_pool
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a pooled connection for the duration of the block"""
+        db_pool = await self.get_pool()
+        timeout = float(os.getenv("DB_POOL_TIMEOUT", 30))
+        try:
+            conn = await db_pool.acquire(timeout=timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeoutError(
+                f"No database connection available within {timeout}s"
+            )
+        try:
+            yield conn
+        finally:
+            await db_pool.release(conn)
+
+    async def close(self):
+        global _async_pool
+        if _async_pool is not None:
+            await _async_pool.close()
+            _async_pool = None
+            print("Async database connection closed")
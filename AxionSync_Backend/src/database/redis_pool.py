@@ -0,0 +1,65 @@
+import os
+import redis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def redis_connection_kwargs() -> dict:
+    """Connection settings shared by every Redis client"""
+    return {
+        "host": os.getenv("REDIS_HOST", "localhost"),
+        "port": int(os.getenv("REDIS_PORT", 6379)),
+        "password": os.getenv("REDIS_PASSWORD", None),
+        "db": int(os.getenv("REDIS_DB", 0)),
+        "decode_responses": True,
+        "socket_connect_timeout": 5,
+    }
+
+
+class RedisPool:
+    """
+    Application-scoped Redis connection pool for the API process.
+
+    Opened once by the FastAPI lifespan handler and shared by every request,
+    so notification writes reuse warm connections instead of opening a
+    client (and TCP connection) each time. The pool is bounded: at most
+    REDIS_POOL_MAX sockets are open and callers wait up to
+    REDIS_POOL_TIMEOUT seconds for a free one.
+
+    Environment Variables:
+        REDIS_POOL_MAX: Maximum open connections (default: 20)
+        REDIS_POOL_TIMEOUT: Seconds to wait for a free connection (default: 5)
+    """
+
+    def __init__(self):
+        self.max_connections = int(os.getenv("REDIS_POOL_MAX", 20))
+        self.timeout = float(os.getenv("REDIS_POOL_TIMEOUT", 5))
+
+        self._pool = redis.BlockingConnectionPool(
+            max_connections=self.max_connections,
+            timeout=self.timeout,
+            socket_timeout=5,
+            retry_on_timeout=True,
+            **redis_connection_kwargs(),
+        )
+        self.client = redis.Redis(connection_pool=self._pool)
+
+    def stats(self) -> dict:
+        """Get pool usage statistics"""
+        # Connections are created lazily; free slots hold None placeholders
+        created = len(self._pool._connections)
+        idle = sum(1 for conn in list(self._pool.pool.queue) if conn is not None)
+        return {
+            "max": self.max_connections,
+            "created": created,
+            "in_use": created - idle,
+            "idle": idle,
+        }
+
+    def close(self):
+        """Close every connection owned by the pool"""
+        try:
+            self._pool.disconnect()
+        except Exception as e:
+            print(f"Error closing Redis pool: {e}")
@@ -138,6 +138,8 @@ class Bookmark(BaseModel):
     created_at: datetime  # Creation timestamp
     updated_at: datetime | None = None  # Last update timestamp
     cover_image: str | None = None  # Cover image filename
+    cover_thumbnail: str | None = None  # WebP thumbnail filename (None until rendered)
+    cover_webp: str | None = None  # Full-size WebP variant filename (None until rendered)
     deleted_status: bool = False  # Soft delete flag
     last_viewed_at: datetime | None = None  # Last time user viewed this bookmark
     tags: list[Tag] = []  # Associated tags
@@ -176,7 +178,6 @@ class CreateBookmarkRequest(BaseModel):
     short_review: str | None = None  # (optional) - Brief summary review
     status: str = "PreWatch"  # (optional, default: "PreWatch") - Status enum
     public: bool = False  # (optional, default: false) - Whether bookmark is public
-    cover_image: str | None = None  # (optional) - Cover image filename
     tag_ids: list[int] = []  # (optional) - List of tag IDs to associate
 
 
@@ -203,5 +204,4 @@ class UpdateBookmarkRequest(BaseModel):
     short_review: str | None = None
     status: str | None = None
     public: bool | None = None
-    cover_image: str | None = None
     tag_ids: list[int] | None = None
@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+try:
+    from pydantic import ConfigDict  # pydantic v2
+except ImportError:  # fallback pydantic v1
+    ConfigDict = None  # type: ignore
+
+
+# Searchable entity kinds
+SEARCH_TYPES = ["memo", "todo", "bookmark"]
+
+
+class SearchResult(BaseModel):
+    """
+    One full-text search hit
+
+    Fields:
+    - type: str - Entity kind (memo, todo, bookmark)
+    - id: int - ID of the matching memo/todo/bookmark
+    - title: str - Memo/todo title or bookmark name
+    - headline: str - HTML-escaped snippet of the matching text, matches wrapped
+      in <mark></mark> (the only markup it contains)
+    - rank: float - Relevance score (higher is better)
+    - created_at: datetime - Creation time of the entity
+    """
+
+    type: str
+    id: int
+    title: str
+    headline: str = ""
+    rank: float
+    created_at: datetime
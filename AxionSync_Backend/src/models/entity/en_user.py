@@ -16,6 +16,7 @@ class User(BaseModel):
     role: str = "user"
     tel: str | None = None
     picture_url: str = "unidentified.jpg"
+    picture_thumbnail: str | None = None  # WebP thumbnail, None until rendered
     created_at: datetime
     updated_at: datetime | None = None
 
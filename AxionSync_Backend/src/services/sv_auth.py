@@ -1,6 +1,134 @@
 from src.sql_query.sql_auth import SQLAuth
 from src.models.entity.en_user import User
 from passlib.hash import bcrypt
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import os
+import threading
+import time
+
+
+class LoginThrottledError(Exception):
+    """Raised when too many password verifications are already queued"""
+
+
+def _verify_bcrypt(password: str, password_hash: str) -> bool:
+    """Run in a worker process so bcrypt's CPU cost stays off the API process"""
+    try:
+        return bcrypt.verify(password, password_hash)
+    except Exception:
+        return False
+
+
+class PasswordVerifier:
+    """
+    Bounded process pool for bcrypt verification.
+
+    At most AUTH_VERIFY_QUEUE verifications may be running or waiting at
+    once; beyond that `verify` raises LoginThrottledError immediately so
+    the caller can answer 429 instead of piling up threads. Failed
+    username/password/hash triples are remembered (as a SHA-256 digest) for
+    AUTH_NEGATIVE_CACHE_TTL seconds so repeated bad attempts skip bcrypt.
+
+    Environment Variables:
+        AUTH_VERIFY_WORKERS: Worker processes (default: 2)
+        AUTH_VERIFY_QUEUE: Max in-flight verifications (default: 16)
+        AUTH_NEGATIVE_CACHE_TTL: Seconds to remember a failed pair, 0 disables (default: 60)
+        AUTH_NEGATIVE_CACHE_SIZE: Max remembered failed pairs (default: 10000)
+    """
+
+    def __init__(self):
+        self.workers = int(os.getenv("AUTH_VERIFY_WORKERS", 2))
+        self.queue_limit = int(os.getenv("AUTH_VERIFY_QUEUE", 16))
+        self.negative_ttl = float(os.getenv("AUTH_NEGATIVE_CACHE_TTL", 60))
+        self.negative_size = int(os.getenv("AUTH_NEGATIVE_CACHE_SIZE", 10000))
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(self.queue_limit)
+        self._failed: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """Drop a broken pool so the next call starts fresh workers"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_verify(self, password: str, password_hash: str) -> bool:
+        # A worker dying (OOM kill, crash) breaks the whole pool for good;
+        # replace it and retry once instead of failing every later login.
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                return executor.submit(_verify_bcrypt, password, password_hash).result()
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+                if attempt:
+                    raise
+
+    def _pair_key(self, username: str, password: str, password_hash: str) -> str:
+        # The stored hash is part of the key so a password change (new hash)
+        # immediately invalidates failures recorded against the old one.
+        return hashlib.sha256(
+            f"{username}\0{password}\0{password_hash}".encode()
+        ).hexdigest()
+
+    def _recently_failed(self, key: str) -> bool:
+        with self._lock:
+            expires_at = self._failed.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._failed[key]
+                return False
+            return True
+
+    def _remember_failure(self, key: str):
+        with self._lock:
+            self._failed[key] = time.monotonic() + self.negative_ttl
+            self._failed.move_to_end(key)
+            while len(self._failed) > self.negative_size:
+                self._failed.popitem(last=False)
+
+    def verify(self, username: str, password: str, password_hash: str) -> bool:
+        """Verify a password against its bcrypt hash on the worker pool"""
+        key = (
+            self._pair_key(username, password, password_hash)
+            if self.negative_ttl > 0
+            else None
+        )
+        if key and self._recently_failed(key):
+            return False
+
+        if not self._slots.acquire(blocking=False):
+            raise LoginThrottledError("Too many login attempts in progress")
+        try:
+            is_valid = self._run_verify(password, password_hash)
+        finally:
+            self._slots.release()
+
+        if not is_valid and key:
+            self._remember_failure(key)
+        return is_valid
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_verifier = PasswordVerifier()
 
 
 class AuthService:
@@ -17,13 +145,11 @@ class AuthService:
 
         # Verify bcrypt hash if present; otherwise fallback to plain compare
         is_valid = False
-        try:
-            if isinstance(stored_password, str) and stored_password.startswith("$2"):
-                is_valid = bcrypt.verify(password, stored_password)
-            else:
-                is_valid = stored_password == password
-        except Exception:
-            is_valid = False
+        if isinstance(stored_password, str) and stored_password.startswith("$2"):
+            # May raise LoginThrottledError when the verify pool is saturated
+            is_valid = password_verifier.verify(username, password, stored_password)
+        else:
+            is_valid = stored_password == password
 
         if not is_valid:
             return None
@@ -0,0 +1,127 @@
+from fastapi import UploadFile
+from src.sql_query.sql_blob import SQLBlob
+from src.services.sv_upload import (
+    UPLOAD_MAX_BYTES,
+    StoredUpload,
+    discard_upload,
+    stream_upload,
+)
+from pathlib import Path
+import asyncio
+import aiofiles.os
+
+# Upload directories (in the frontend public folder), per image kind
+# __file__ -> .../AxionSync_Backend/src/services/sv_blob.py
+COVER_DIR = (
+    Path(__file__).resolve().parents[3]
+    / "AxionSync_Frontend"
+    / "public"
+    / "bookmark"
+    / "cover"
+)
+AVATAR_DIR = (
+    Path(__file__).resolve().parents[4]
+    / "AxionSync_Frontend"
+    / "public"
+    / "userProfilePicture"
+)
+BLOB_DIRS = {
+    "cover": COVER_DIR,
+    "avatar": AVATAR_DIR,
+}
+
+# Accepted upload types and the extension their blobs are stored with
+IMAGE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+
+# Files rendered from a blob by the image pipeline (see sv_image)
+DERIVATIVE_SUFFIXES = ("_thumb.webp", "_opt.webp")
+
+
+class BlobStore:
+    """
+    Content-addressed, reference-counted storage for uploaded images.
+
+    Files are named by the SHA-256 of their content, so the same image
+    uploaded again (by anyone) is stored once. Each cover/picture that
+    points at a file holds one reference in image_blob; unreferenced files
+    are deleted by the blob GC worker (src.workers.blob_gc_worker).
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.directory = BLOB_DIRS[kind]
+        self.sqlBlob = SQLBlob()
+
+    async def store(
+        self, file: UploadFile, ext: str, max_bytes: int = UPLOAD_MAX_BYTES
+    ) -> StoredUpload:
+        """
+        Stream an upload into the store and take a reference to it.
+
+        The caller owns that reference: record the returned filename on the
+        entity, or hand it back with `release` if that fails.
+        """
+        staged = await stream_upload(file, self.directory, max_bytes)
+        try:
+            filename = await asyncio.to_thread(
+                self.sqlBlob.acquire_blob,
+                self.kind,
+                staged.sha256,
+                f"{staged.sha256}.{ext}",
+                staged.size,
+            )
+            if not filename:
+                raise RuntimeError("Could not register image")
+
+            final_path = self.directory / filename
+            try:
+                if await aiofiles.os.path.exists(final_path):
+                    # Already stored: keep the existing copy
+                    await discard_upload(staged.path)
+                else:
+                    await aiofiles.os.rename(staged.path, final_path)
+            except BaseException:
+                await asyncio.to_thread(self.sqlBlob.release_blob, self.kind, filename)
+                raise
+        except BaseException:
+            await discard_upload(staged.path)
+            raise
+
+        return StoredUpload(final_path, staged.size, staged.sha256)
+
+    def release(self, filename: str | None):
+        """Drop a reference taken by `store` that ended up unused"""
+        if filename:
+            self.sqlBlob.release_blob(self.kind, filename)
+
+
+def remove_blob_files(blobs: list[tuple[str, str]]):
+    """Delete blob files and their rendered derivatives from disk"""
+    for kind, filename in blobs:
+        directory = BLOB_DIRS.get(kind)
+        if directory is None:
+            continue
+        stem = Path(filename).stem
+        for path in [directory / filename] + [
+            directory / f"{stem}{suffix}" for suffix in DERIVATIVE_SUFFIXES
+        ]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[Blob] Could not remove {path}: {e}")
+
+
+def collect_garbage(grace_seconds: float, limit: int = 500) -> int:
+    """Delete one batch of unreferenced blobs; returns the number removed"""
+    return SQLBlob().collect_garbage(grace_seconds, limit, remove_blob_files)
+
+
+cover_store = BlobStore("cover")
+avatar_store = BlobStore("avatar")
@@ -1,5 +1,12 @@
 from src.sql_query.sql_bookmark import SQLBookmark
-from src.sql_query.sql_tag import SQLTag
+from src.sql_query.sql_bookmark_async import AsyncSQLBookmark
+from src.services.sv_last_viewed import last_viewed_buffer
+from src.sql_query.sql_pagination import (
+    DEFAULT_PAGE_SIZE,
+    clamp_page_size,
+    decode_cursor,
+    next_page_cursor,
+)
 from src.models.entity.en_bookmark import Bookmark
 from src.models.entity.en_tag import Tag
 from src.models.entity.en_user import User
@@ -7,11 +14,15 @@ from typing import Any
 from datetime import datetime
 import json
 
+# Keyset for bookmark listings: (created_at, id) and their row positions
+BOOKMARK_CURSOR_TYPES = (datetime, int)
+BOOKMARK_CURSOR_COLUMNS = (19, 0)
+
 
 class BookmarkService:
     def __init__(self):
         self.sqlBookmark = SQLBookmark()
-        self.sqlTag = SQLTag()
+        self.asyncSqlBookmark = AsyncSQLBookmark()
 
     def _row_to_bookmark(self, row, tags: list[Tag] | None = None) -> Bookmark:
         """Convert a database row to a Bookmark object"""
@@ -42,6 +53,14 @@ class BookmarkService:
             except (json.JSONDecodeError, TypeError):
                 mood = None
 
+        # Listing queries aggregate tags into a JSON array column
+        if tags is None and len(row) > 33:
+            tags = self._json_to_tags(row[33])
+
+        # Rendered derivatives follow the tags column
+        cover_thumbnail = row[34] if len(row) > 35 else None
+        cover_webp = row[35] if len(row) > 35 else None
+
         return Bookmark(
             id=row[0],
             name=row[1],
@@ -65,55 +84,90 @@ class BookmarkService:
             created_at=row[19],
             updated_at=row[20],
             cover_image=row[21],
+            cover_thumbnail=cover_thumbnail,
+            cover_webp=cover_webp,
             deleted_status=row[22],
             last_viewed_at=row[23],
             tags=tags or [],
         )
 
-    def _get_tags_for_bookmark(self, bookmark_id: int) -> list[Tag]:
-        """Get all tags for a bookmark"""
-        rows = self.sqlTag.get_tags_for_bookmark(bookmark_id)
-        tags = []
-        for row in rows:
-            tags.append(
-                Tag(
-                    id=row[0],
-                    name=row[1],
-                    tag_priority=row[2],
-                )
-            )
-        return tags
+    def _json_to_tags(self, tags_json) -> list[Tag]:
+        """Convert an aggregated JSON tags column to Tag objects"""
+        if isinstance(tags_json, str):
+            try:
+                tags_json = json.loads(tags_json)
+            except (json.JSONDecodeError, TypeError):
+                return []
+        return [
+            Tag(id=tag["id"], name=tag["name"], tag_priority=tag["tag_priority"])
+            for tag in tags_json or []
+        ]
 
     def get_bookmarks(
         self,
         user_id: int,
-        limit: int = 100,
+        limit: int = DEFAULT_PAGE_SIZE,
         bookmark_type: str | None = None,
         status: str | None = None,
         include_deleted: bool = False,
-    ):
-        """Get all bookmarks for a user"""
+        cursor: str | None = None,
+    ) -> tuple[list[Bookmark], str | None]:
+        """Get one page of bookmarks for a user, plus the cursor for the next page"""
+        limit = clamp_page_size(limit)
         rows = self.sqlBookmark.get_bookmarks(
-            user_id, limit, bookmark_type, status, include_deleted
+            user_id,
+            limit + 1,
+            bookmark_type,
+            status,
+            include_deleted,
+            after=decode_cursor(cursor, BOOKMARK_CURSOR_TYPES),
         )
-        bookmarks = []
+        next_cursor = next_page_cursor(rows, limit, BOOKMARK_CURSOR_COLUMNS)
+        return [self._row_to_bookmark(row) for row in rows[:limit]], next_cursor
 
-        for row in rows:
-            tags = self._get_tags_for_bookmark(row[0])
-            bookmarks.append(self._row_to_bookmark(row, tags))
+    async def get_bookmarks_async(
+        self,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        bookmark_type: str | None = None,
+        status: str | None = None,
+        include_deleted: bool = False,
+        cursor: str | None = None,
+    ) -> tuple[list[Bookmark], str | None]:
+        """Get one page of bookmarks for a user (async database path)"""
+        limit = clamp_page_size(limit)
+        rows = await self.asyncSqlBookmark.get_bookmarks(
+            user_id,
+            limit + 1,
+            bookmark_type,
+            status,
+            include_deleted,
+            after=decode_cursor(cursor, BOOKMARK_CURSOR_TYPES),
+        )
+        next_cursor = next_page_cursor(rows, limit, BOOKMARK_CURSOR_COLUMNS)
+        return [self._row_to_bookmark(row) for row in rows[:limit]], next_cursor
 
-        return bookmarks
+    def search_bookmarks(
+        self,
+        user_id: int,
+        text: str,
+        limit: int = 20,
+        bookmark_type: str | None = None,
+        status: str | None = None,
+    ) -> list[Bookmark]:
+        """Fuzzy-search a user's bookmarks by name, best matches first"""
+        text = text.strip()
+        if not text:
+            return []
+        rows = self.sqlBookmark.search_bookmarks(
+            user_id, text, clamp_page_size(limit), bookmark_type, status
+        )
+        return [self._row_to_bookmark(row) for row in rows]
 
     def get_public_bookmarks(self, limit: int = 100, bookmark_type: str | None = None):
         """Get public bookmarks"""
         rows = self.sqlBookmark.get_public_bookmarks(limit, bookmark_type)
-        bookmarks = []
-
-        for row in rows:
-            tags = self._get_tags_for_bookmark(row[0])
-            bookmarks.append(self._row_to_bookmark(row, tags))
-
-        return bookmarks
+        return [self._row_to_bookmark(row) for row in rows]
 
     def get_bookmark_by_id(self, bookmark_id: int, include_deleted: bool = False):
         """Get a single bookmark by ID"""
@@ -121,8 +175,7 @@ class BookmarkService:
         if not row:
             return None
 
-        tags = self._get_tags_for_bookmark(bookmark_id)
-        return self._row_to_bookmark(row, tags)
+        return self._row_to_bookmark(row)
 
     def create_bookmark(
         self,
@@ -144,7 +197,6 @@ class BookmarkService:
         short_review: str | None = None,
         status: str = "PreWatch",
         public: bool = False,
-        cover_image: str | None = None,
         tag_ids: list[int] = [],
     ):
         """Create a new bookmark"""
@@ -166,7 +218,6 @@ class BookmarkService:
             short_review=short_review,
             status=status,
             public=public,
-            cover_image=cover_image,
         )
         if not row:
             return None
@@ -200,7 +251,6 @@ class BookmarkService:
         short_review: str | None = None,
         status: str | None = None,
         public: bool | None = None,
-        cover_image: str | None = None,
         tag_ids: list[int] | None = None,
         update_watch_from: bool = False,
         update_mood: bool = False,
@@ -224,7 +274,6 @@ class BookmarkService:
             short_review=short_review,
             status=status,
             public=public,
-            cover_image=cover_image,
             update_watch_from=update_watch_from,
             update_mood=update_mood,
         )
@@ -257,9 +306,8 @@ class BookmarkService:
         return self.get_bookmark_by_id(bookmark_id, include_deleted=True)
 
     def update_last_viewed(self, bookmark_id: int):
-        """Update the last_viewed_at timestamp"""
-        row = self.sqlBookmark.update_last_viewed(bookmark_id)
-        return row is not None
+        """Record a view; last_viewed_at is written in batches (see sv_last_viewed)"""
+        last_viewed_buffer.record(bookmark_id)
 
     def update_cover_image(self, bookmark_id: int, cover_image: str):
         """Update the cover image for a bookmark"""
@@ -269,6 +317,15 @@ class BookmarkService:
 
         return self.get_bookmark_by_id(bookmark_id)
 
+    def update_cover_derivatives(
+        self, bookmark_id: int, cover_image: str, thumbnail: str, webp: str | None
+    ):
+        """Record the thumbnail/WebP rendered for a bookmark's cover"""
+        row = self.sqlBookmark.update_cover_derivatives(
+            bookmark_id, cover_image, thumbnail, webp
+        )
+        return row is not None
+
     def add_tag_to_bookmark(self, bookmark_id: int, tag_id: int):
         """Add a tag to a bookmark"""
         row = self.sqlBookmark.add_tag_to_bookmark(bookmark_id, tag_id)
@@ -284,10 +341,4 @@ class BookmarkService:
     ):
         """Get all bookmarks with a specific tag"""
         rows = self.sqlBookmark.get_bookmarks_by_tag(tag_id, user_id, limit)
-        bookmarks = []
-
-        for row in rows:
-            tags = self._get_tags_for_bookmark(row[0])
-            bookmarks.append(self._row_to_bookmark(row, tags))
-
-        return bookmarks
+        return [self._row_to_bookmark(row) for row in rows]
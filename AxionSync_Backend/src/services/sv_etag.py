@@ -0,0 +1,84 @@
+from fastapi import Response
+from src.sql_query.sql_collection_version import SQLCollectionVersion
+from src.sql_query.sql_collection_version_async import AsyncSQLCollectionVersion
+import hashlib
+import json
+
+# Bump when the JSON shape of a list response changes, so ETags issued
+# before a deploy stop matching the new representation
+ETAG_FORMAT = 1
+
+# Per-user lists: never shared caches, always revalidated with If-None-Match
+LIST_CACHE_CONTROL = "private, no-cache"
+
+
+def build_etag(collection: str, user_id: int, version: int, params: tuple) -> str:
+    """
+    Strong ETag for one list response.
+
+    Covers the collection version and every query parameter that shapes
+    the page (filters, limit, cursor), so each distinct request has its own
+    validator and all of them change when the collection does.
+    """
+    raw = json.dumps(
+        [ETAG_FORMAT, collection, user_id, version, *params],
+        separators=(",", ":"),
+        default=str,
+    )
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def set_etag(response: Response, etag: str):
+    """
+    Attach the validator headers to a full list response.
+
+    Call only once the list was fetched successfully. Fetch errors must
+    propagate (503/500) rather than fall back to an empty list: a 200 with
+    the current ETag would be cached and revalidated as 304 until the next
+    write bumps the version.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 answer for a client whose cached list is still current"""
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": LIST_CACHE_CONTROL},
+    )
+
+
+class ETagService:
+    """
+    ETags for the list endpoints, backed by per-user collection versions.
+
+    Every write bumps collection_version for the users whose list it
+    changes (see src.sql_query.sql_collection_version), so checking a
+    client's If-None-Match costs one primary-key lookup instead of loading
+    and serializing the list. The version is read before the list: a write
+    landing in between only makes the next poll refetch.
+    """
+
+    def __init__(self):
+        self.sqlVersion = SQLCollectionVersion()
+        self.asyncSqlVersion = AsyncSQLCollectionVersion()
+
+    def get_etag(self, user_id: int, collection: str, *params) -> str:
+        version = self.sqlVersion.get_version(user_id, collection)
+        return build_etag(collection, user_id, version, params)
+
+    async def get_etag_async(self, user_id: int, collection: str, *params) -> str:
+        version = await self.asyncSqlVersion.get_version(user_id, collection)
+        return build_etag(collection, user_id, version, params)
@@ -0,0 +1,159 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable
+import os
+import threading
+
+# Fixed thumbnail box per image kind (width, height), cropped to fill
+THUMBNAIL_SIZES = {
+    "cover": (300, 450),
+    "avatar": (128, 128),
+}
+# Longest side of the full-size WebP variant of a cover
+WEBP_MAX_SIDE = 1600
+WEBP_QUALITY = 80
+
+
+def _save_webp(img, path: Path):
+    """Write a WebP atomically (temp file + rename) next to the original"""
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.part")
+    img.save(temp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+    os.replace(temp_path, path)
+
+
+def _render_derivatives(source: str, kind: str) -> tuple[str, str | None]:
+    """
+    Produce the derivatives of one uploaded image (runs in a worker process).
+
+    Writes `<stem>_thumb.webp` (fixed THUMBNAIL_SIZES box) for every kind
+    and, for covers, `<stem>_opt.webp` scaled to WEBP_MAX_SIDE. Returns
+    the (thumbnail, webp) filenames; webp is None for avatars.
+    """
+    from PIL import Image, ImageOps
+
+    source_path = Path(source)
+    stem = source_path.stem
+    thumb_name = f"{stem}_thumb.webp"
+    webp_name = f"{stem}_opt.webp" if kind == "cover" else None
+
+    # Blobs are content-addressed: existing derivatives are already correct
+    if source_path.with_name(thumb_name).exists() and (
+        webp_name is None or source_path.with_name(webp_name).exists()
+    ):
+        return thumb_name, webp_name
+
+    with Image.open(source_path) as original:
+        # Animated GIF/WebP: first frame only
+        img = ImageOps.exif_transpose(original)
+        has_alpha = img.mode in ("RGBA", "LA") or "transparency" in img.info
+        img = img.convert("RGBA" if has_alpha else "RGB")
+
+    thumb = ImageOps.fit(img, THUMBNAIL_SIZES[kind], Image.LANCZOS)
+    _save_webp(thumb, source_path.with_name(thumb_name))
+
+    if webp_name is not None:
+        full = img.copy()
+        full.thumbnail((WEBP_MAX_SIDE, WEBP_MAX_SIDE), Image.LANCZOS)
+        _save_webp(full, source_path.with_name(webp_name))
+
+    return thumb_name, webp_name
+
+
+class ImagePipeline:
+    """
+    Background process pool that renders thumbnails and WebP variants.
+
+    Uploads are answered as soon as the original is stored; derivatives are
+    rendered afterwards and handed to the caller's `on_done` callback to
+    record. At most IMAGE_PIPELINE_QUEUE jobs may be pending; beyond that
+    new jobs are skipped (the original keeps being served) rather than
+    queueing unbounded work.
+
+    Environment Variables:
+        IMAGE_PIPELINE_WORKERS: Worker processes (default: 2)
+        IMAGE_PIPELINE_QUEUE: Max pending/running jobs (default: 32)
+    """
+
+    def __init__(self):
+        self.workers = int(os.getenv("IMAGE_PIPELINE_WORKERS", 2))
+        self.queue_limit = int(os.getenv("IMAGE_PIPELINE_QUEUE", 32))
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(self.queue_limit)
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """Drop a broken pool so the next job starts fresh workers"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(
+        self,
+        source: Path,
+        kind: str,
+        on_done: Callable[[str, str | None], None],
+    ) -> bool:
+        """
+        Queue derivative rendering for an uploaded image.
+
+        `on_done(thumbnail, webp)` is called from a pool callback thread once
+        the files exist. Returns False if the job was not queued.
+        """
+        if kind not in THUMBNAIL_SIZES:
+            raise ValueError(f"Unknown image kind: {kind}")
+        if not self._slots.acquire(blocking=False):
+            print(f"[Image] Pipeline busy, skipping derivatives for {source.name}")
+            return False
+
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(_render_derivatives, str(source), kind)
+            except BrokenProcessPool:
+                # A worker died earlier (e.g. OOM on a huge image); the pool
+                # stays broken until replaced
+                self._discard_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(_render_derivatives, str(source), kind)
+        except Exception as e:
+            self._slots.release()
+            print(f"[Image] Could not queue {source.name}: {e}")
+            return False
+
+        def _finished(done: Future):
+            self._slots.release()
+            try:
+                thumbnail, webp = done.result()
+            except BrokenProcessPool as e:
+                self._discard_executor(executor)
+                print(f"[Image] Worker pool broke while rendering {source.name}: {e}")
+                return
+            except Exception as e:
+                print(f"[Image] Failed to render derivatives for {source.name}: {e}")
+                return
+            try:
+                on_done(thumbnail, webp)
+            except Exception as e:
+                print(f"[Image] Failed to record derivatives for {source.name}: {e}")
+
+        future.add_done_callback(_finished)
+        return True
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+image_pipeline = ImagePipeline()
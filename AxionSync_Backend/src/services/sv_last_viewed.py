@@ -0,0 +1,104 @@
+from src.sql_query.sql_bookmark import SQLBookmark
+from datetime import datetime, timezone
+import os
+import threading
+
+
+class LastViewedBuffer:
+    """
+    Write-behind buffer for bookmark last_viewed_at.
+
+    Viewing a bookmark only records the time in memory; repeated views of
+    the same bookmark coalesce into one entry. A background thread flushes
+    the buffer every BOOKMARK_VIEW_FLUSH_INTERVAL seconds (or as soon as it
+    holds BOOKMARK_VIEW_BUFFER_SIZE bookmarks) with a single batched UPDATE,
+    so the detail endpoint stays a pure read. Views not yet flushed are lost
+    if the process dies; shutdown() flushes what is left.
+
+    Environment Variables:
+        BOOKMARK_VIEW_FLUSH_INTERVAL: Seconds between flushes (default: 5)
+        BOOKMARK_VIEW_BUFFER_SIZE: Pending bookmarks that trigger an early flush (default: 1000)
+    """
+
+    def __init__(self):
+        self.flush_interval = float(os.getenv("BOOKMARK_VIEW_FLUSH_INTERVAL", 5))
+        self.buffer_size = int(os.getenv("BOOKMARK_VIEW_BUFFER_SIZE", 1000))
+
+        self.sqlBookmark = SQLBookmark()
+        self._pending: dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+        # Stats
+        self.views_recorded = 0
+        self.rows_flushed = 0
+        self.flush_errors = 0
+
+    def record(self, bookmark_id: int):
+        """Remember that a bookmark was viewed now"""
+        viewed_at = datetime.now(timezone.utc)
+        with self._lock:
+            self._pending[bookmark_id] = viewed_at
+            self.views_recorded += 1
+            pending = len(self._pending)
+            if self._thread is None and not self._stopping:
+                self._thread = threading.Thread(
+                    target=self._run, name="last-viewed-flusher", daemon=True
+                )
+                self._thread.start()
+        if pending >= self.buffer_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write all pending views to the database; returns bookmarks updated"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        try:
+            updated = self.sqlBookmark.update_last_viewed_batch(list(batch.items()))
+        except Exception as e:
+            # Put the views back (newer ones recorded meanwhile win) and retry later
+            with self._lock:
+                for bookmark_id, viewed_at in batch.items():
+                    current = self._pending.get(bookmark_id)
+                    if current is None or current < viewed_at:
+                        self._pending[bookmark_id] = viewed_at
+                self.flush_errors += 1
+            print(f"[LastViewed] Flush of {len(batch)} views failed: {e}")
+            return 0
+
+        self.rows_flushed += updated
+        return updated
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "views_recorded": self.views_recorded,
+            "rows_flushed": self.rows_flushed,
+            "flush_errors": self.flush_errors,
+        }
+
+    def shutdown(self):
+        """Stop the flusher thread and write out the remaining views"""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+
+last_viewed_buffer = LastViewedBuffer()
@@ -1,46 +1,81 @@
 from src.sql_query.sql_memo import SQLMemo
+from src.sql_query.sql_memo_async import AsyncSQLMemo
+from src.sql_query.sql_pagination import (
+    DEFAULT_PAGE_SIZE,
+    clamp_page_size,
+    decode_cursor,
+    next_page_cursor,
+)
 from src.models.entity.en_memo import Memo
 from src.models.entity.en_user import User
+from datetime import datetime
+
+# Keyset for memo listings: (created_at, id) and their row positions
+MEMO_CURSOR_TYPES = (datetime, int)
+MEMO_CURSOR_COLUMNS = (9, 0)
 
 
 class MemoService:
     def __init__(self):
         self.sqlMemo = SQLMemo()
+        self.asyncSqlMemo = AsyncSQLMemo()
+
+    def _row_to_memo(self, row) -> Memo:
+        """Convert a memo listing row (memo columns + user columns) to a Memo"""
+        user = User(
+            id=row[11],
+            username=row[12],
+            firstname=row[13],
+            lastname=row[14],
+            nickname=row[15],
+            role=row[16],
+            tel=row[17],
+            picture_url=row[19] or "unidentified.jpg",
+            created_at=row[18],
+        )
+        return Memo(
+            id=row[0],
+            title=row[1],
+            content=row[2],
+            user=user,
+            tab_id=row[4],
+            font_color=row[5],
+            deleted_status=row[6],
+            collected=row[7],
+            collected_time=row[8],
+            created_at=row[9],
+            updated_at=row[10],
+        )
 
-    def get_memos(self, user_id: int, limit: int = 100, tab_id: int | None = None):
-        """Get all memos for a user"""
-        rows = self.sqlMemo.get_memos(user_id, limit, tab_id)
-        memos = []
-
-        for row in rows:
-            user = User(
-                id=row[11],
-                username=row[12],
-                firstname=row[13],
-                lastname=row[14],
-                nickname=row[15],
-                role=row[16],
-                tel=row[17],
-                picture_url=row[19] or "unidentified.jpg",
-                created_at=row[18],
-            )
-            memos.append(
-                Memo(
-                    id=row[0],
-                    title=row[1],
-                    content=row[2],
-                    user=user,
-                    tab_id=row[4],
-                    font_color=row[5],
-                    deleted_status=row[6],
-                    collected=row[7],
-                    collected_time=row[8],
-                    created_at=row[9],
-                    updated_at=row[10],
-                )
-            )
-
-        return memos
+    def get_memos(
+        self,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        tab_id: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list[Memo], str | None]:
+        """Get one page of memos for a user, plus the cursor for the next page"""
+        limit = clamp_page_size(limit)
+        rows = self.sqlMemo.get_memos(
+            user_id, limit + 1, tab_id, after=decode_cursor(cursor, MEMO_CURSOR_TYPES)
+        )
+        next_cursor = next_page_cursor(rows, limit, MEMO_CURSOR_COLUMNS)
+        return [self._row_to_memo(row) for row in rows[:limit]], next_cursor
+
+    async def get_memos_async(
+        self,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        tab_id: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list[Memo], str | None]:
+        """Get one page of memos for a user (async database path)"""
+        limit = clamp_page_size(limit)
+        rows = await self.asyncSqlMemo.get_memos(
+            user_id, limit + 1, tab_id, after=decode_cursor(cursor, MEMO_CURSOR_TYPES)
+        )
+        next_cursor = next_page_cursor(rows, limit, MEMO_CURSOR_COLUMNS)
+        return [self._row_to_memo(row) for row in rows[:limit]], next_cursor
 
     def get_memo_by_id(self, memo_id: int):
         """Get a single memo by ID"""
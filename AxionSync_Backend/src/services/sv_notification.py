@@ -1,4 +1,11 @@
 from src.sql_query.sql_notification import SQLNotification
+from src.sql_query.sql_notification_async import AsyncSQLNotification
+from src.sql_query.sql_pagination import (
+    DEFAULT_PAGE_SIZE,
+    clamp_page_size,
+    decode_cursor,
+    next_page_cursor,
+)
 from src.models.entity.en_notification import (
     TodoNotification,
     UserDeviceToken,
@@ -11,10 +18,15 @@ from src.models.entity.en_user import User
 from datetime import datetime, timezone
 import json
 
+# Keyset for notification listings: (notify_time, id) and their row positions
+NOTIFICATION_CURSOR_TYPES = (datetime, int)
+NOTIFICATION_CURSOR_COLUMNS = (3, 0)
+
 
 class NotificationService:
     def __init__(self):
         self.sqlNotification = SQLNotification()
+        self.asyncSqlNotification = AsyncSQLNotification()
 
     # ===========================
     #    HELPER: ROW TO MODEL
@@ -75,10 +87,19 @@ class NotificationService:
         self,
         user_id: int,
         include_sent: bool = False,
-    ) -> list[TodoNotification]:
-        """Get all notifications for a user"""
-        rows = self.sqlNotification.get_notifications(user_id, include_sent)
-        return [self._row_to_notification(row) for row in rows]
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> tuple[list[TodoNotification], str | None]:
+        """Get one page of notifications for a user, plus the cursor for the next page"""
+        limit = clamp_page_size(limit)
+        rows = self.sqlNotification.get_notifications(
+            user_id,
+            include_sent,
+            limit + 1,
+            after=decode_cursor(cursor, NOTIFICATION_CURSOR_TYPES),
+        )
+        next_cursor = next_page_cursor(rows, limit, NOTIFICATION_CURSOR_COLUMNS)
+        return [self._row_to_notification(row) for row in rows[:limit]], next_cursor
 
     def get_notification_by_id(self, notification_id: int) -> TodoNotification | None:
         """Get a single notification by ID"""
@@ -87,6 +108,17 @@ class NotificationService:
             return None
         return self._row_to_notification(row)
 
+    def get_notifications_by_ids(
+        self, notification_ids: list[int]
+    ) -> dict[int, TodoNotification]:
+        """Get several notifications by ID, keyed by ID"""
+        rows = self.sqlNotification.get_notifications_by_ids(notification_ids)
+        notifications = {}
+        for row in rows:
+            notification = self._row_to_notification(row)
+            notifications[notification.id] = notification
+        return notifications
+
     def get_notifications_for_todo(self, todo_id: int) -> list[TodoNotification]:
         """Get all notifications for a todo"""
         rows = self.sqlNotification.get_notifications_for_todo(todo_id)
@@ -151,6 +183,15 @@ class NotificationService:
         rows = self.sqlNotification.get_upcoming_notifications(user_id, hours)
         return [self._row_to_upcoming_notification(row) for row in rows]
 
+    async def get_upcoming_notifications_async(
+        self, user_id: int, hours: int = 24
+    ) -> list[UpcomingNotification]:
+        """Get upcoming notifications within the next N hours (async database path)"""
+        rows = await self.asyncSqlNotification.get_upcoming_notifications(
+            user_id, hours
+        )
+        return [self._row_to_upcoming_notification(row) for row in rows]
+
     def get_pending_notifications(
         self, before_time: datetime | None = None
     ) -> list[TodoNotification]:
@@ -260,3 +301,74 @@ class NotificationService:
             retry_count=obj.get("retry_count", 0),
             max_retries=obj.get("max_retries", 3),
         )
+
+    # ===========================
+    #    OUTBOX RELAY
+    # ===========================
+    def relay_outbox(self, redis_queue, limit: int = 500) -> int:
+        """
+        Push one batch of outbox entries to the Redis queue.
+
+        Pending notifications are (re)scheduled with their current payload;
+        deleted or already sent ones are cancelled. The batch goes out as a
+        single pipeline; if Redis fails the entries stay in the outbox.
+
+        Returns:
+            Number of outbox entries drained
+        """
+
+        def apply(rows):
+            payloads = []
+            cancelled_ids = []
+            for row in rows:
+                if row[1] is None or row[6]:
+                    cancelled_ids.append(row[0])
+                else:
+                    payloads.append(self._row_to_job_payload(row))
+            if not redis_queue.apply_schedule_batch(payloads, cancelled_ids):
+                raise RuntimeError("Redis rejected the schedule batch")
+
+        return self.sqlNotification.drain_outbox(limit, apply)
+
+    def reconcile_pending(self, redis_queue, chunk_size: int = 5000) -> dict:
+        """
+        Re-enqueue pending notifications whose Redis job is missing.
+
+        Streams every unsent notification from Postgres and diffs each
+        chunk against Redis with one pipelined lookup, restoring the
+        missing jobs with one more. Rebuilds the queue after Redis was
+        flushed or restarted without persistence.
+
+        Returns:
+            {"scanned": rows checked, "restored": jobs re-enqueued}
+        """
+        restored = 0
+
+        def apply(rows):
+            nonlocal restored
+            missing = redis_queue.find_missing_jobs([row[0] for row in rows])
+            if missing is None:
+                raise RuntimeError("Redis lookup failed during reconciliation")
+            if not missing:
+                return
+            missing_ids = set(missing)
+            payloads = [
+                self._row_to_job_payload(row) for row in rows if row[0] in missing_ids
+            ]
+            if not redis_queue.restore_jobs(payloads):
+                raise RuntimeError("Redis rejected the restored jobs")
+            restored += len(payloads)
+
+        scanned = self.sqlNotification.scan_pending_notifications(chunk_size, apply)
+        return {"scanned": scanned, "restored": restored}
+
+    def _row_to_job_payload(self, row) -> NotificationJobPayload:
+        """Job payload from a (notification_id, todo_id, user_id, notify_time, channel, message, is_sent) row"""
+        return NotificationJobPayload(
+            notification_id=row[0],
+            todo_id=row[1],
+            user_id=row[2],
+            channel=row[4],
+            message=row[5],
+            scheduled_at=row[3],
+        )
@@ -0,0 +1,68 @@
+from src.sql_query.sql_search_async import (
+    AsyncSQLSearch,
+    HEADLINE_START,
+    HEADLINE_STOP,
+)
+from src.sql_query.sql_pagination import (
+    clamp_page_size,
+    decode_cursor,
+    next_page_cursor,
+)
+from src.models.entity.en_search import SearchResult, SEARCH_TYPES
+import html
+
+# Default page size for search (smaller than listings: each hit gets a headline)
+DEFAULT_SEARCH_LIMIT = 20
+
+# Keyset for search results: (rank, type, id) and their row positions
+SEARCH_CURSOR_TYPES = (float, str, int)
+SEARCH_CURSOR_COLUMNS = (3, 0, 1)
+
+
+def render_headline(raw: str) -> str:
+    """HTML-escape a ts_headline snippet, then mark its matches with <mark>"""
+    return (
+        html.escape(raw)
+        .replace(HEADLINE_START, "<mark>")
+        .replace(HEADLINE_STOP, "</mark>")
+    )
+
+
+class SearchService:
+    def __init__(self):
+        self.asyncSqlSearch = AsyncSQLSearch()
+
+    def _row_to_result(self, row) -> SearchResult:
+        return SearchResult(
+            type=row[0],
+            id=row[1],
+            title=row[2],
+            rank=row[3],
+            created_at=row[4],
+            headline=render_headline(row[5] or ""),
+        )
+
+    async def search(
+        self,
+        user_id: int,
+        text: str,
+        types: list[str] | None = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        cursor: str | None = None,
+    ) -> tuple[list[SearchResult], str | None]:
+        """Search a user's memos, todos and bookmarks, one page at a time"""
+        text = text.strip()
+        if not text:
+            return [], None
+
+        kinds = [kind for kind in SEARCH_TYPES if not types or kind in types]
+        limit = clamp_page_size(limit)
+        rows = await self.asyncSqlSearch.search(
+            user_id,
+            text,
+            kinds,
+            limit + 1,
+            after=decode_cursor(cursor, SEARCH_CURSOR_TYPES),
+        )
+        next_cursor = next_page_cursor(rows, limit, SEARCH_CURSOR_COLUMNS)
+        return [self._row_to_result(row) for row in rows[:limit]], next_cursor
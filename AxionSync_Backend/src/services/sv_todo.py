@@ -1,4 +1,11 @@
 from src.sql_query.sql_todo import SQLTodo
+from src.sql_query.sql_todo_async import AsyncSQLTodo
+from src.sql_query.sql_pagination import (
+    DEFAULT_PAGE_SIZE,
+    clamp_page_size,
+    decode_cursor,
+    next_page_cursor,
+)
 from src.models.entity.en_todo import (
     Todo,
     TodoItem,
@@ -13,12 +20,80 @@ from src.models.entity.en_todo import (
     TODO_MOODS,
 )
 from src.models.entity.en_user import User
-from datetime import datetime, date
+from collections import OrderedDict, defaultdict
+from datetime import datetime, date, timedelta, timezone
+import asyncio
+import os
+import threading
+import time
+
+# Keyset for todo listings: (due_date, created_at, id) and their row positions
+TODO_CURSOR_TYPES = (datetime, datetime, int)
+TODO_CURSOR_COLUMNS = (5, 12, 0)
+
+
+class _AnalyticsCache:
+    """
+    Per-user TTL cache of TodoAnalytics for dashboard polling.
+
+    Shared by every TodoService in the process and invalidated by todo
+    writes, so the TTL only bounds staleness from writers in other
+    processes (e.g. the recurring worker or other API replicas).
+
+    Environment Variables:
+        TODO_ANALYTICS_CACHE_TTL: Seconds an entry stays valid (default: 60)
+        TODO_ANALYTICS_CACHE_SIZE: Maximum cached users (default: 10000)
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[int, tuple[TodoAnalytics, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> TodoAnalytics | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            analytics, expires_at = entry
+            if expires_at <= now:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return analytics
+
+    def put(self, user_id: int, analytics: TodoAnalytics):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (analytics, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int | None):
+        if user_id is None:
+            return
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_analytics_cache = _AnalyticsCache(
+    ttl=float(os.getenv("TODO_ANALYTICS_CACHE_TTL", 60)),
+    max_size=int(os.getenv("TODO_ANALYTICS_CACHE_SIZE", 10000)),
+)
 
 
 class TodoService:
     def __init__(self):
         self.sqlTodo = SQLTodo()
+        self.asyncSqlTodo = AsyncSQLTodo()
 
     # ===========================
     #    HELPER: ROW TO MODEL
@@ -196,60 +271,89 @@ class TodoService:
         if not todo_row:
             return None
 
-        todo_id = todo_row[0]
+        todos = self._get_todos_with_relations([todo_row])
+        return todos[0] if todos else None
 
-        # Get items
-        try:
-            item_rows = self.sqlTodo.get_todo_items(todo_id)
-            items = []
-            if item_rows:
-                for row in item_rows:
-                    try:
-                        item = self._row_to_todo_item(row)
-                        if item:
-                            items.append(item)
-                    except Exception as e:
-                        print(f"Error converting item row: {e}")
-                        continue
-        except Exception as e:
-            print(f"Error getting items for todo {todo_id}: {e}")
-            items = []
+    def _get_todos_with_relations(self, todo_rows) -> list[Todo]:
+        """
+        Get a page of todos with all relations (items, tags, shares).
 
-        # Get tags
-        try:
-            tag_rows = self.sqlTodo.get_tags_for_todo(todo_id)
-            tags = []
-            if tag_rows:
-                for row in tag_rows:
-                    try:
-                        tag = self._row_to_todo_tag(row)
-                        if tag and tag.id > 0:
-                            tags.append(tag)
-                    except Exception as e:
-                        print(f"Error converting tag row: {e}")
-                        continue
-        except Exception as e:
-            print(f"Error getting tags for todo {todo_id}: {e}")
-            tags = []
+        Each relation type is loaded for every todo on the page in a single
+        query and grouped in memory, so the number of round trips does not
+        grow with the page size.
+        """
+        if not todo_rows:
+            return []
 
-        # Get shares
-        try:
-            share_rows = self.sqlTodo.get_todo_shares(todo_id)
-            shares = []
-            if share_rows:
-                for row in share_rows:
-                    try:
-                        share = self._row_to_todo_share(row)
-                        if share:
-                            shares.append(share)
-                    except Exception as e:
-                        print(f"Error converting share row: {e}")
-                        continue
-        except Exception as e:
-            print(f"Error getting shares for todo {todo_id}: {e}")
-            shares = []
+        todo_ids = [row[0] for row in todo_rows]
+        return self._attach_relations(
+            todo_rows,
+            self.sqlTodo.get_todo_items_for_todos(todo_ids),
+            self.sqlTodo.get_tags_for_todos(todo_ids),
+            self.sqlTodo.get_shares_for_todos(todo_ids),
+        )
+
+    async def _get_todos_with_relations_async(self, todo_rows) -> list[Todo]:
+        """Async variant of _get_todos_with_relations (relations load concurrently)"""
+        if not todo_rows:
+            return []
+
+        todo_ids = [row[0] for row in todo_rows]
+        item_rows, tag_rows, share_rows = await asyncio.gather(
+            self.asyncSqlTodo.get_todo_items_for_todos(todo_ids),
+            self.asyncSqlTodo.get_tags_for_todos(todo_ids),
+            self.asyncSqlTodo.get_shares_for_todos(todo_ids),
+        )
+        return self._attach_relations(todo_rows, item_rows, tag_rows, share_rows)
+
+    def _attach_relations(
+        self, todo_rows, item_rows, tag_rows, share_rows
+    ) -> list[Todo]:
+        """Group bulk-loaded relation rows by todo_id and build Todo models"""
+        items_by_todo: dict[int, list[TodoItem]] = defaultdict(list)
+        tags_by_todo: dict[int, list[TodoTag]] = defaultdict(list)
+        shares_by_todo: dict[int, list[TodoShare]] = defaultdict(list)
+
+        for row in item_rows or []:
+            try:
+                item = self._row_to_todo_item(row)
+                if item:
+                    items_by_todo[item.todo_id].append(item)
+            except Exception as e:
+                print(f"Error converting item row: {e}")
+                continue
+
+        # Tag rows carry todo_id as the last column
+        for row in tag_rows or []:
+            try:
+                tag = self._row_to_todo_tag(row)
+                if tag and tag.id > 0:
+                    tags_by_todo[row[5]].append(tag)
+            except Exception as e:
+                print(f"Error converting tag row: {e}")
+                continue
 
-        return self._row_to_todo(todo_row, items, tags, shares)
+        for row in share_rows or []:
+            try:
+                share = self._row_to_todo_share(row)
+                if share:
+                    shares_by_todo[share.todo_id].append(share)
+            except Exception as e:
+                print(f"Error converting share row: {e}")
+                continue
+
+        todos = []
+        for row in todo_rows:
+            todo_id = row[0]
+            todo = self._row_to_todo(
+                row,
+                items_by_todo.get(todo_id, []),
+                tags_by_todo.get(todo_id, []),
+                shares_by_todo.get(todo_id, []),
+            )
+            if todo:
+                todos.append(todo)
+        return todos
 
     # ===========================
     #    TODO CRUD
@@ -260,20 +364,21 @@ class TodoService:
         status: str | None = None,
         priority: str | None = None,
         include_deleted: bool = False,
-    ) -> list[Todo]:
-        """Get all todos for a user"""
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> tuple[list[Todo], str | None]:
+        """Get one page of todos for a user, plus the cursor for the next page"""
+        limit = clamp_page_size(limit)
         rows = self.sqlTodo.get_todos(
             user_id,
+            limit=limit + 1,
             status=status,
             priority=priority,
             include_deleted=include_deleted,
+            after=decode_cursor(cursor, TODO_CURSOR_TYPES),
         )
-        todos = []
-        for row in rows:
-            todo = self._get_todo_with_relations(row)
-            if todo:
-                todos.append(todo)
-        return todos
+        next_cursor = next_page_cursor(rows, limit, TODO_CURSOR_COLUMNS)
+        return self._get_todos_with_relations(rows[:limit]), next_cursor
 
     def get_todo_by_id(
         self, todo_id: int, include_deleted: bool = False
@@ -282,6 +387,38 @@ class TodoService:
         row = self.sqlTodo.get_todo_by_id(todo_id, include_deleted)
         return self._get_todo_with_relations(row)
 
+    async def get_todos_async(
+        self,
+        user_id: int,
+        status: str | None = None,
+        priority: str | None = None,
+        include_deleted: bool = False,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> tuple[list[Todo], str | None]:
+        """Get one page of todos for a user (async database path)"""
+        limit = clamp_page_size(limit)
+        rows = await self.asyncSqlTodo.get_todos(
+            user_id,
+            limit=limit + 1,
+            status=status,
+            priority=priority,
+            include_deleted=include_deleted,
+            after=decode_cursor(cursor, TODO_CURSOR_TYPES),
+        )
+        next_cursor = next_page_cursor(rows, limit, TODO_CURSOR_COLUMNS)
+        return await self._get_todos_with_relations_async(rows[:limit]), next_cursor
+
+    async def get_todo_by_id_async(
+        self, todo_id: int, include_deleted: bool = False
+    ) -> Todo | None:
+        """Get a single todo by ID (async database path)"""
+        row = await self.asyncSqlTodo.get_todo_by_id(todo_id, include_deleted)
+        if not row:
+            return None
+        todos = await self._get_todos_with_relations_async([row])
+        return todos[0] if todos else None
+
     def create_todo(
         self,
         title: str,
@@ -319,6 +456,7 @@ class TodoService:
 
         # Add initial status history
         self.sqlTodo.add_status_history(todo_id, "", status, user_id)
+        _analytics_cache.invalidate(user_id)
 
         return self.get_todo_by_id(todo_id)
 
@@ -365,22 +503,31 @@ class TodoService:
         # Add status history if status changed
         if status and status != old_status:
             self.sqlTodo.add_status_history(todo_id, old_status, status, user_id)
+            _analytics_cache.invalidate(row[10])
 
         return self.get_todo_by_id(todo_id)
 
     def delete_todo(self, todo_id: int) -> bool:
         """Soft delete a todo"""
         result = self.sqlTodo.delete_todo(todo_id)
-        return result is not None
+        if result is None:
+            return False
+        _analytics_cache.invalidate(result[1])
+        return True
 
     def delete_todo_permanent(self, todo_id: int) -> bool:
         """Hard delete a todo"""
         result = self.sqlTodo.delete_todo_permanent(todo_id)
-        return result is not None
+        if result is None:
+            return False
+        _analytics_cache.invalidate(result[1])
+        return True
 
     def restore_todo(self, todo_id: int) -> Todo | None:
         """Restore a soft-deleted todo"""
-        self.sqlTodo.restore_todo(todo_id)
+        row = self.sqlTodo.restore_todo(todo_id)
+        if row:
+            _analytics_cache.invalidate(row[10])
         return self.get_todo_by_id(todo_id, include_deleted=True)
 
     def update_todo_status(
@@ -400,6 +547,7 @@ class TodoService:
         # Add status history
         if new_status != old_status:
             self.sqlTodo.add_status_history(todo_id, old_status, new_status, user_id)
+            _analytics_cache.invalidate(row[10])
 
         return self.get_todo_by_id(todo_id)
 
@@ -514,12 +662,7 @@ class TodoService:
     def get_todos_by_tag(self, tag_id: int, user_id: int) -> list[Todo]:
         """Get todos by tag"""
         rows = self.sqlTodo.get_todos_by_tag(tag_id, user_id)
-        todos = []
-        for row in rows:
-            todo = self._get_todo_with_relations(row)
-            if todo:
-                todos.append(todo)
-        return todos
+        return self._get_todos_with_relations(rows)
 
     # ===========================
     #    TODO SHARING
@@ -593,50 +736,36 @@ class TodoService:
     #    STREAK & ANALYTICS
     # ===========================
     def get_streak_summary(self, user_id: int) -> StreakSummary:
-        """Get streak summary for a user"""
-        try:
-            row = self.sqlTodo.get_streak_summary_raw(user_id)
-            if not row or len(row) < 4:
-                return StreakSummary(
-                    current_streak=0,
-                    longest_streak=0,
-                    total_completed=0,
-                    last_completed_date=None,
-                )
-
-            # Safe conversion function
-            def safe_int(value):
-                if value is None:
-                    return 0
-                try:
-                    return int(value)
-                except (ValueError, TypeError):
-                    print(
-                        f"Warning: Could not convert streak value '{value}' to int, using 0"
-                    )
-                    return 0
-
-            return StreakSummary(
-                current_streak=safe_int(row[0]),
-                longest_streak=safe_int(row[1]),
-                total_completed=safe_int(row[2]),
-                last_completed_date=row[3] if row[3] else None,
-            )
-        except Exception as e:
-            print(f"Error in get_streak_summary: {e}")
-            return StreakSummary(
-                current_streak=0,
-                longest_streak=0,
-                total_completed=0,
-                last_completed_date=None,
-            )
+        """Get streak summary for a user (shares the cached analytics row)"""
+        return self.get_analytics(user_id).streak
 
     def get_analytics(self, user_id: int) -> TodoAnalytics:
-        """Get todo analytics for a user"""
-        stats_row = self.sqlTodo.get_todo_stats(user_id)
-        streak = self.get_streak_summary(user_id)
+        """
+        Get todo analytics for a user.
 
-        if not stats_row or len(stats_row) < 5:
+        Counts and streak come from one row: the todo_user_stats summary, or
+        a single combined query for users without one. Results are cached
+        per user until the next todo write or the cache TTL.
+        """
+        cached = _analytics_cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        empty_streak = StreakSummary(
+            current_streak=0,
+            longest_streak=0,
+            total_completed=0,
+            last_completed_date=None,
+        )
+        try:
+            row = self.sqlTodo.get_user_stats(user_id)
+            if not row:
+                row = self.sqlTodo.get_analytics_raw(user_id)
+        except Exception as e:
+            print(f"Error in get_analytics: {e}")
+            row = None
+
+        if not row or len(row) < 9:
             return TodoAnalytics(
                 total_todos=0,
                 completed_todos=0,
@@ -644,7 +773,7 @@ class TodoService:
                 in_progress_todos=0,
                 cancelled_todos=0,
                 completion_rate=0.0,
-                streak=streak,
+                streak=empty_streak,
             )
 
         try:
@@ -658,18 +787,23 @@ class TodoService:
                     print(f"Warning: Could not convert '{value}' to int, using 0")
                     return 0
 
-            total = safe_int(stats_row[0])
-            completed = safe_int(stats_row[1])
+            total = safe_int(row[0])
+            completed = safe_int(row[1])
             completion_rate = (completed / total * 100) if total > 0 else 0.0
 
-            return TodoAnalytics(
+            analytics = TodoAnalytics(
                 total_todos=total,
                 completed_todos=completed,
-                pending_todos=safe_int(stats_row[2]),
-                in_progress_todos=safe_int(stats_row[3]),
-                cancelled_todos=safe_int(stats_row[4]),
+                pending_todos=safe_int(row[2]),
+                in_progress_todos=safe_int(row[3]),
+                cancelled_todos=safe_int(row[4]),
                 completion_rate=round(completion_rate, 2),
-                streak=streak,
+                streak=StreakSummary(
+                    current_streak=safe_int(row[5]),
+                    longest_streak=safe_int(row[6]),
+                    total_completed=safe_int(row[7]),
+                    last_completed_date=row[8] if row[8] else None,
+                ),
             )
         except Exception as e:
             print(f"Error in get_analytics: {e}")
@@ -680,9 +814,12 @@ class TodoService:
                 in_progress_todos=0,
                 cancelled_todos=0,
                 completion_rate=0.0,
-                streak=streak,
+                streak=empty_streak,
             )
 
+        _analytics_cache.put(user_id, analytics)
+        return analytics
+
     # ===========================
     #    SPECIAL QUERIES
     # ===========================
@@ -694,19 +831,25 @@ class TodoService:
     ) -> list[Todo]:
         """Get todos within a date range"""
         rows = self.sqlTodo.get_todos_by_due_date(user_id, start_date, end_date)
-        todos = []
-        for row in rows:
-            todo = self._get_todo_with_relations(row)
-            if todo:
-                todos.append(todo)
-        return todos
+        return self._get_todos_with_relations(rows)
 
     def get_overdue_todos(self, user_id: int) -> list[Todo]:
         """Get overdue todos"""
         rows = self.sqlTodo.get_overdue_todos(user_id)
-        todos = []
-        for row in rows:
-            todo = self._get_todo_with_relations(row)
-            if todo:
-                todos.append(todo)
-        return todos
+        return self._get_todos_with_relations(rows)
+
+    # ===========================
+    #    RECURRING TODOS
+    # ===========================
+    def materialize_recurring_todos(self, horizon_days: int = 7) -> int:
+        """
+        Generate occurrences of repeating todos due within the next N days.
+
+        Safe to run repeatedly or from several workers; each period is
+        created at most once. Returns the number of occurrences created.
+        """
+        horizon = datetime.now(timezone.utc) + timedelta(days=horizon_days)
+        created = self.sqlTodo.materialize_recurring_todos(horizon)
+        if created:
+            _analytics_cache.clear()
+        return len(created)
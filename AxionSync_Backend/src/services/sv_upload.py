@@ -0,0 +1,83 @@
+from fastapi import UploadFile
+from pathlib import Path
+import hashlib
+import os
+import uuid
+import aiofiles
+import aiofiles.os
+
+# Upload limits (bytes)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 64 * 1024))
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the allowed size"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File too large. Maximum size is {max_bytes / (1024 * 1024):.1f} MB")
+        self.max_bytes = max_bytes
+
+
+class StoredUpload:
+    """A file written to disk by stream_upload"""
+
+    def __init__(self, path: Path, size: int, sha256: str):
+        self.path = path
+        self.filename = path.name
+        self.size = size
+        self.sha256 = sha256
+
+
+async def stream_upload(
+    file: UploadFile,
+    directory: Path,
+    max_bytes: int = UPLOAD_MAX_BYTES,
+) -> StoredUpload:
+    """
+    Stream an uploaded file into a temp file in `directory` without buffering it.
+
+    The body is copied in UPLOAD_CHUNK_SIZE chunks (non-blocking via
+    aiofiles) while the SHA-256 is computed. Anything over `max_bytes` is
+    rejected as soon as the limit is crossed and the temp file is removed.
+    The returned path is the temp file; the caller renames it into place
+    (same directory, so the rename is atomic) or discards it.
+
+    Raises:
+        UploadTooLargeError: The upload is larger than max_bytes
+    """
+    # Size is known up front when the client sent it; reject without copying
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    await aiofiles.os.makedirs(directory, exist_ok=True)
+    temp_path = directory / f".upload-{uuid.uuid4().hex}.part"
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        await discard_upload(temp_path)
+        raise
+
+    return StoredUpload(temp_path, size, digest.hexdigest())
+
+
+async def discard_upload(path: Path):
+    """Remove an uploaded file if it exists (e.g. after a failed DB update)"""
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"[UPLOAD] Could not remove {path}: {e}")
@@ -22,6 +22,7 @@ class UserService:
                     role=row[5],
                     tel=row[6],
                     picture_url=row[7] or "unidentified.jpg",
+                    picture_thumbnail=row[9],
                     created_at=row[8],
                 )
             )
@@ -42,6 +43,7 @@ class UserService:
             role=row[5],
             tel=row[6],
             picture_url=row[7] or "unidentified.jpg",
+            picture_thumbnail=row[10] if len(row) > 10 else None,
             created_at=row[8],
             updated_at=row[9] if len(row) > 9 else None,
         )
@@ -156,6 +158,10 @@ class UserService:
             updated_at=row[9],
         )
 
+    def update_picture_thumbnail(self, user_id: int, picture_url: str, thumbnail: str):
+        row = self.sqlUser.update_picture_thumbnail(user_id, picture_url, thumbnail)
+        return row is not None
+
     def delete_user(self, user_id: int):
         row = self.sqlUser.delete_user(user_id)
         return row is not None
@@ -0,0 +1,82 @@
+from src.database.connect import Database
+from typing import Callable
+
+# Drop one reference to a stored image. Run inside the same transaction that
+# stops pointing at the file (cover/picture replaced, bookmark deleted).
+RELEASE_BLOB_QUERY = """
+    UPDATE image_blob
+    SET ref_count = GREATEST(ref_count - 1, 0), updated_at = NOW()
+    WHERE kind = %s AND filename = %s;
+"""
+
+
+class SQLBlob:
+    """Reference counts for content-addressed uploaded images (image_blob)"""
+
+    def __init__(self):
+        self.db = Database()
+
+    def acquire_blob(self, kind: str, sha256: str, filename: str, size: int):
+        """
+        Take a reference to the blob with this content, registering it if new.
+
+        Returns the blob's filename: the existing one when the same content
+        was stored before (possibly under another extension), else `filename`.
+        Holding a reference keeps the garbage collector away from the file,
+        so callers acquire first and only then make sure the file exists.
+        """
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO image_blob AS ib (kind, sha256, filename, size, ref_count, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, 1, NOW(), NOW())
+                ON CONFLICT (kind, sha256) DO UPDATE
+                SET ref_count = ib.ref_count + 1, updated_at = NOW()
+                RETURNING filename;
+            """,
+                (kind, sha256, filename, size),
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def release_blob(self, kind: str, filename: str):
+        """Drop one reference (e.g. the new file was not used after all)"""
+        with self.db.cursor() as cursor:
+            cursor.execute(RELEASE_BLOB_QUERY, (kind, filename))
+
+    def collect_garbage(
+        self,
+        grace_seconds: float,
+        limit: int,
+        remove_files: Callable[[list[tuple[str, str]]], None],
+    ) -> int:
+        """
+        Delete unreferenced blobs idle for longer than `grace_seconds`.
+
+        `remove_files([(kind, filename), ...])` runs before the transaction
+        commits, while the deleted rows are still locked: a concurrent
+        acquire_blob for the same content waits, then registers a fresh row
+        and rewrites the file, so a file is never removed from under a new
+        reference. Returns the number of blobs collected.
+        """
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM image_blob
+                WHERE (kind, sha256) IN (
+                    SELECT kind, sha256
+                    FROM image_blob
+                    WHERE ref_count = 0
+                      AND updated_at < NOW() - make_interval(secs => %s)
+                    ORDER BY updated_at
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING kind, filename;
+            """,
+                (grace_seconds, limit),
+            )
+            rows = cursor.fetchall()
+            if rows:
+                remove_files([(row[0], row[1]) for row in rows])
+            return len(rows)
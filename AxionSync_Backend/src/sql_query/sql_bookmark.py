@@ -1,13 +1,46 @@
 from src.database.connect import Database
+from src.sql_query.sql_blob import RELEASE_BLOB_QUERY
+from src.sql_query.sql_collection_version import (
+    BOOKMARK_AUDIENCE,
+    BOOKMARK_COLLECTION,
+    bump_collection_version,
+)
+from psycopg2.extras import execute_values
 from typing import Any
 from datetime import datetime
 import json
 
+# Tags for each bookmark aggregated into one JSON array column, so listings
+# return bookmarks with their tags in a single round trip
+TAGS_JSON_COLUMN = """
+    COALESCE(
+        (
+            SELECT json_agg(
+                       json_build_object('id', t.id, 'name', t.name, 'tag_priority', t.tag_priority)
+                       ORDER BY t.tag_priority DESC, t.name ASC
+                   )
+            FROM bookmark_tag bt_tags
+            INNER JOIN tag t ON t.id = bt_tags.tag_id
+            WHERE bt_tags.bookmark_id = b.id
+        ),
+        '[]'::json
+    ) AS tags
+"""
+
+# Minimum pg_trgm word similarity for a fuzzy name match (0..1)
+FUZZY_NAME_THRESHOLD = 0.3
+
 
 class SQLBookmark:
     def __init__(self):
         self.db = Database()
 
+    def _bump_version(self, cursor, bookmark_id: int):
+        """Invalidate the owner's bookmark list ETag (same transaction)"""
+        bump_collection_version(
+            cursor, BOOKMARK_COLLECTION, BOOKMARK_AUDIENCE, (bookmark_id,)
+        )
+
     def get_bookmarks(
         self,
         user_id: int,
@@ -15,9 +48,15 @@ class SQLBookmark:
         bookmark_type: str | None = None,
         status: str | None = None,
         include_deleted: bool = False,
+        after: tuple | None = None,
     ):
-        """Fetch bookmarks for a user with optional filters"""
-        query = """
+        """
+        Fetch bookmarks for a user with optional filters.
+
+        `after` is the (created_at, id) key of the last bookmark on the
+        previous page.
+        """
+        query = f"""
             SELECT b.id, b.name, b.type, b.review, b.watch_from, b.release_time, 
                    b.time_used, b.rating, b.story_rating, b.action_rating, 
                    b.graphic_rating, b.sound_rating, b.chapter, b.mood, 
@@ -25,7 +64,9 @@ class SQLBookmark:
                    b.user_id, b.created_at, b.updated_at, b.cover_image, 
                    b.deleted_status, b.last_viewed_at,
                    u.id, u.username, u.firstname, u.lastname, u.nickname, 
-                   u.role, u.tel, u.created_at, u.picture_url
+                   u.role, u.tel, u.created_at, u.picture_url,
+                   {TAGS_JSON_COLUMN},
+                   b.cover_thumbnail, b.cover_webp
             FROM bookmark b
             INNER JOIN "user" u ON b.user_id = u.id
             WHERE b.user_id = %s
@@ -43,15 +84,76 @@ class SQLBookmark:
             query += " AND b.status = %s"
             params.append(status)
 
-        query += " ORDER BY b.created_at DESC LIMIT %s;"
+        if after is not None:
+            query += " AND (b.created_at, b.id) < (%s, %s)"
+            params.extend(after)
+
+        query += " ORDER BY b.created_at DESC, b.id DESC LIMIT %s;"
         params.append(limit)
 
-        self.db.cursor.execute(query, tuple(params))
-        return self.db.cursor.fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            return cursor.fetchall()
+
+    def search_bookmarks(
+        self,
+        user_id: int,
+        text: str,
+        limit: int = 20,
+        bookmark_type: str | None = None,
+        status: str | None = None,
+    ):
+        """
+        Typo-tolerant bookmark name lookup, best matches first.
+
+        Uses pg_trgm word similarity (`<%`), so a partial or misspelled
+        title ("Shingeki", "shingeky") matches "Shingeki no Kyojin". The
+        operator is served by the idx_bookmark_name_trgm GIN index.
+        """
+        query = f"""
+            SELECT b.id, b.name, b.type, b.review, b.watch_from, b.release_time, 
+                   b.time_used, b.rating, b.story_rating, b.action_rating, 
+                   b.graphic_rating, b.sound_rating, b.chapter, b.mood, 
+                   b.review_version, b.short_review, b.status, b.public, 
+                   b.user_id, b.created_at, b.updated_at, b.cover_image, 
+                   b.deleted_status, b.last_viewed_at,
+                   u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                   u.role, u.tel, u.created_at, u.picture_url,
+                   {TAGS_JSON_COLUMN},
+                   b.cover_thumbnail, b.cover_webp
+            FROM bookmark b
+            INNER JOIN "user" u ON b.user_id = u.id
+            WHERE b.user_id = %s AND b.deleted_status = FALSE
+              AND %s <%% b.name
+        """
+        params: list[Any] = [user_id, text]
+
+        if bookmark_type is not None:
+            query += " AND b.type = %s"
+            params.append(bookmark_type)
+
+        if status is not None:
+            query += " AND b.status = %s"
+            params.append(status)
+
+        query += """
+            ORDER BY word_similarity(%s, b.name) DESC, similarity(%s, b.name) DESC, b.id DESC
+            LIMIT %s;
+        """
+        params.extend([text, text, limit])
+
+        with self.db.cursor() as cursor:
+            # Transaction-local threshold for the <% operator
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true);",
+                (str(FUZZY_NAME_THRESHOLD),),
+            )
+            cursor.execute(query, tuple(params))
+            return cursor.fetchall()
 
     def get_public_bookmarks(self, limit: int = 100, bookmark_type: str | None = None):
         """Fetch public bookmarks"""
-        query = """
+        query = f"""
             SELECT b.id, b.name, b.type, b.review, b.watch_from, b.release_time, 
                    b.time_used, b.rating, b.story_rating, b.action_rating, 
                    b.graphic_rating, b.sound_rating, b.chapter, b.mood, 
@@ -59,7 +161,9 @@ class SQLBookmark:
                    b.user_id, b.created_at, b.updated_at, b.cover_image, 
                    b.deleted_status, b.last_viewed_at,
                    u.id, u.username, u.firstname, u.lastname, u.nickname, 
-                   u.role, u.tel, u.created_at, u.picture_url
+                   u.role, u.tel, u.created_at, u.picture_url,
+                   {TAGS_JSON_COLUMN},
+                   b.cover_thumbnail, b.cover_webp
             FROM bookmark b
             INNER JOIN "user" u ON b.user_id = u.id
             WHERE b.public = TRUE AND b.deleted_status = FALSE
@@ -73,12 +177,13 @@ class SQLBookmark:
         query += " ORDER BY b.created_at DESC LIMIT %s;"
         params.append(limit)
 
-        self.db.cursor.execute(query, tuple(params))
-        return self.db.cursor.fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            return cursor.fetchall()
 
     def get_bookmark_by_id(self, bookmark_id: int, include_deleted: bool = False):
         """Fetch a single bookmark by ID with user info"""
-        query = """
+        query = f"""
             SELECT b.id, b.name, b.type, b.review, b.watch_from, b.release_time, 
                    b.time_used, b.rating, b.story_rating, b.action_rating, 
                    b.graphic_rating, b.sound_rating, b.chapter, b.mood, 
@@ -86,7 +191,9 @@ class SQLBookmark:
                    b.user_id, b.created_at, b.updated_at, b.cover_image, 
                    b.deleted_status, b.last_viewed_at,
                    u.id, u.username, u.firstname, u.lastname, u.nickname, 
-                   u.role, u.tel, u.created_at, u.picture_url
+                   u.role, u.tel, u.created_at, u.picture_url,
+                   {TAGS_JSON_COLUMN},
+                   b.cover_thumbnail, b.cover_webp
             FROM bookmark b
             INNER JOIN "user" u ON b.user_id = u.id
             WHERE b.id = %s
@@ -95,8 +202,9 @@ class SQLBookmark:
             query += " AND b.deleted_status = FALSE"
         query += ";"
 
-        self.db.cursor.execute(query, (bookmark_id,))
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, (bookmark_id,))
+            return cursor.fetchone()
 
     def create_bookmark(
         self,
@@ -117,51 +225,57 @@ class SQLBookmark:
         short_review: str | None = None,
         status: str = "PreWatch",
         public: bool = False,
-        cover_image: str | None = None,
     ):
-        """Create a new bookmark and return the created row"""
+        """
+        Create a new bookmark and return the created row.
+
+        The cover is set afterwards through update_cover_image, which keeps
+        the image_blob reference counts in step.
+        """
         watch_from_json = json.dumps(watch_from) if watch_from else None
         mood_json = json.dumps(mood) if mood else None
 
-        self.db.cursor.execute(
-            """
-            INSERT INTO bookmark (
-                name, type, review, watch_from, release_time, time_used,
-                rating, story_rating, action_rating, graphic_rating, sound_rating,
-                chapter, mood, review_version, short_review, status, public,
-                user_id, cover_image, deleted_status, created_at
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO bookmark (
+                    name, type, review, watch_from, release_time, time_used,
+                    rating, story_rating, action_rating, graphic_rating, sound_rating,
+                    chapter, mood, review_version, short_review, status, public,
+                    user_id, deleted_status, created_at
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 1, %s, %s, %s, %s, FALSE, NOW())
+                RETURNING id, name, type, review, watch_from, release_time, 
+                          time_used, rating, story_rating, action_rating, 
+                          graphic_rating, sound_rating, chapter, mood, 
+                          review_version, short_review, status, public, 
+                          user_id, created_at, updated_at, cover_image, 
+                          deleted_status, last_viewed_at;
+            """,
+                (
+                    name,
+                    bookmark_type,
+                    review,
+                    watch_from_json,
+                    release_time,
+                    time_used,
+                    rating,
+                    story_rating,
+                    action_rating,
+                    graphic_rating,
+                    sound_rating,
+                    chapter,
+                    mood_json,
+                    short_review,
+                    status,
+                    public,
+                    user_id,
+                ),
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 1, %s, %s, %s, %s, %s, FALSE, NOW())
-            RETURNING id, name, type, review, watch_from, release_time, 
-                      time_used, rating, story_rating, action_rating, 
-                      graphic_rating, sound_rating, chapter, mood, 
-                      review_version, short_review, status, public, 
-                      user_id, created_at, updated_at, cover_image, 
-                      deleted_status, last_viewed_at;
-        """,
-            (
-                name,
-                bookmark_type,
-                review,
-                watch_from_json,
-                release_time,
-                time_used,
-                rating,
-                story_rating,
-                action_rating,
-                graphic_rating,
-                sound_rating,
-                chapter,
-                mood_json,
-                short_review,
-                status,
-                public,
-                user_id,
-                cover_image,
-            ),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+            row = cursor.fetchone()
+            if row:
+                self._bump_version(cursor, row[0])
+            return row
 
     def update_bookmark(
         self,
@@ -182,7 +296,6 @@ class SQLBookmark:
         short_review: str | None = None,
         status: str | None = None,
         public: bool | None = None,
-        cover_image: str | None = None,
         update_watch_from: bool = False,
         update_mood: bool = False,
     ):
@@ -254,10 +367,6 @@ class SQLBookmark:
             updates.append("public = %s")
             params.append(public)
 
-        if cover_image is not None:
-            updates.append("cover_image = %s")
-            params.append(cover_image)
-
         params.append(bookmark_id)
 
         query = f"""
@@ -272,88 +381,159 @@ class SQLBookmark:
                       deleted_status, last_viewed_at;
         """
 
-        self.db.cursor.execute(query, tuple(params))
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            row = cursor.fetchone()
+            if row:
+                self._bump_version(cursor, row[0])
+            return row
 
     def soft_delete_bookmark(self, bookmark_id: int):
         """Soft delete a bookmark"""
-        self.db.cursor.execute(
-            """
-            UPDATE bookmark
-            SET deleted_status = TRUE, updated_at = NOW()
-            WHERE id = %s
-            RETURNING id;
-        """,
-            (bookmark_id,),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE bookmark
+                SET deleted_status = TRUE, updated_at = NOW()
+                WHERE id = %s
+                RETURNING id;
+            """,
+                (bookmark_id,),
+            )
+            row = cursor.fetchone()
+            if row:
+                self._bump_version(cursor, bookmark_id)
+            return row
 
     def hard_delete_bookmark(self, bookmark_id: int):
-        """Permanently delete a bookmark"""
-        self.db.cursor.execute(
-            """
-            DELETE FROM bookmark
-            WHERE id = %s
-            RETURNING id;
-        """,
-            (bookmark_id,),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        """Permanently delete a bookmark (and release its cover image)"""
+        with self.db.cursor() as cursor:
+            self._bump_version(cursor, bookmark_id)
+            cursor.execute(
+                """
+                DELETE FROM bookmark
+                WHERE id = %s
+                RETURNING id, cover_image;
+            """,
+                (bookmark_id,),
+            )
+            row = cursor.fetchone()
+            if row and row[1]:
+                cursor.execute(RELEASE_BLOB_QUERY, ("cover", row[1]))
+            return row
 
     def restore_bookmark(self, bookmark_id: int):
         """Restore a soft-deleted bookmark"""
-        self.db.cursor.execute(
-            """
-            UPDATE bookmark
-            SET deleted_status = FALSE, updated_at = NOW()
-            WHERE id = %s
-            RETURNING id, name, type, review, watch_from, release_time, 
-                      time_used, rating, story_rating, action_rating, 
-                      graphic_rating, sound_rating, chapter, mood, 
-                      review_version, short_review, status, public, 
-                      user_id, created_at, updated_at, cover_image, 
-                      deleted_status, last_viewed_at;
-        """,
-            (bookmark_id,),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE bookmark
+                SET deleted_status = FALSE, updated_at = NOW()
+                WHERE id = %s
+                RETURNING id, name, type, review, watch_from, release_time, 
+                          time_used, rating, story_rating, action_rating, 
+                          graphic_rating, sound_rating, chapter, mood, 
+                          review_version, short_review, status, public, 
+                          user_id, created_at, updated_at, cover_image, 
+                          deleted_status, last_viewed_at;
+            """,
+                (bookmark_id,),
+            )
+            row = cursor.fetchone()
+            if row:
+                self._bump_version(cursor, bookmark_id)
+            return row
 
-    def update_last_viewed(self, bookmark_id: int):
-        """Update the last_viewed_at timestamp"""
-        self.db.cursor.execute(
-            """
-            UPDATE bookmark
-            SET last_viewed_at = NOW()
-            WHERE id = %s AND deleted_status = FALSE
-            RETURNING id;
-        """,
-            (bookmark_id,),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+    def update_last_viewed_batch(self, views: list[tuple[int, datetime]]) -> int:
+        """
+        Apply buffered (bookmark_id, viewed_at) pairs in one UPDATE ... FROM (VALUES ...).
+
+        last_viewed_at only moves forward, so flushes from several workers
+        (or arriving out of order) never rewind it. Returns the number of
+        bookmarks updated.
+        """
+        if not views:
+            return 0
+        with self.db.cursor() as cursor:
+            rows = execute_values(
+                cursor,
+                """
+                UPDATE bookmark AS b
+                SET last_viewed_at = v.viewed_at
+                FROM (VALUES %s) AS v(id, viewed_at)
+                WHERE b.id = v.id
+                  AND b.deleted_status = FALSE
+                  AND (b.last_viewed_at IS NULL OR b.last_viewed_at < v.viewed_at)
+                RETURNING b.user_id;
+            """,
+                sorted(views),
+                template="(%s::integer, %s::timestamptz)",
+                page_size=len(views),
+                fetch=True,
+            )
+            if rows:
+                bump_collection_version(
+                    cursor,
+                    BOOKMARK_COLLECTION,
+                    "SELECT unnest(%s::integer[])",
+                    (list({row[0] for row in rows}),),
+                )
+            return len(rows)
 
     def update_cover_image(self, bookmark_id: int, cover_image: str):
-        """Update the cover image for a bookmark"""
-        self.db.cursor.execute(
-            """
-            UPDATE bookmark
-            SET cover_image = %s, updated_at = NOW()
-            WHERE id = %s AND deleted_status = FALSE
-            RETURNING id, name, type, review, watch_from, release_time, 
-                      time_used, rating, story_rating, action_rating, 
-                      graphic_rating, sound_rating, chapter, mood, 
-                      review_version, short_review, status, public, 
-                      user_id, created_at, updated_at, cover_image, 
-                      deleted_status, last_viewed_at;
-        """,
-            (cover_image, bookmark_id),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        """Update the cover image for a bookmark, releasing the previous one"""
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                "SELECT cover_image FROM bookmark WHERE id = %s FOR UPDATE;",
+                (bookmark_id,),
+            )
+            previous = cursor.fetchone()
+            cursor.execute(
+                """
+                UPDATE bookmark
+                SET cover_image = %s, cover_thumbnail = NULL, cover_webp = NULL,
+                    updated_at = NOW()
+                WHERE id = %s AND deleted_status = FALSE
+                RETURNING id, name, type, review, watch_from, release_time, 
+                          time_used, rating, story_rating, action_rating, 
+                          graphic_rating, sound_rating, chapter, mood, 
+                          review_version, short_review, status, public, 
+                          user_id, created_at, updated_at, cover_image, 
+                          deleted_status, last_viewed_at;
+            """,
+                (cover_image, bookmark_id),
+            )
+            row = cursor.fetchone()
+            # Each upload holds its own reference, even when re-uploading the same file
+            if row and previous and previous[0]:
+                cursor.execute(RELEASE_BLOB_QUERY, ("cover", previous[0]))
+            if row:
+                self._bump_version(cursor, bookmark_id)
+            return row
+
+    def update_cover_derivatives(
+        self, bookmark_id: int, cover_image: str, thumbnail: str, webp: str | None
+    ):
+        """
+        Record rendered derivatives of a cover image.
+
+        Only applied while `cover_image` is still the bookmark's cover, so a
+        slow render never overwrites the derivatives of a newer upload.
+        """
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE bookmark
+                SET cover_thumbnail = %s, cover_webp = %s
+                WHERE id = %s AND cover_image = %s
+                RETURNING id;
+            """,
+                (thumbnail, webp, bookmark_id, cover_image),
+            )
+            row = cursor.fetchone()
+            if row:
+                self._bump_version(cursor, bookmark_id)
+            return row
 
     # ===========================
     #    BOOKMARK-TAG OPERATIONS
@@ -361,61 +541,67 @@ class SQLBookmark:
 
     def add_tag_to_bookmark(self, bookmark_id: int, tag_id: int):
         """Add a tag to a bookmark"""
-        self.db.cursor.execute(
-            """
-            INSERT INTO bookmark_tag (bookmark_id, tag_id)
-            VALUES (%s, %s)
-            ON CONFLICT (bookmark_id, tag_id) DO NOTHING
-            RETURNING bookmark_id, tag_id;
-        """,
-            (bookmark_id, tag_id),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO bookmark_tag (bookmark_id, tag_id)
+                VALUES (%s, %s)
+                ON CONFLICT (bookmark_id, tag_id) DO NOTHING
+                RETURNING bookmark_id, tag_id;
+            """,
+                (bookmark_id, tag_id),
+            )
+            row = cursor.fetchone()
+            if row:
+                self._bump_version(cursor, bookmark_id)
+            return row
 
     def remove_tag_from_bookmark(self, bookmark_id: int, tag_id: int):
         """Remove a tag from a bookmark"""
-        self.db.cursor.execute(
-            """
-            DELETE FROM bookmark_tag
-            WHERE bookmark_id = %s AND tag_id = %s
-            RETURNING bookmark_id, tag_id;
-        """,
-            (bookmark_id, tag_id),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM bookmark_tag
+                WHERE bookmark_id = %s AND tag_id = %s
+                RETURNING bookmark_id, tag_id;
+            """,
+                (bookmark_id, tag_id),
+            )
+            row = cursor.fetchone()
+            if row:
+                self._bump_version(cursor, bookmark_id)
+            return row
 
     def set_bookmark_tags(self, bookmark_id: int, tag_ids: list[int]):
         """Set all tags for a bookmark (replaces existing tags)"""
-        # First, remove all existing tags
-        self.db.cursor.execute(
-            """
-            DELETE FROM bookmark_tag
-            WHERE bookmark_id = %s;
-        """,
-            (bookmark_id,),
-        )
-
-        # Then, add new tags
-        if tag_ids:
-            values = [(bookmark_id, tag_id) for tag_id in tag_ids]
-            self.db.cursor.executemany(
+        with self.db.cursor() as cursor:
+            # First, remove all existing tags
+            cursor.execute(
                 """
-                INSERT INTO bookmark_tag (bookmark_id, tag_id)
-                VALUES (%s, %s)
-                ON CONFLICT (bookmark_id, tag_id) DO NOTHING;
+                DELETE FROM bookmark_tag
+                WHERE bookmark_id = %s;
             """,
-                values,
+                (bookmark_id,),
             )
 
-        self.db.connection.commit()
+            # Then, add new tags
+            if tag_ids:
+                values = [(bookmark_id, tag_id) for tag_id in tag_ids]
+                cursor.executemany(
+                    """
+                    INSERT INTO bookmark_tag (bookmark_id, tag_id)
+                    VALUES (%s, %s)
+                    ON CONFLICT (bookmark_id, tag_id) DO NOTHING;
+                """,
+                    values,
+                )
+            self._bump_version(cursor, bookmark_id)
 
     def get_bookmarks_by_tag(
         self, tag_id: int, user_id: int | None = None, limit: int = 100
     ):
         """Get all bookmarks with a specific tag"""
-        query = """
+        query = f"""
             SELECT b.id, b.name, b.type, b.review, b.watch_from, b.release_time, 
                    b.time_used, b.rating, b.story_rating, b.action_rating, 
                    b.graphic_rating, b.sound_rating, b.chapter, b.mood, 
@@ -423,7 +609,9 @@ class SQLBookmark:
                    b.user_id, b.created_at, b.updated_at, b.cover_image, 
                    b.deleted_status, b.last_viewed_at,
                    u.id, u.username, u.firstname, u.lastname, u.nickname, 
-                   u.role, u.tel, u.created_at, u.picture_url
+                   u.role, u.tel, u.created_at, u.picture_url,
+                   {TAGS_JSON_COLUMN},
+                   b.cover_thumbnail, b.cover_webp
             FROM bookmark b
             INNER JOIN "user" u ON b.user_id = u.id
             INNER JOIN bookmark_tag bt ON b.id = bt.bookmark_id
@@ -438,5 +626,6 @@ class SQLBookmark:
         query += " ORDER BY b.created_at DESC LIMIT %s;"
         params.append(limit)
 
-        self.db.cursor.execute(query, tuple(params))
-        return self.db.cursor.fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            return cursor.fetchall()
@@ -0,0 +1,58 @@
+from src.database.connect import AsyncDatabase
+from src.sql_query.sql_bookmark import TAGS_JSON_COLUMN
+from typing import Any
+
+
+class AsyncSQLBookmark:
+    """Async (asyncpg) counterparts of the hot SQLBookmark read queries"""
+
+    def __init__(self):
+        self.db = AsyncDatabase()
+
+    async def get_bookmarks(
+        self,
+        user_id: int,
+        limit: int = 100,
+        bookmark_type: str | None = None,
+        status: str | None = None,
+        include_deleted: bool = False,
+        after: tuple | None = None,
+    ):
+        """Fetch bookmarks for a user with optional filters"""
+        query = f"""
+            SELECT b.id, b.name, b.type, b.review, b.watch_from, b.release_time, 
+                   b.time_used, b.rating, b.story_rating, b.action_rating, 
+                   b.graphic_rating, b.sound_rating, b.chapter, b.mood, 
+                   b.review_version, b.short_review, b.status, b.public, 
+                   b.user_id, b.created_at, b.updated_at, b.cover_image, 
+                   b.deleted_status, b.last_viewed_at,
+                   u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                   u.role, u.tel, u.created_at, u.picture_url,
+                   {TAGS_JSON_COLUMN},
+                   b.cover_thumbnail, b.cover_webp
+            FROM bookmark b
+            INNER JOIN "user" u ON b.user_id = u.id
+            WHERE b.user_id = $1
+        """
+        params: list[Any] = [user_id]
+
+        if not include_deleted:
+            query += " AND b.deleted_status = FALSE"
+
+        if bookmark_type is not None:
+            params.append(bookmark_type)
+            query += f" AND b.type = ${len(params)}"
+
+        if status is not None:
+            params.append(status)
+            query += f" AND b.status = ${len(params)}"
+
+        if after is not None:
+            params.extend(after)
+            query += f" AND (b.created_at, b.id) < (${len(params) - 1}, ${len(params)})"
+
+        params.append(limit)
+        query += f" ORDER BY b.created_at DESC, b.id DESC LIMIT ${len(params)};"
+
+        async with self.db.connection() as conn:
+            return await conn.fetch(query, *params)
@@ -0,0 +1,105 @@
+from src.database.connect import Database
+
+# List collections served with an ETag (collection_version.collection)
+TODO_COLLECTION = "todo"
+BOOKMARK_COLLECTION = "bookmark"
+MEMO_COLLECTION = "memo"
+TAB_COLLECTION = "tab"
+COLLECTIONS = (TODO_COLLECTION, BOOKMARK_COLLECTION, MEMO_COLLECTION, TAB_COLLECTION)
+
+# Audience queries: the users whose list shows the row being written.
+# Each yields one user id column; placeholders are filled by the caller.
+USER_AUDIENCE = "SELECT %s::integer"
+TODO_AUDIENCE = """
+    SELECT user_id FROM todo WHERE id = %s
+    UNION
+    SELECT shared_with_user_id FROM todo_share WHERE todo_id = %s
+"""
+TODO_TAG_AUDIENCE = """
+    SELECT t.user_id
+    FROM todo_tag_pivot ttp
+    INNER JOIN todo t ON t.id = ttp.todo_id
+    WHERE ttp.tag_id = %s
+    UNION
+    SELECT ts.shared_with_user_id
+    FROM todo_tag_pivot ttp
+    INNER JOIN todo_share ts ON ts.todo_id = ttp.todo_id
+    WHERE ttp.tag_id = %s
+"""
+# Users on the other side of a todo share with this user (their lists embed it)
+TODO_SHARE_PARTNER_AUDIENCE = """
+    SELECT ts.shared_with_user_id
+    FROM todo_share ts
+    INNER JOIN todo t ON t.id = ts.todo_id
+    WHERE t.user_id = %s
+    UNION
+    SELECT t.user_id
+    FROM todo_share ts
+    INNER JOIN todo t ON t.id = ts.todo_id
+    WHERE ts.shared_with_user_id = %s
+"""
+MEMO_AUDIENCE = "SELECT user_id FROM memo WHERE id = %s"
+TAB_AUDIENCE = "SELECT user_id FROM tab WHERE id = %s"
+BOOKMARK_AUDIENCE = "SELECT user_id FROM bookmark WHERE id = %s"
+BOOKMARK_TAG_AUDIENCE = """
+    SELECT b.user_id
+    FROM bookmark_tag bt
+    INNER JOIN bookmark b ON b.id = bt.bookmark_id
+    WHERE bt.tag_id = %s
+"""
+
+
+def bump_collection_version(cursor, collection: str, audience: str, params: tuple):
+    """
+    Advance `collection`'s version for every user returned by `audience`.
+
+    Runs inside the caller's write transaction, so the new version becomes
+    visible together with the change. Run it before deletes whose cascade
+    would remove the rows the audience is computed from.
+    """
+    cursor.execute(
+        f"""
+        INSERT INTO collection_version AS cv (user_id, collection, version, updated_at)
+        SELECT DISTINCT audience.user_id, %s, 1, NOW()
+        FROM ({audience}) AS audience(user_id)
+        WHERE audience.user_id IS NOT NULL
+        ORDER BY audience.user_id
+        ON CONFLICT (user_id, collection) DO UPDATE
+        SET version = cv.version + 1, updated_at = NOW();
+    """,
+        (collection, *params),
+    )
+
+
+def bump_todo_version(cursor, todo_id: int):
+    """Invalidate the todo list of a todo's owner and everyone it is shared with"""
+    bump_collection_version(cursor, TODO_COLLECTION, TODO_AUDIENCE, (todo_id, todo_id))
+
+
+def bump_user_versions(cursor, user_id: int):
+    """Invalidate every list that embeds this user's profile"""
+    for collection in COLLECTIONS:
+        bump_collection_version(cursor, collection, USER_AUDIENCE, (user_id,))
+    bump_collection_version(
+        cursor, TODO_COLLECTION, TODO_SHARE_PARTNER_AUDIENCE, (user_id, user_id)
+    )
+
+
+class SQLCollectionVersion:
+    """Per-user list versions backing the ETags of the list endpoints"""
+
+    def __init__(self):
+        self.db = Database()
+
+    def get_version(self, user_id: int, collection: str) -> int:
+        """Current version of a user's collection (0 if never written)"""
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT version FROM collection_version
+                WHERE user_id = %s AND collection = %s;
+            """,
+                (user_id, collection),
+            )
+            row = cursor.fetchone()
+            return row[0] if row else 0
@@ -0,0 +1,21 @@
+from src.database.connect import AsyncDatabase
+
+
+class AsyncSQLCollectionVersion:
+    """Async (asyncpg) counterpart of SQLCollectionVersion.get_version"""
+
+    def __init__(self):
+        self.db = AsyncDatabase()
+
+    async def get_version(self, user_id: int, collection: str) -> int:
+        """Current version of a user's collection (0 if never written)"""
+        async with self.db.connection() as conn:
+            version = await conn.fetchval(
+                """
+                SELECT version FROM collection_version
+                WHERE user_id = $1 AND collection = $2;
+            """,
+                user_id,
+                collection,
+            )
+            return version or 0
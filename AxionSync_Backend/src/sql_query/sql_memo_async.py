@@ -0,0 +1,40 @@
+from src.database.connect import AsyncDatabase
+from typing import Any
+
+
+class AsyncSQLMemo:
+    """Async (asyncpg) counterparts of the hot SQLMemo read queries"""
+
+    def __init__(self):
+        self.db = AsyncDatabase()
+
+    async def get_memos(
+        self,
+        user_id: int,
+        limit: int = 100,
+        tab_id: int | None = None,
+        after: tuple | None = None,
+    ):
+        """Fetch recent memos for a user, ordered by oldest first (newest at bottom)"""
+        query = """
+            SELECT m.id, m.title, m.content, m.user_id, m.tab_id, m.font_color, m.deleted_status, m.collected, m.collected_time, m.created_at, m.updated_at,
+                   u.id, u.username, u.firstname, u.lastname, u.nickname, u.role, u.tel, u.created_at, u.picture_url
+            FROM memo m
+            INNER JOIN "user" u ON m.user_id = u.id
+            WHERE m.user_id = $1 AND m.deleted_status = FALSE
+        """
+        params: list[Any] = [user_id]
+
+        if tab_id is not None:
+            params.append(tab_id)
+            query += f" AND m.tab_id = ${len(params)}"
+
+        if after is not None:
+            params.extend(after)
+            query += f" AND (m.created_at, m.id) > (${len(params) - 1}, ${len(params)})"
+
+        params.append(limit)
+        query += f" ORDER BY m.created_at ASC, m.id ASC LIMIT ${len(params)};"
+
+        async with self.db.connection() as conn:
+            return await conn.fetch(query, *params)
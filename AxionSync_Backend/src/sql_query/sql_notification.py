@@ -1,7 +1,14 @@
 from src.database.connect import Database
-from typing import Any
+from typing import Any, Callable
 from datetime import datetime
 
+# Queue a notification for the outbox relay. Run in the same transaction as
+# the todo_notification write so the Redis schedule can never be lost.
+ENQUEUE_OUTBOX_QUERY = """
+    INSERT INTO notification_outbox (notification_id, created_at)
+    VALUES (%s, NOW());
+"""
+
 
 class SQLNotification:
     def __init__(self):
@@ -11,9 +18,18 @@ class SQLNotification:
     #    TODO NOTIFICATION OPERATIONS
     # ===========================
     def get_notifications(
-        self, user_id: int, include_sent: bool = False, limit: int = 100
+        self,
+        user_id: int,
+        include_sent: bool = False,
+        limit: int = 100,
+        after: tuple | None = None,
     ):
-        """Fetch notifications for a user"""
+        """
+        Fetch notifications for a user.
+
+        `after` is the (notify_time, id) key of the last notification on the
+        previous page.
+        """
         query = """
             SELECT tn.id, tn.todo_id, tn.user_id, tn.notify_time, tn.is_sent, 
                    tn.channel, tn.message, tn.created_at,
@@ -30,48 +46,76 @@ class SQLNotification:
         if not include_sent:
             query += " AND tn.is_sent = FALSE"
 
-        query += " ORDER BY tn.notify_time ASC LIMIT %s;"
+        if after is not None:
+            query += " AND (tn.notify_time, tn.id) > (%s, %s)"
+            params.extend(after)
+
+        query += " ORDER BY tn.notify_time ASC, tn.id ASC LIMIT %s;"
         params.append(limit)
 
-        self.db.cursor.execute(query, tuple(params))
-        return self.db.cursor.fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            return cursor.fetchall()
 
     def get_notification_by_id(self, notification_id: int):
         """Fetch a single notification by ID"""
-        self.db.cursor.execute(
-            """
-            SELECT tn.id, tn.todo_id, tn.user_id, tn.notify_time, tn.is_sent, 
-                   tn.channel, tn.message, tn.created_at,
-                   t.title as todo_title,
-                   u.id, u.username, u.firstname, u.lastname, u.nickname, 
-                   u.role, u.tel, u.created_at as user_created_at, u.picture_url
-            FROM todo_notification tn
-            INNER JOIN todo t ON tn.todo_id = t.id
-            INNER JOIN "user" u ON tn.user_id = u.id
-            WHERE tn.id = %s;
-        """,
-            (notification_id,),
-        )
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT tn.id, tn.todo_id, tn.user_id, tn.notify_time, tn.is_sent, 
+                       tn.channel, tn.message, tn.created_at,
+                       t.title as todo_title,
+                       u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                       u.role, u.tel, u.created_at as user_created_at, u.picture_url
+                FROM todo_notification tn
+                INNER JOIN todo t ON tn.todo_id = t.id
+                INNER JOIN "user" u ON tn.user_id = u.id
+                WHERE tn.id = %s;
+            """,
+                (notification_id,),
+            )
+            return cursor.fetchone()
+
+    def get_notifications_by_ids(self, notification_ids: list[int]):
+        """Fetch several notifications by ID in one query"""
+        if not notification_ids:
+            return []
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT tn.id, tn.todo_id, tn.user_id, tn.notify_time, tn.is_sent, 
+                       tn.channel, tn.message, tn.created_at,
+                       t.title as todo_title,
+                       u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                       u.role, u.tel, u.created_at as user_created_at, u.picture_url
+                FROM todo_notification tn
+                INNER JOIN todo t ON tn.todo_id = t.id
+                INNER JOIN "user" u ON tn.user_id = u.id
+                WHERE tn.id = ANY(%s);
+            """,
+                (list(notification_ids),),
+            )
+            return cursor.fetchall()
 
     def get_notifications_for_todo(self, todo_id: int):
         """Fetch all notifications for a todo"""
-        self.db.cursor.execute(
-            """
-            SELECT tn.id, tn.todo_id, tn.user_id, tn.notify_time, tn.is_sent, 
-                   tn.channel, tn.message, tn.created_at,
-                   t.title as todo_title,
-                   u.id, u.username, u.firstname, u.lastname, u.nickname, 
-                   u.role, u.tel, u.created_at as user_created_at, u.picture_url
-            FROM todo_notification tn
-            INNER JOIN todo t ON tn.todo_id = t.id
-            INNER JOIN "user" u ON tn.user_id = u.id
-            WHERE tn.todo_id = %s
-            ORDER BY tn.notify_time ASC;
-        """,
-            (todo_id,),
-        )
-        return self.db.cursor.fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT tn.id, tn.todo_id, tn.user_id, tn.notify_time, tn.is_sent, 
+                       tn.channel, tn.message, tn.created_at,
+                       t.title as todo_title,
+                       u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                       u.role, u.tel, u.created_at as user_created_at, u.picture_url
+                FROM todo_notification tn
+                INNER JOIN todo t ON tn.todo_id = t.id
+                INNER JOIN "user" u ON tn.user_id = u.id
+                WHERE tn.todo_id = %s
+                ORDER BY tn.notify_time ASC;
+            """,
+                (todo_id,),
+            )
+            return cursor.fetchall()
 
     def create_notification(
         self,
@@ -82,16 +126,19 @@ class SQLNotification:
         message: str | None = None,
     ):
         """Create a new notification"""
-        self.db.cursor.execute(
-            """
-            INSERT INTO todo_notification (todo_id, user_id, notify_time, is_sent, channel, message, created_at)
-            VALUES (%s, %s, %s, FALSE, %s, %s, NOW())
-            RETURNING id, todo_id, user_id, notify_time, is_sent, channel, message, created_at;
-        """,
-            (todo_id, user_id, notify_time, channel, message),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO todo_notification (todo_id, user_id, notify_time, is_sent, channel, message, created_at)
+                VALUES (%s, %s, %s, FALSE, %s, %s, NOW())
+                RETURNING id, todo_id, user_id, notify_time, is_sent, channel, message, created_at;
+            """,
+                (todo_id, user_id, notify_time, channel, message),
+            )
+            row = cursor.fetchone()
+            if row:
+                cursor.execute(ENQUEUE_OUTBOX_QUERY, (row[0],))
+            return row
 
     def update_notification(
         self,
@@ -126,34 +173,148 @@ class SQLNotification:
             RETURNING id, todo_id, user_id, notify_time, is_sent, channel, message, created_at;
         """
 
-        self.db.cursor.execute(query, tuple(params))
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            row = cursor.fetchone()
+            if row:
+                cursor.execute(ENQUEUE_OUTBOX_QUERY, (notification_id,))
+            return row
 
     def delete_notification(self, notification_id: int):
         """Delete a notification"""
-        self.db.cursor.execute(
-            """
-            DELETE FROM todo_notification WHERE id = %s RETURNING id;
-        """,
-            (notification_id,),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM todo_notification WHERE id = %s RETURNING id;
+            """,
+                (notification_id,),
+            )
+            row = cursor.fetchone()
+            if row:
+                cursor.execute(ENQUEUE_OUTBOX_QUERY, (notification_id,))
+            return row
+
+    def drain_outbox(self, limit: int, apply: Callable[[list[tuple]], None]) -> int:
+        """
+        Hand the oldest `limit` outbox entries to `apply`, then delete them.
+
+        `apply` receives one row per notification (duplicates coalesced):
+        (notification_id, todo_id, user_id, notify_time, channel, message,
+        is_sent), where todo_id is None if the notification was deleted.
+        Rows carry the notification's current state, so replaying an entry
+        is idempotent. `apply` runs before the transaction commits; if it
+        raises, the entries stay queued for the next drain.
+
+        A transaction-level advisory lock keeps concurrent relays from
+        applying an older state after a newer one. Returns the number of
+        outbox entries drained (0 while another relay holds the lock).
+        """
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_try_advisory_xact_lock(hashtext('notification_outbox'));"
+            )
+            if not cursor.fetchone()[0]:
+                return 0
+
+            cursor.execute(
+                """
+                SELECT id, notification_id
+                FROM notification_outbox
+                ORDER BY id
+                LIMIT %s;
+            """,
+                (limit,),
+            )
+            entries = cursor.fetchall()
+            if not entries:
+                return 0
+
+            notification_ids = sorted({entry[1] for entry in entries})
+            cursor.execute(
+                """
+                SELECT ids.id, n.todo_id, n.user_id, n.notify_time, n.channel, n.message, n.is_sent
+                FROM unnest(%s::int[]) AS ids(id)
+                LEFT JOIN todo_notification n ON n.id = ids.id;
+            """,
+                (notification_ids,),
+            )
+            apply(cursor.fetchall())
+
+            cursor.execute(
+                "DELETE FROM notification_outbox WHERE id = ANY(%s);",
+                ([entry[0] for entry in entries],),
+            )
+            return len(entries)
+
+    def scan_pending_notifications(
+        self, chunk_size: int, apply: Callable[[list[tuple]], None]
+    ) -> int:
+        """
+        Stream every pending notification to `apply` in chunks.
+
+        Rows have the drain_outbox shape (notification_id, todo_id, user_id,
+        notify_time, channel, message, is_sent) and are read through a
+        server-side cursor, so memory stays at one chunk however many
+        reminders are pending.
+
+        The scan holds the outbox advisory lock for its whole transaction:
+        relays skip while it runs, and entries committed after the scan
+        started are relayed afterwards with their latest state, so the
+        scan can never overwrite a newer schedule. Returns the rows scanned.
+        """
+        scanned = 0
+        with self.db.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(hashtext('notification_outbox'));"
+                )
+
+            with conn.cursor(name="pending_notification_scan") as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(
+                    """
+                    SELECT id, todo_id, user_id, notify_time, channel, message, is_sent
+                    FROM todo_notification
+                    WHERE is_sent = FALSE;
+                """
+                )
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    apply(rows)
+                    scanned += len(rows)
+        return scanned
 
     def mark_notification_sent(self, notification_id: int):
         """Mark a notification as sent"""
-        self.db.cursor.execute(
-            """
-            UPDATE todo_notification
-            SET is_sent = TRUE
-            WHERE id = %s
-            RETURNING id, todo_id, user_id, notify_time, is_sent, channel, message, created_at;
-        """,
-            (notification_id,),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE todo_notification
+                SET is_sent = TRUE
+                WHERE id = %s
+                RETURNING id, todo_id, user_id, notify_time, is_sent, channel, message, created_at;
+            """,
+                (notification_id,),
+            )
+            return cursor.fetchone()
+
+    def mark_notifications_sent(self, notification_ids: list[int]):
+        """Mark several notifications as sent in one statement, returning the updated IDs"""
+        if not notification_ids:
+            return []
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE todo_notification
+                SET is_sent = TRUE
+                WHERE id = ANY(%s) AND is_sent = FALSE
+                RETURNING id;
+            """,
+                (list(notification_ids),),
+            )
+            return [row[0] for row in cursor.fetchall()]
 
     def get_pending_notifications(
         self, before_time: datetime | None = None, limit: int = 100
@@ -179,27 +340,29 @@ class SQLNotification:
         query += " ORDER BY tn.notify_time ASC LIMIT %s;"
         params.append(limit)
 
-        self.db.cursor.execute(query, tuple(params))
-        return self.db.cursor.fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            return cursor.fetchall()
 
     def get_upcoming_notifications(self, user_id: int, hours: int = 24):
         """Fetch upcoming notifications within the next N hours"""
-        self.db.cursor.execute(
-            """
-            SELECT tn.id, tn.todo_id, t.title as todo_title, tn.notify_time, 
-                   tn.channel, tn.message,
-                   EXTRACT(EPOCH FROM (tn.notify_time - NOW()))::int as time_until
-            FROM todo_notification tn
-            INNER JOIN todo t ON tn.todo_id = t.id
-            WHERE tn.user_id = %s 
-              AND tn.is_sent = FALSE
-              AND tn.notify_time <= NOW() + INTERVAL '%s hours'
-              AND tn.notify_time > NOW()
-            ORDER BY tn.notify_time ASC;
-        """,
-            (user_id, hours),
-        )
-        return self.db.cursor.fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT tn.id, tn.todo_id, t.title as todo_title, tn.notify_time, 
+                       tn.channel, tn.message,
+                       EXTRACT(EPOCH FROM (tn.notify_time - NOW()))::int as time_until
+                FROM todo_notification tn
+                INNER JOIN todo t ON tn.todo_id = t.id
+                WHERE tn.user_id = %s 
+                  AND tn.is_sent = FALSE
+                  AND tn.notify_time <= NOW() + INTERVAL '%s hours'
+                  AND tn.notify_time > NOW()
+                ORDER BY tn.notify_time ASC;
+            """,
+                (user_id, hours),
+            )
+            return cursor.fetchall()
 
     # ===========================
     #    USER DEVICE TOKEN OPERATIONS
@@ -218,47 +381,50 @@ class SQLNotification:
 
         query += " ORDER BY created_at DESC;"
 
-        self.db.cursor.execute(query, tuple(params))
-        return self.db.cursor.fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            return cursor.fetchall()
 
     def get_device_token_by_id(self, token_id: int):
         """Fetch a single device token by ID"""
-        self.db.cursor.execute(
-            """
-            SELECT id, user_id, device_token, platform, is_active, created_at, updated_at
-            FROM user_device_token
-            WHERE id = %s;
-        """,
-            (token_id,),
-        )
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id, user_id, device_token, platform, is_active, created_at, updated_at
+                FROM user_device_token
+                WHERE id = %s;
+            """,
+                (token_id,),
+            )
+            return cursor.fetchone()
 
     def get_device_token_by_token(self, device_token: str):
         """Fetch a device token by token string"""
-        self.db.cursor.execute(
-            """
-            SELECT id, user_id, device_token, platform, is_active, created_at, updated_at
-            FROM user_device_token
-            WHERE device_token = %s;
-        """,
-            (device_token,),
-        )
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id, user_id, device_token, platform, is_active, created_at, updated_at
+                FROM user_device_token
+                WHERE device_token = %s;
+            """,
+                (device_token,),
+            )
+            return cursor.fetchone()
 
     def register_device_token(self, user_id: int, device_token: str, platform: str):
         """Register a new device token (upsert)"""
-        self.db.cursor.execute(
-            """
-            INSERT INTO user_device_token (user_id, device_token, platform, is_active, created_at)
-            VALUES (%s, %s, %s, TRUE, NOW())
-            ON CONFLICT (device_token) DO UPDATE 
-            SET user_id = %s, platform = %s, is_active = TRUE, updated_at = NOW()
-            RETURNING id, user_id, device_token, platform, is_active, created_at, updated_at;
-        """,
-            (user_id, device_token, platform, user_id, platform),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO user_device_token (user_id, device_token, platform, is_active, created_at)
+                VALUES (%s, %s, %s, TRUE, NOW())
+                ON CONFLICT (device_token) DO UPDATE 
+                SET user_id = %s, platform = %s, is_active = TRUE, updated_at = NOW()
+                RETURNING id, user_id, device_token, platform, is_active, created_at, updated_at;
+            """,
+                (user_id, device_token, platform, user_id, platform),
+            )
+            return cursor.fetchone()
 
     def update_device_token(
         self,
@@ -290,34 +456,34 @@ class SQLNotification:
             RETURNING id, user_id, device_token, platform, is_active, created_at, updated_at;
         """
 
-        self.db.cursor.execute(query, tuple(params))
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            return cursor.fetchone()
 
     def deactivate_device_token(self, device_token: str):
         """Deactivate a device token"""
-        self.db.cursor.execute(
-            """
-            UPDATE user_device_token
-            SET is_active = FALSE, updated_at = NOW()
-            WHERE device_token = %s
-            RETURNING id;
-        """,
-            (device_token,),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE user_device_token
+                SET is_active = FALSE, updated_at = NOW()
+                WHERE device_token = %s
+                RETURNING id;
+            """,
+                (device_token,),
+            )
+            return cursor.fetchone()
 
     def delete_device_token(self, token_id: int):
         """Delete a device token"""
-        self.db.cursor.execute(
-            """
-            DELETE FROM user_device_token WHERE id = %s RETURNING id;
-        """,
-            (token_id,),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM user_device_token WHERE id = %s RETURNING id;
+            """,
+                (token_id,),
+            )
+            return cursor.fetchone()
 
     def get_all_active_tokens_for_user(self, user_id: int, platform: str | None = None):
         """Fetch all active device tokens for a user, optionally filtered by platform"""
@@ -334,5 +500,6 @@ class SQLNotification:
 
         query += ";"
 
-        self.db.cursor.execute(query, tuple(params))
-        return self.db.cursor.fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            return cursor.fetchall()
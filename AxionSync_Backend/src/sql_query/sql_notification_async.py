@@ -0,0 +1,28 @@
+from src.database.connect import AsyncDatabase
+
+
+class AsyncSQLNotification:
+    """Async (asyncpg) counterparts of the hot SQLNotification read queries"""
+
+    def __init__(self):
+        self.db = AsyncDatabase()
+
+    async def get_upcoming_notifications(self, user_id: int, hours: int = 24):
+        """Fetch upcoming notifications within the next N hours"""
+        async with self.db.connection() as conn:
+            return await conn.fetch(
+                """
+                SELECT tn.id, tn.todo_id, t.title as todo_title, tn.notify_time, 
+                       tn.channel, tn.message,
+                       EXTRACT(EPOCH FROM (tn.notify_time - NOW()))::int as time_until
+                FROM todo_notification tn
+                INNER JOIN todo t ON tn.todo_id = t.id
+                WHERE tn.user_id = $1 
+                  AND tn.is_sent = FALSE
+                  AND tn.notify_time <= NOW() + make_interval(hours => $2)
+                  AND tn.notify_time > NOW()
+                ORDER BY tn.notify_time ASC;
+            """,
+                user_id,
+                hours,
+            )
@@ -0,0 +1,85 @@
+from datetime import date, datetime
+import base64
+import json
+
+# Page size bounds shared by every paginated listing
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def clamp_page_size(limit: int | None) -> int:
+    """Clamp a requested page size to [1, MAX_PAGE_SIZE]"""
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def encode_cursor(*values) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor.
+
+    Dates/datetimes are stored as ISO strings; the decoder restores them
+    from the `types` it is given, so the cursor stays URL safe and short.
+    """
+    payload = [
+        v.isoformat() if isinstance(v, (datetime, date)) else v for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None, types: tuple) -> tuple | None:
+    """
+    Decode a cursor produced by encode_cursor back into a typed sort key.
+
+    Args:
+        cursor: Opaque cursor from a previous response (None for the first page)
+        types: Expected type of each key column, e.g. (datetime, int)
+
+    Returns:
+        Tuple of typed key values, or None when no cursor was given
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise InvalidCursorError("Invalid cursor")
+
+        key = []
+        for value, kind in zip(values, types):
+            if value is None:
+                key.append(None)
+            elif kind is datetime:
+                key.append(datetime.fromisoformat(value))
+            elif kind is date:
+                key.append(date.fromisoformat(value))
+            else:
+                key.append(kind(value))
+        return tuple(key)
+    except InvalidCursorError:
+        raise
+    except Exception:
+        raise InvalidCursorError("Invalid cursor")
+
+
+def next_page_cursor(rows, limit: int, key_columns: tuple) -> str | None:
+    """
+    Build the cursor for the page after `rows`.
+
+    Callers fetch `limit + 1` rows; the extra row only signals that another
+    page exists. The cursor is the sort key (taken from `key_columns`) of
+    the last row that is actually returned.
+    """
+    if not rows or len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(*(last[i] for i in key_columns))
@@ -0,0 +1,90 @@
+from src.database.connect import AsyncDatabase
+from typing import Any
+
+# Per-kind search sources: (table, title column, headline text expression)
+# Each table has a generated `search_vector` column with a GIN index.
+SEARCH_SOURCES = {
+    "memo": ("memo", "title", "content"),
+    "todo": ("todo", "title", "COALESCE(description, '')"),
+    "bookmark": ("bookmark", "name", "concat_ws(' ', short_review, review)"),
+}
+
+# ts_headline returns raw user text, so matches are delimited with
+# private-use sentinels (stripped from the text first) rather than HTML;
+# SearchService escapes the snippet and turns them into <mark> tags
+HEADLINE_START = "\ue000"
+HEADLINE_STOP = "\ue001"
+HEADLINE_OPTIONS = (
+    f'StartSel="{HEADLINE_START}", StopSel="{HEADLINE_STOP}", '
+    "MaxWords=30, MinWords=10, MaxFragments=2"
+)
+
+
+class AsyncSQLSearch:
+    """Full-text search over memos, todos and bookmarks (asyncpg)"""
+
+    def __init__(self):
+        self.db = AsyncDatabase()
+
+    async def search(
+        self,
+        user_id: int,
+        text: str,
+        types: list[str],
+        limit: int = 20,
+        after: tuple | None = None,
+    ):
+        """
+        Ranked full-text search across the given entity kinds.
+
+        Matches use the GIN-indexed search_vector columns; only the rows of
+        the returned page get a ts_headline, which is the expensive part.
+        Ordered by (rank, type, id) descending so pages can be keyset
+        paginated with `after`.
+
+        Returns rows of (type, id, title, rank, created_at, headline).
+        """
+        params: list[Any] = [user_id, text]
+        hits = []
+        for kind in types:
+            table, title, body = SEARCH_SOURCES[kind]
+            hits.append(
+                f"""
+                SELECT '{kind}'::text AS kind, s.id, s.{title} AS title, {body} AS body,
+                       s.created_at, ts_rank(s.search_vector, q.query)::float8 AS rank
+                FROM {table} s, q
+                WHERE s.user_id = $1 AND s.deleted_status = FALSE
+                  AND s.search_vector @@ q.query
+                """
+            )
+
+        page_filter = ""
+        if after is not None:
+            params.extend(after)
+            page_filter = (
+                f"WHERE (rank, kind, id) < (${len(params) - 2}, ${len(params) - 1}, ${len(params)})"
+            )
+
+        params.append(limit)
+        query = f"""
+            WITH q AS (SELECT websearch_to_tsquery('simple', $2) AS query),
+            hits AS ({" UNION ALL ".join(hits)}),
+            page AS (
+                SELECT * FROM hits
+                {page_filter}
+                ORDER BY rank DESC, kind DESC, id DESC
+                LIMIT ${len(params)}
+            )
+            SELECT page.kind, page.id, page.title, page.rank, page.created_at,
+                   ts_headline(
+                       'simple',
+                       translate(page.body, '{HEADLINE_START}{HEADLINE_STOP}', ''),
+                       q.query,
+                       '{HEADLINE_OPTIONS}'
+                   )
+            FROM page, q
+            ORDER BY page.rank DESC, page.kind DESC, page.id DESC;
+        """
+
+        async with self.db.connection() as conn:
+            return await conn.fetch(query, *params)
@@ -1,4 +1,11 @@
 from src.database.connect import Database
+from src.sql_query.sql_collection_version import (
+    MEMO_COLLECTION,
+    TAB_AUDIENCE,
+    TAB_COLLECTION,
+    USER_AUDIENCE,
+    bump_collection_version,
+)
 
 
 class SQLTab:
@@ -7,69 +14,84 @@ class SQLTab:
 
     def get_tabs(self, user_id: int):
         """Fetch all tabs for a user"""
-        self.db.cursor.execute(
-            """
-            SELECT id, tab_name, color, user_id, font_name, font_size
-            FROM tab
-            WHERE user_id = %s
-            ORDER BY id ASC;
-        """,
-            (user_id,),
-        )
-        return self.db.cursor.fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id, tab_name, color, user_id, font_name, font_size
+                FROM tab
+                WHERE user_id = %s
+                ORDER BY id ASC;
+            """,
+                (user_id,),
+            )
+            return cursor.fetchall()
 
     def get_tab_by_id(self, tab_id: int):
         """Fetch a single tab by ID"""
-        self.db.cursor.execute(
-            """
-            SELECT id, tab_name, color, user_id, font_name, font_size
-            FROM tab
-            WHERE id = %s;
-        """,
-            (tab_id,),
-        )
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id, tab_name, color, user_id, font_name, font_size
+                FROM tab
+                WHERE id = %s;
+            """,
+                (tab_id,),
+            )
+            return cursor.fetchone()
 
     def create_tab(
         self, tab_name: str, color: str, user_id: int, font_name: str, font_size: int
     ):
         """Create a new tab and return the created row"""
-        self.db.cursor.execute(
-            """
-            INSERT INTO tab (tab_name, color, user_id, font_name, font_size)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING id, tab_name, color, user_id, font_name, font_size;
-        """,
-            (tab_name, color, user_id, font_name, font_size),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO tab (tab_name, color, user_id, font_name, font_size)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING id, tab_name, color, user_id, font_name, font_size;
+            """,
+                (tab_name, color, user_id, font_name, font_size),
+            )
+            row = cursor.fetchone()
+            if row:
+                bump_collection_version(
+                    cursor, TAB_COLLECTION, USER_AUDIENCE, (user_id,)
+                )
+            return row
 
     def update_tab(
         self, tab_id: int, tab_name: str, color: str, font_name: str, font_size: int
     ):
         """Update an existing tab"""
-        self.db.cursor.execute(
-            """
-            UPDATE tab
-            SET tab_name = %s, color = %s, font_name = %s, font_size = %s
-            WHERE id = %s
-            RETURNING id, tab_name, color, user_id, font_name, font_size;
-        """,
-            (tab_name, color, font_name, font_size, tab_id),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE tab
+                SET tab_name = %s, color = %s, font_name = %s, font_size = %s
+                WHERE id = %s
+                RETURNING id, tab_name, color, user_id, font_name, font_size;
+            """,
+                (tab_name, color, font_name, font_size, tab_id),
+            )
+            row = cursor.fetchone()
+            if row:
+                bump_collection_version(
+                    cursor, TAB_COLLECTION, TAB_AUDIENCE, (tab_id,)
+                )
+            return row
 
     def delete_tab(self, tab_id: int):
         """Delete a tab"""
-        self.db.cursor.execute(
-            """
-            DELETE FROM tab
-            WHERE id = %s
-            RETURNING id;
-        """,
-            (tab_id,),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            # Before the delete; its memos lose their tab_id as well
+            for collection in (TAB_COLLECTION, MEMO_COLLECTION):
+                bump_collection_version(cursor, collection, TAB_AUDIENCE, (tab_id,))
+            cursor.execute(
+                """
+                DELETE FROM tab
+                WHERE id = %s
+                RETURNING id;
+            """,
+                (tab_id,),
+            )
+            return cursor.fetchone()
@@ -1,30 +1,209 @@
+import psycopg2
 from src.database.connect import Database
+from src.sql_query.sql_collection_version import (
+    TODO_COLLECTION,
+    TODO_TAG_AUDIENCE,
+    bump_collection_version,
+    bump_todo_version,
+)
 from typing import Any
 from datetime import datetime
 import json
 
+# todo.status -> per-status counter column in todo_user_stats
+STATS_STATUS_COLUMNS = {
+    "pending": "pending_todos",
+    "in_progress": "in_progress_todos",
+    "completed": "completed_todos",
+    "cancelled": "cancelled_todos",
+}
+
+# Full recount of one user's status counts and streak, in the column layout
+# of todo_user_stats reads: (total, completed, pending, in_progress,
+# cancelled, current_streak, longest_streak, total_completed,
+# last_completed_date). Parameters: (user_id, user_id).
+USER_ANALYTICS_QUERY = """
+    WITH counts AS (
+        SELECT 
+            COUNT(*) FILTER (WHERE deleted_status = FALSE) as total_todos,
+            COUNT(*) FILTER (WHERE status = 'completed' AND deleted_status = FALSE) as completed_todos,
+            COUNT(*) FILTER (WHERE status = 'pending' AND deleted_status = FALSE) as pending_todos,
+            COUNT(*) FILTER (WHERE status = 'in_progress' AND deleted_status = FALSE) as in_progress_todos,
+            COUNT(*) FILTER (WHERE status = 'cancelled' AND deleted_status = FALSE) as cancelled_todos
+        FROM todo
+        WHERE user_id = %s
+    ),
+    completions AS (
+        SELECT DATE(tsh.changed_at) as completion_date
+        FROM todo_status_history tsh
+        INNER JOIN todo t ON tsh.todo_id = t.id
+        WHERE t.user_id = %s AND tsh.new_status = 'completed'
+    ),
+    date_with_gaps AS (
+        SELECT 
+            completion_date,
+            completion_date - (ROW_NUMBER() OVER (ORDER BY completion_date))::int as grp
+        FROM (SELECT DISTINCT completion_date FROM completions) d
+    ),
+    streaks AS (
+        SELECT COUNT(*) as streak_length, MAX(completion_date) as streak_end
+        FROM date_with_gaps
+        GROUP BY grp
+    ),
+    latest AS (
+        SELECT streak_length, streak_end
+        FROM streaks
+        ORDER BY streak_end DESC
+        LIMIT 1
+    )
+    SELECT 
+        c.total_todos, c.completed_todos, c.pending_todos,
+        c.in_progress_todos, c.cancelled_todos,
+        COALESCE((SELECT streak_length FROM latest
+                  WHERE streak_end >= CURRENT_DATE - 1), 0),
+        COALESCE((SELECT MAX(streak_length) FROM streaks), 0),
+        (SELECT COUNT(*) FROM completions),
+        (SELECT streak_end FROM latest)
+    FROM counts c;
+"""
+
 
 class SQLTodo:
     def __init__(self):
         self.db = Database()
 
-    def _safe_fetchall(self):
+    def _safe_fetchall(self, cursor):
         """Safely fetch all rows, handling empty results"""
         try:
-            results = self.db.cursor.fetchall()
+            results = cursor.fetchall()
             return results if results else []
-        except Exception as e:
+        except psycopg2.Error as e:
             print(f"Error in fetchall: {e}")
             return []
 
-    def _safe_fetchone(self):
+    def _safe_fetchone(self, cursor):
         """Safely fetch one row, handling empty results"""
         try:
-            return self.db.cursor.fetchone()
-        except Exception as e:
+            return cursor.fetchone()
+        except psycopg2.Error as e:
             print(f"Error in fetchone: {e}")
             return None
 
+    def _stats_state(self, cursor, todo_id: int):
+        """
+        Lock a todo and return (user_id, counted_status) for todo_user_stats.
+
+        counted_status is None for deleted or missing todos, which are not
+        part of the per-user counts.
+        """
+        cursor.execute(
+            "SELECT user_id, status, deleted_status FROM todo WHERE id = %s FOR UPDATE;",
+            (todo_id,),
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None, None
+        return row[0], (None if row[2] else row[1])
+
+    def _ensure_stats_row(self, cursor, user_id: int) -> bool:
+        """
+        Make sure the user has a todo_user_stats row, seeding it if missing.
+
+        Must run after the caller's write. A missing row is seeded from a
+        full recount (USER_ANALYTICS_QUERY), which already includes that
+        write, so the caller must not apply its own delta on top; returns
+        True in that case. A per-user advisory lock serializes seeding with
+        concurrent writers, who then find the row and apply their deltas.
+        """
+        cursor.execute("SELECT 1 FROM todo_user_stats WHERE user_id = %s;", (user_id,))
+        if cursor.fetchone():
+            return False
+
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtext('todo_user_stats'), %s);",
+            (user_id,),
+        )
+        cursor.execute("SELECT 1 FROM todo_user_stats WHERE user_id = %s;", (user_id,))
+        if cursor.fetchone():
+            return False
+
+        cursor.execute(USER_ANALYTICS_QUERY, (user_id, user_id))
+        (
+            total,
+            completed,
+            pending,
+            in_progress,
+            cancelled,
+            current_streak,
+            longest_streak,
+            total_completed,
+            last_completed_date,
+        ) = cursor.fetchone()
+        cursor.execute(
+            """
+            INSERT INTO todo_user_stats (
+                user_id, total_todos, pending_todos, in_progress_todos,
+                completed_todos, cancelled_todos, total_completed,
+                current_streak, longest_streak, last_completed_date, updated_at
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW());
+        """,
+            (
+                user_id,
+                total,
+                pending,
+                in_progress,
+                completed,
+                cancelled,
+                total_completed,
+                current_streak,
+                longest_streak,
+                last_completed_date,
+            ),
+        )
+        return True
+
+    def _apply_stats_change(
+        self, cursor, user_id: int | None, old_status: str | None, new_status: str | None
+    ):
+        """Apply one todo's count transition to todo_user_stats (same transaction)"""
+        if user_id is None or old_status == new_status:
+            return
+        if self._ensure_stats_row(cursor, user_id):
+            return
+
+        delta = {column: 0 for column in STATS_STATUS_COLUMNS.values()}
+        total = 0
+        if old_status is not None:
+            total -= 1
+            if old_status in STATS_STATUS_COLUMNS:
+                delta[STATS_STATUS_COLUMNS[old_status]] -= 1
+        if new_status is not None:
+            total += 1
+            if new_status in STATS_STATUS_COLUMNS:
+                delta[STATS_STATUS_COLUMNS[new_status]] += 1
+
+        cursor.execute(
+            """
+            UPDATE todo_user_stats
+            SET total_todos = total_todos + %s,
+                pending_todos = pending_todos + %s,
+                in_progress_todos = in_progress_todos + %s,
+                completed_todos = completed_todos + %s,
+                cancelled_todos = cancelled_todos + %s,
+                updated_at = NOW()
+            WHERE user_id = %s;
+        """,
+            (
+                total,
+                delta["pending_todos"],
+                delta["in_progress_todos"],
+                delta["completed_todos"],
+                delta["cancelled_todos"],
+                user_id,
+            ),
+        )
+
     # ===========================
     #    TODO CRUD OPERATIONS
     # ===========================
@@ -36,8 +215,14 @@ class SQLTodo:
         priority: str | None = None,
         include_deleted: bool = False,
         include_shared: bool = True,
+        after: tuple | None = None,
     ):
-        """Fetch todos for a user with optional filters, including shared todos"""
+        """
+        Fetch todos for a user with optional filters, including shared todos.
+
+        `after` is the (due_date, created_at, id) key of the last todo on the
+        previous page; rows are seeked past it instead of using OFFSET.
+        """
         query = """
             SELECT DISTINCT t.id, t.title, t.description, t.status, t.priority, 
                    t.due_date, t.completed_at, t.is_repeat, t.repeat_type, t.mood,
@@ -62,13 +247,24 @@ class SQLTodo:
             query += " AND t.priority = %s"
             params.append(priority)
 
-        query += " ORDER BY t.due_date ASC NULLS LAST, t.created_at DESC LIMIT %s;"
+        if after is not None:
+            after_due, after_created, after_id = after
+            if after_due is not None:
+                query += """ AND (t.due_date > %s OR t.due_date IS NULL
+                    OR (t.due_date = %s AND (t.created_at, t.id) < (%s, %s)))"""
+                params.extend([after_due, after_due, after_created, after_id])
+            else:
+                query += " AND t.due_date IS NULL AND (t.created_at, t.id) < (%s, %s)"
+                params.extend([after_created, after_id])
+
+        query += " ORDER BY t.due_date ASC NULLS LAST, t.created_at DESC, t.id DESC LIMIT %s;"
         params.append(limit)
 
         try:
-            self.db.cursor.execute(query, tuple(params))
-            return self._safe_fetchall()
-        except Exception as e:
+            with self.db.cursor() as cursor:
+                cursor.execute(query, tuple(params))
+                return self._safe_fetchall(cursor)
+        except psycopg2.Error as e:
             print(f"Error fetching todos: {e}")
             return []
 
@@ -89,9 +285,10 @@ class SQLTodo:
         query += ";"
 
         try:
-            self.db.cursor.execute(query, (todo_id,))
-            return self._safe_fetchone()
-        except Exception as e:
+            with self.db.cursor() as cursor:
+                cursor.execute(query, (todo_id,))
+                return self._safe_fetchone(cursor)
+        except psycopg2.Error as e:
             print(f"Error fetching todo by id: {e}")
             return None
 
@@ -108,31 +305,35 @@ class SQLTodo:
         mood: str | None = None,
     ):
         """Create a new todo and return the created row"""
-        self.db.cursor.execute(
-            """
-            INSERT INTO todo (
-                title, description, status, priority, due_date,
-                is_repeat, repeat_type, mood, user_id, deleted_status, created_at
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO todo (
+                    title, description, status, priority, due_date,
+                    is_repeat, repeat_type, mood, user_id, deleted_status, created_at
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, FALSE, NOW())
+                RETURNING id, title, description, status, priority, due_date, 
+                          completed_at, is_repeat, repeat_type, mood, user_id, 
+                          deleted_status, created_at, updated_at;
+            """,
+                (
+                    title,
+                    description,
+                    status,
+                    priority,
+                    due_date,
+                    is_repeat,
+                    repeat_type,
+                    mood,
+                    user_id,
+                ),
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, FALSE, NOW())
-            RETURNING id, title, description, status, priority, due_date, 
-                      completed_at, is_repeat, repeat_type, mood, user_id, 
-                      deleted_status, created_at, updated_at;
-        """,
-            (
-                title,
-                description,
-                status,
-                priority,
-                due_date,
-                is_repeat,
-                repeat_type,
-                mood,
-                user_id,
-            ),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+            row = self._safe_fetchone(cursor)
+            if row:
+                self._apply_stats_change(cursor, user_id, None, row[3])
+                bump_todo_version(cursor, row[0])
+            return row
 
     def update_todo(
         self,
@@ -194,50 +395,73 @@ class SQLTodo:
                       deleted_status, created_at, updated_at;
         """
 
-        self.db.cursor.execute(query, tuple(params))
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            if status is not None:
+                user_id, old_status = self._stats_state(cursor, todo_id)
+            cursor.execute(query, tuple(params))
+            row = self._safe_fetchone(cursor)
+            if row and status is not None:
+                self._apply_stats_change(cursor, user_id, old_status, row[3])
+            if row:
+                bump_todo_version(cursor, row[0])
+            return row
 
     def delete_todo(self, todo_id: int):
         """Soft delete a todo"""
-        self.db.cursor.execute(
-            """
-            UPDATE todo
-            SET deleted_status = TRUE, updated_at = NOW()
-            WHERE id = %s
-            RETURNING id;
-        """,
-            (todo_id,),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            user_id, old_status = self._stats_state(cursor, todo_id)
+            cursor.execute(
+                """
+                UPDATE todo
+                SET deleted_status = TRUE, updated_at = NOW()
+                WHERE id = %s
+                RETURNING id, user_id;
+            """,
+                (todo_id,),
+            )
+            row = self._safe_fetchone(cursor)
+            if row:
+                self._apply_stats_change(cursor, user_id, old_status, None)
+                bump_todo_version(cursor, row[0])
+            return row
 
     def delete_todo_permanent(self, todo_id: int):
         """Hard delete a todo and all related data"""
-        self.db.cursor.execute(
-            """
-            DELETE FROM todo WHERE id = %s RETURNING id;
-        """,
-            (todo_id,),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            user_id, old_status = self._stats_state(cursor, todo_id)
+            # Before the delete: the cascade removes the shares
+            bump_todo_version(cursor, todo_id)
+            cursor.execute(
+                """
+                DELETE FROM todo WHERE id = %s RETURNING id, user_id;
+            """,
+                (todo_id,),
+            )
+            row = self._safe_fetchone(cursor)
+            if row:
+                self._apply_stats_change(cursor, user_id, old_status, None)
+            return row
 
     def restore_todo(self, todo_id: int):
         """Restore a soft-deleted todo"""
-        self.db.cursor.execute(
-            """
-            UPDATE todo
-            SET deleted_status = FALSE, updated_at = NOW()
-            WHERE id = %s
-            RETURNING id, title, description, status, priority, due_date, 
-                      completed_at, is_repeat, repeat_type, mood, user_id, 
-                      deleted_status, created_at, updated_at;
-        """,
-            (todo_id,),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            user_id, old_status = self._stats_state(cursor, todo_id)
+            cursor.execute(
+                """
+                UPDATE todo
+                SET deleted_status = FALSE, updated_at = NOW()
+                WHERE id = %s
+                RETURNING id, title, description, status, priority, due_date, 
+                          completed_at, is_repeat, repeat_type, mood, user_id, 
+                          deleted_status, created_at, updated_at;
+            """,
+                (todo_id,),
+            )
+            row = self._safe_fetchone(cursor)
+            if row:
+                self._apply_stats_change(cursor, user_id, old_status, row[3])
+                bump_todo_version(cursor, row[0])
+            return row
 
     def update_todo_status(self, todo_id: int, new_status: str):
         """Update only the status of a todo (for status transitions)"""
@@ -245,62 +469,69 @@ class SQLTodo:
             ", completed_at = NOW()" if new_status == "completed" else ""
         )
 
-        self.db.cursor.execute(
-            f"""
-            UPDATE todo
-            SET status = %s, updated_at = NOW(){completed_at_update}
-            WHERE id = %s AND deleted_status = FALSE
-            RETURNING id, title, description, status, priority, due_date, 
-                      completed_at, is_repeat, repeat_type, mood, user_id, 
-                      deleted_status, created_at, updated_at;
-        """,
-            (new_status, todo_id),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            user_id, old_status = self._stats_state(cursor, todo_id)
+            cursor.execute(
+                f"""
+                UPDATE todo
+                SET status = %s, updated_at = NOW(){completed_at_update}
+                WHERE id = %s AND deleted_status = FALSE
+                RETURNING id, title, description, status, priority, due_date, 
+                          completed_at, is_repeat, repeat_type, mood, user_id, 
+                          deleted_status, created_at, updated_at;
+            """,
+                (new_status, todo_id),
+            )
+            row = self._safe_fetchone(cursor)
+            if row:
+                self._apply_stats_change(cursor, user_id, old_status, row[3])
+                bump_todo_version(cursor, row[0])
+            return row
 
     def get_todos_by_due_date(
         self, user_id: int, start_date: datetime, end_date: datetime
     ):
         """Fetch todos within a date range"""
-        self.db.cursor.execute(
-            """
-            SELECT t.id, t.title, t.description, t.status, t.priority, 
-                   t.due_date, t.completed_at, t.is_repeat, t.repeat_type, t.mood,
-                   t.user_id, t.deleted_status, t.created_at, t.updated_at,
-                   u.id, u.username, u.firstname, u.lastname, u.nickname, 
-                   u.role, u.tel, u.created_at, u.picture_url
-            FROM todo t
-            INNER JOIN "user" u ON t.user_id = u.id
-            WHERE t.user_id = %s 
-              AND t.deleted_status = FALSE
-              AND t.due_date BETWEEN %s AND %s
-            ORDER BY t.due_date ASC;
-        """,
-            (user_id, start_date, end_date),
-        )
-        return self._safe_fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT t.id, t.title, t.description, t.status, t.priority, 
+                       t.due_date, t.completed_at, t.is_repeat, t.repeat_type, t.mood,
+                       t.user_id, t.deleted_status, t.created_at, t.updated_at,
+                       u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                       u.role, u.tel, u.created_at, u.picture_url
+                FROM todo t
+                INNER JOIN "user" u ON t.user_id = u.id
+                WHERE t.user_id = %s 
+                  AND t.deleted_status = FALSE
+                  AND t.due_date BETWEEN %s AND %s
+                ORDER BY t.due_date ASC;
+            """,
+                (user_id, start_date, end_date),
+            )
+            return self._safe_fetchall(cursor)
 
     def get_overdue_todos(self, user_id: int):
         """Fetch overdue todos (due_date < NOW() and not completed/cancelled)"""
-        self.db.cursor.execute(
-            """
-            SELECT t.id, t.title, t.description, t.status, t.priority, 
-                   t.due_date, t.completed_at, t.is_repeat, t.repeat_type, t.mood,
-                   t.user_id, t.deleted_status, t.created_at, t.updated_at,
-                   u.id, u.username, u.firstname, u.lastname, u.nickname, 
-                   u.role, u.tel, u.created_at, u.picture_url
-            FROM todo t
-            INNER JOIN "user" u ON t.user_id = u.id
-            WHERE t.user_id = %s 
-              AND t.deleted_status = FALSE
-              AND t.due_date < NOW()
-              AND t.status NOT IN ('completed', 'cancelled')
-            ORDER BY t.due_date ASC;
-        """,
-            (user_id,),
-        )
-        return self._safe_fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT t.id, t.title, t.description, t.status, t.priority, 
+                       t.due_date, t.completed_at, t.is_repeat, t.repeat_type, t.mood,
+                       t.user_id, t.deleted_status, t.created_at, t.updated_at,
+                       u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                       u.role, u.tel, u.created_at, u.picture_url
+                FROM todo t
+                INNER JOIN "user" u ON t.user_id = u.id
+                WHERE t.user_id = %s 
+                  AND t.deleted_status = FALSE
+                  AND t.due_date < NOW()
+                  AND t.status NOT IN ('completed', 'cancelled')
+                ORDER BY t.due_date ASC;
+            """,
+                (user_id,),
+            )
+            return self._safe_fetchall(cursor)
 
     # ===========================
     #    TODO ITEM (CHECKLIST) OPERATIONS
@@ -308,32 +539,56 @@ class SQLTodo:
     def get_todo_items(self, todo_id: int):
         """Fetch all checklist items for a todo"""
         try:
-            self.db.cursor.execute(
-                """
-                SELECT id, todo_id, content, is_done, created_at, COALESCE(updated_at, created_at) as updated_at
-                FROM todo_item
-                WHERE todo_id = %s
-                ORDER BY created_at ASC;
-            """,
-                (todo_id,),
-            )
-            return self._safe_fetchall()
-        except Exception as e:
+            with self.db.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, todo_id, content, is_done, created_at, COALESCE(updated_at, created_at) as updated_at
+                    FROM todo_item
+                    WHERE todo_id = %s
+                    ORDER BY created_at ASC;
+                """,
+                    (todo_id,),
+                )
+                return self._safe_fetchall(cursor)
+        except psycopg2.Error as e:
             print(f"Error fetching todo items for todo_id {todo_id}: {e}")
             return []
 
+    def get_todo_items_for_todos(self, todo_ids: list[int]):
+        """Fetch checklist items for a page of todos in one query"""
+        if not todo_ids:
+            return []
+        try:
+            with self.db.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, todo_id, content, is_done, created_at, COALESCE(updated_at, created_at) as updated_at
+                    FROM todo_item
+                    WHERE todo_id = ANY(%s)
+                    ORDER BY todo_id, created_at ASC;
+                """,
+                    (list(todo_ids),),
+                )
+                return self._safe_fetchall(cursor)
+        except psycopg2.Error as e:
+            print(f"Error fetching todo items for todo_ids {todo_ids}: {e}")
+            return []
+
     def create_todo_item(self, todo_id: int, content: str):
         """Create a checklist item"""
-        self.db.cursor.execute(
-            """
-            INSERT INTO todo_item (todo_id, content, is_done, created_at)
-            VALUES (%s, %s, FALSE, NOW())
-            RETURNING id, todo_id, content, is_done, created_at, updated_at;
-        """,
-            (todo_id, content),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO todo_item (todo_id, content, is_done, created_at)
+                VALUES (%s, %s, FALSE, NOW())
+                RETURNING id, todo_id, content, is_done, created_at, updated_at;
+            """,
+                (todo_id, content),
+            )
+            row = self._safe_fetchone(cursor)
+            if row:
+                bump_todo_version(cursor, row[1])
+            return row
 
     def update_todo_item(
         self, item_id: int, content: str | None = None, is_done: bool | None = None
@@ -362,34 +617,43 @@ class SQLTodo:
             RETURNING id, todo_id, content, is_done, created_at, updated_at;
         """
 
-        self.db.cursor.execute(query, tuple(params))
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            row = self._safe_fetchone(cursor)
+            if row:
+                bump_todo_version(cursor, row[1])
+            return row
 
     def delete_todo_item(self, item_id: int):
         """Delete a checklist item"""
-        self.db.cursor.execute(
-            """
-            DELETE FROM todo_item WHERE id = %s RETURNING id;
-        """,
-            (item_id,),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM todo_item WHERE id = %s RETURNING id, todo_id;
+            """,
+                (item_id,),
+            )
+            row = self._safe_fetchone(cursor)
+            if row:
+                bump_todo_version(cursor, row[1])
+            return row
 
     def toggle_todo_item(self, item_id: int):
         """Toggle the is_done status of a checklist item"""
-        self.db.cursor.execute(
-            """
-            UPDATE todo_item
-            SET is_done = NOT is_done, updated_at = NOW()
-            WHERE id = %s
-            RETURNING id, todo_id, content, is_done, created_at, updated_at;
-        """,
-            (item_id,),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE todo_item
+                SET is_done = NOT is_done, updated_at = NOW()
+                WHERE id = %s
+                RETURNING id, todo_id, content, is_done, created_at, updated_at;
+            """,
+                (item_id,),
+            )
+            row = self._safe_fetchone(cursor)
+            if row:
+                bump_todo_version(cursor, row[1])
+            return row
 
     # ===========================
     #    TODO TAG OPERATIONS
@@ -397,46 +661,48 @@ class SQLTodo:
     def get_todo_tags(self, user_id: int):
         """Fetch all tags for a user"""
         try:
-            self.db.cursor.execute(
+            with self.db.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, name, COALESCE(color, '#808080') as color, user_id, 
+                           COALESCE(created_at, CURRENT_TIMESTAMP) as created_at
+                    FROM todo_tag
+                    WHERE user_id = %s
+                    ORDER BY name ASC;
+                """,
+                    (user_id,),
+                )
+                return self._safe_fetchall(cursor)
+        except psycopg2.Error as e:
+            print(f"Error fetching todo tags: {e}")
+            return []
+
+    def get_todo_tag_by_id(self, tag_id: int):
+        """Fetch a single tag by ID"""
+        with self.db.cursor() as cursor:
+            cursor.execute(
                 """
                 SELECT id, name, COALESCE(color, '#808080') as color, user_id, 
                        COALESCE(created_at, CURRENT_TIMESTAMP) as created_at
                 FROM todo_tag
-                WHERE user_id = %s
-                ORDER BY name ASC;
+                WHERE id = %s;
             """,
-                (user_id,),
+                (tag_id,),
             )
-            return self._safe_fetchall()
-        except Exception as e:
-            print(f"Error fetching todo tags: {e}")
-            return []
-
-    def get_todo_tag_by_id(self, tag_id: int):
-        """Fetch a single tag by ID"""
-        self.db.cursor.execute(
-            """
-            SELECT id, name, COALESCE(color, '#808080') as color, user_id, 
-                   COALESCE(created_at, CURRENT_TIMESTAMP) as created_at
-            FROM todo_tag
-            WHERE id = %s;
-        """,
-            (tag_id,),
-        )
-        return self._safe_fetchone()
+            return self._safe_fetchone(cursor)
 
     def create_todo_tag(self, name: str, user_id: int, color: str | None = None):
         """Create a todo tag"""
-        self.db.cursor.execute(
-            """
-            INSERT INTO todo_tag (name, color, user_id, created_at)
-            VALUES (%s, %s, %s, NOW())
-            RETURNING id, name, color, user_id, created_at;
-        """,
-            (name, color, user_id),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO todo_tag (name, color, user_id, created_at)
+                VALUES (%s, %s, %s, NOW())
+                RETURNING id, name, color, user_id, created_at;
+            """,
+                (name, color, user_id),
+            )
+            return self._safe_fetchone(cursor)
 
     def update_todo_tag(
         self, tag_id: int, name: str | None = None, color: str | None = None
@@ -464,20 +730,29 @@ class SQLTodo:
             RETURNING id, name, color, user_id, created_at;
         """
 
-        self.db.cursor.execute(query, tuple(params))
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(query, tuple(params))
+            row = self._safe_fetchone(cursor)
+            if row:
+                bump_collection_version(
+                    cursor, TODO_COLLECTION, TODO_TAG_AUDIENCE, (tag_id, tag_id)
+                )
+            return row
 
     def delete_todo_tag(self, tag_id: int):
         """Delete a todo tag"""
-        self.db.cursor.execute(
-            """
-            DELETE FROM todo_tag WHERE id = %s RETURNING id;
-        """,
-            (tag_id,),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            # Before the delete: the cascade removes the tag assignments
+            bump_collection_version(
+                cursor, TODO_COLLECTION, TODO_TAG_AUDIENCE, (tag_id, tag_id)
+            )
+            cursor.execute(
+                """
+                DELETE FROM todo_tag WHERE id = %s RETURNING id;
+            """,
+                (tag_id,),
+            )
+            return self._safe_fetchone(cursor)
 
     # ===========================
     #    TODO TAG PIVOT OPERATIONS
@@ -485,85 +760,116 @@ class SQLTodo:
     def get_tags_for_todo(self, todo_id: int):
         """Fetch all tags associated with a todo"""
         try:
-            self.db.cursor.execute(
-                """
-                SELECT tt.id, tt.name, COALESCE(tt.color, '#808080') as color, tt.user_id, 
-                       COALESCE(tt.created_at, CURRENT_TIMESTAMP) as created_at
-                FROM todo_tag tt
-                INNER JOIN todo_tag_pivot ttp ON tt.id = ttp.tag_id
-                WHERE ttp.todo_id = %s
-                ORDER BY tt.name ASC;
-            """,
-                (todo_id,),
-            )
-            return self._safe_fetchall()
-        except Exception as e:
+            with self.db.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT tt.id, tt.name, COALESCE(tt.color, '#808080') as color, tt.user_id, 
+                           COALESCE(tt.created_at, CURRENT_TIMESTAMP) as created_at
+                    FROM todo_tag tt
+                    INNER JOIN todo_tag_pivot ttp ON tt.id = ttp.tag_id
+                    WHERE ttp.todo_id = %s
+                    ORDER BY tt.name ASC;
+                """,
+                    (todo_id,),
+                )
+                return self._safe_fetchall(cursor)
+        except psycopg2.Error as e:
             print(f"Error fetching tags for todo_id {todo_id}: {e}")
             return []
 
+    def get_tags_for_todos(self, todo_ids: list[int]):
+        """Fetch tags for a page of todos in one query (todo_id is the last column)"""
+        if not todo_ids:
+            return []
+        try:
+            with self.db.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT tt.id, tt.name, COALESCE(tt.color, '#808080') as color, tt.user_id, 
+                           COALESCE(tt.created_at, CURRENT_TIMESTAMP) as created_at,
+                           ttp.todo_id
+                    FROM todo_tag tt
+                    INNER JOIN todo_tag_pivot ttp ON tt.id = ttp.tag_id
+                    WHERE ttp.todo_id = ANY(%s)
+                    ORDER BY ttp.todo_id, tt.name ASC;
+                """,
+                    (list(todo_ids),),
+                )
+                return self._safe_fetchall(cursor)
+        except psycopg2.Error as e:
+            print(f"Error fetching tags for todo_ids {todo_ids}: {e}")
+            return []
+
     def add_tag_to_todo(self, todo_id: int, tag_id: int):
         """Add a tag to a todo"""
-        self.db.cursor.execute(
-            """
-            INSERT INTO todo_tag_pivot (todo_id, tag_id)
-            VALUES (%s, %s)
-            ON CONFLICT (todo_id, tag_id) DO NOTHING
-            RETURNING todo_id, tag_id;
-        """,
-            (todo_id, tag_id),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO todo_tag_pivot (todo_id, tag_id)
+                VALUES (%s, %s)
+                ON CONFLICT (todo_id, tag_id) DO NOTHING
+                RETURNING todo_id, tag_id;
+            """,
+                (todo_id, tag_id),
+            )
+            row = self._safe_fetchone(cursor)
+            if row:
+                bump_todo_version(cursor, todo_id)
+            return row
 
     def remove_tag_from_todo(self, todo_id: int, tag_id: int):
         """Remove a tag from a todo"""
-        self.db.cursor.execute(
-            """
-            DELETE FROM todo_tag_pivot
-            WHERE todo_id = %s AND tag_id = %s
-            RETURNING todo_id, tag_id;
-        """,
-            (todo_id, tag_id),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM todo_tag_pivot
+                WHERE todo_id = %s AND tag_id = %s
+                RETURNING todo_id, tag_id;
+            """,
+                (todo_id, tag_id),
+            )
+            row = self._safe_fetchone(cursor)
+            if row:
+                bump_todo_version(cursor, todo_id)
+            return row
 
     def set_tags_for_todo(self, todo_id: int, tag_ids: list[int]):
         """Replace all tags for a todo with the given list"""
-        # Remove existing tags
-        self.db.cursor.execute(
-            "DELETE FROM todo_tag_pivot WHERE todo_id = %s;",
-            (todo_id,),
-        )
-
-        # Add new tags
-        if tag_ids:
-            values = [(todo_id, tag_id) for tag_id in tag_ids]
-            self.db.cursor.executemany(
-                "INSERT INTO todo_tag_pivot (todo_id, tag_id) VALUES (%s, %s) ON CONFLICT DO NOTHING;",
-                values,
+        with self.db.cursor() as cursor:
+            # Remove existing tags
+            cursor.execute(
+                "DELETE FROM todo_tag_pivot WHERE todo_id = %s;",
+                (todo_id,),
             )
 
-        self.db.connection.commit()
+            # Add new tags
+            if tag_ids:
+                values = [(todo_id, tag_id) for tag_id in tag_ids]
+                cursor.executemany(
+                    "INSERT INTO todo_tag_pivot (todo_id, tag_id) VALUES (%s, %s) ON CONFLICT DO NOTHING;",
+                    values,
+                )
+            bump_todo_version(cursor, todo_id)
 
     def get_todos_by_tag(self, tag_id: int, user_id: int):
         """Fetch todos by tag"""
-        self.db.cursor.execute(
-            """
-            SELECT t.id, t.title, t.description, t.status, t.priority, 
-                   t.due_date, t.completed_at, t.is_repeat, t.repeat_type, t.mood,
-                   t.user_id, t.deleted_status, t.created_at, t.updated_at,
-                   u.id, u.username, u.firstname, u.lastname, u.nickname, 
-                   u.role, u.tel, u.created_at, u.picture_url
-            FROM todo t
-            INNER JOIN "user" u ON t.user_id = u.id
-            INNER JOIN todo_tag_pivot ttp ON t.id = ttp.todo_id
-            WHERE ttp.tag_id = %s AND t.user_id = %s AND t.deleted_status = FALSE
-            ORDER BY t.due_date ASC NULLS LAST;
-        """,
-            (tag_id, user_id),
-        )
-        return self._safe_fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT t.id, t.title, t.description, t.status, t.priority, 
+                       t.due_date, t.completed_at, t.is_repeat, t.repeat_type, t.mood,
+                       t.user_id, t.deleted_status, t.created_at, t.updated_at,
+                       u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                       u.role, u.tel, u.created_at, u.picture_url
+                FROM todo t
+                INNER JOIN "user" u ON t.user_id = u.id
+                INNER JOIN todo_tag_pivot ttp ON t.id = ttp.todo_id
+                WHERE ttp.tag_id = %s AND t.user_id = %s AND t.deleted_status = FALSE
+                ORDER BY t.due_date ASC NULLS LAST;
+            """,
+                (tag_id, user_id),
+            )
+            return self._safe_fetchall(cursor)
 
     # ===========================
     #    TODO SHARE OPERATIONS
@@ -571,224 +877,395 @@ class SQLTodo:
     def get_todo_shares(self, todo_id: int):
         """Fetch all shares for a todo"""
         try:
-            self.db.cursor.execute(
+            with self.db.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT ts.id, ts.todo_id, ts.shared_with_user_id, ts.permission, ts.created_at,
+                           u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                           u.role, u.tel, u.created_at, u.picture_url
+                    FROM todo_share ts
+                    INNER JOIN "user" u ON ts.shared_with_user_id = u.id
+                    WHERE ts.todo_id = %s;
+                """,
+                    (todo_id,),
+                )
+                return self._safe_fetchall(cursor)
+        except psycopg2.Error as e:
+            print(f"Error fetching shares for todo_id {todo_id}: {e}")
+            return []
+
+    def get_shares_for_todos(self, todo_ids: list[int]):
+        """Fetch shares for a page of todos in one query"""
+        if not todo_ids:
+            return []
+        try:
+            with self.db.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT ts.id, ts.todo_id, ts.shared_with_user_id, ts.permission, ts.created_at,
+                           u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                           u.role, u.tel, u.created_at, u.picture_url
+                    FROM todo_share ts
+                    INNER JOIN "user" u ON ts.shared_with_user_id = u.id
+                    WHERE ts.todo_id = ANY(%s)
+                    ORDER BY ts.todo_id, ts.id;
+                """,
+                    (list(todo_ids),),
+                )
+                return self._safe_fetchall(cursor)
+        except psycopg2.Error as e:
+            print(f"Error fetching shares for todo_ids {todo_ids}: {e}")
+            return []
+
+    def get_share_by_id(self, share_id: int):
+        """Fetch a single share by ID"""
+        with self.db.cursor() as cursor:
+            cursor.execute(
                 """
                 SELECT ts.id, ts.todo_id, ts.shared_with_user_id, ts.permission, ts.created_at,
                        u.id, u.username, u.firstname, u.lastname, u.nickname, 
                        u.role, u.tel, u.created_at, u.picture_url
                 FROM todo_share ts
                 INNER JOIN "user" u ON ts.shared_with_user_id = u.id
-                WHERE ts.todo_id = %s;
+                WHERE ts.id = %s;
             """,
-                (todo_id,),
+                (share_id,),
             )
-            return self._safe_fetchall()
-        except Exception as e:
-            print(f"Error fetching shares for todo_id {todo_id}: {e}")
-            return []
-
-    def get_share_by_id(self, share_id: int):
-        """Fetch a single share by ID"""
-        self.db.cursor.execute(
-            """
-            SELECT ts.id, ts.todo_id, ts.shared_with_user_id, ts.permission, ts.created_at,
-                   u.id, u.username, u.firstname, u.lastname, u.nickname, 
-                   u.role, u.tel, u.created_at, u.picture_url
-            FROM todo_share ts
-            INNER JOIN "user" u ON ts.shared_with_user_id = u.id
-            WHERE ts.id = %s;
-        """,
-            (share_id,),
-        )
-        return self._safe_fetchone()
+            return self._safe_fetchone(cursor)
 
     def share_todo(
         self, todo_id: int, shared_with_user_id: int, permission: str = "view"
     ):
         """Share a todo with another user"""
-        self.db.cursor.execute(
-            """
-            INSERT INTO todo_share (todo_id, shared_with_user_id, permission, created_at)
-            VALUES (%s, %s, %s, NOW())
-            ON CONFLICT (todo_id, shared_with_user_id) DO UPDATE SET permission = %s
-            RETURNING id, todo_id, shared_with_user_id, permission, created_at;
-        """,
-            (todo_id, shared_with_user_id, permission, permission),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO todo_share (todo_id, shared_with_user_id, permission, created_at)
+                VALUES (%s, %s, %s, NOW())
+                ON CONFLICT (todo_id, shared_with_user_id) DO UPDATE SET permission = %s
+                RETURNING id, todo_id, shared_with_user_id, permission, created_at;
+            """,
+                (todo_id, shared_with_user_id, permission, permission),
+            )
+            row = self._safe_fetchone(cursor)
+            if row:
+                bump_todo_version(cursor, todo_id)
+            return row
 
     def update_share_permission(self, share_id: int, permission: str):
         """Update share permission"""
-        self.db.cursor.execute(
-            """
-            UPDATE todo_share
-            SET permission = %s
-            WHERE id = %s
-            RETURNING id, todo_id, shared_with_user_id, permission, created_at;
-        """,
-            (permission, share_id),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE todo_share
+                SET permission = %s
+                WHERE id = %s
+                RETURNING id, todo_id, shared_with_user_id, permission, created_at;
+            """,
+                (permission, share_id),
+            )
+            row = self._safe_fetchone(cursor)
+            if row:
+                bump_todo_version(cursor, row[1])
+            return row
 
     def unshare_todo(self, todo_id: int, shared_with_user_id: int):
         """Remove share access from a user"""
-        self.db.cursor.execute(
-            """
-            DELETE FROM todo_share
-            WHERE todo_id = %s AND shared_with_user_id = %s
-            RETURNING id;
-        """,
-            (todo_id, shared_with_user_id),
-        )
-        self.db.connection.commit()
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            # Before the delete, so the user losing access is included
+            bump_todo_version(cursor, todo_id)
+            cursor.execute(
+                """
+                DELETE FROM todo_share
+                WHERE todo_id = %s AND shared_with_user_id = %s
+                RETURNING id;
+            """,
+                (todo_id, shared_with_user_id),
+            )
+            return self._safe_fetchone(cursor)
 
     def check_todo_access(self, todo_id: int, user_id: int):
         """Check if user has access to a todo (owner or shared)"""
-        self.db.cursor.execute(
-            """
-            SELECT t.user_id, ts.permission
-            FROM todo t
-            LEFT JOIN todo_share ts ON t.id = ts.todo_id AND ts.shared_with_user_id = %s
-            WHERE t.id = %s;
-        """,
-            (user_id, todo_id),
-        )
-        return self._safe_fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT t.user_id, ts.permission
+                FROM todo t
+                LEFT JOIN todo_share ts ON t.id = ts.todo_id AND ts.shared_with_user_id = %s
+                WHERE t.id = %s;
+            """,
+                (user_id, todo_id),
+            )
+            return self._safe_fetchone(cursor)
 
     # ===========================
     #    TODO STATUS HISTORY OPERATIONS
     # ===========================
     def get_status_history(self, todo_id: int):
         """Fetch status history for a todo"""
-        self.db.cursor.execute(
-            """
-            SELECT tsh.id, tsh.todo_id, tsh.old_status, tsh.new_status, 
-                   tsh.changed_by, tsh.changed_at,
-                   u.id, u.username, u.firstname, u.lastname, u.nickname, 
-                   u.role, u.tel, u.created_at, u.picture_url
-            FROM todo_status_history tsh
-            INNER JOIN "user" u ON tsh.changed_by = u.id
-            WHERE tsh.todo_id = %s
-            ORDER BY tsh.changed_at DESC;
-        """,
-            (todo_id,),
-        )
-        return self._safe_fetchall()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT tsh.id, tsh.todo_id, tsh.old_status, tsh.new_status, 
+                       tsh.changed_by, tsh.changed_at,
+                       u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                       u.role, u.tel, u.created_at, u.picture_url
+                FROM todo_status_history tsh
+                INNER JOIN "user" u ON tsh.changed_by = u.id
+                WHERE tsh.todo_id = %s
+                ORDER BY tsh.changed_at DESC;
+            """,
+                (todo_id,),
+            )
+            return self._safe_fetchall(cursor)
 
     def add_status_history(
         self, todo_id: int, old_status: str, new_status: str, changed_by: int
     ):
         """Add a status change to history"""
-        self.db.cursor.execute(
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO todo_status_history (todo_id, old_status, new_status, changed_by, changed_at)
+                VALUES (%s, %s, %s, %s, NOW())
+                RETURNING id, todo_id, old_status, new_status, changed_by, changed_at;
+            """,
+                (todo_id, old_status, new_status, changed_by),
+            )
+            row = self._safe_fetchone(cursor)
+            if row and new_status == "completed":
+                self._record_completion(cursor, todo_id)
+            return row
+
+    def _record_completion(self, cursor, todo_id: int):
+        """
+        Advance the todo owner's streak in todo_user_stats for a completion today.
+
+        Same day as the last completion: streak unchanged. The day after:
+        streak + 1. Later than that: a new streak of 1.
+        """
+        cursor.execute("SELECT user_id FROM todo WHERE id = %s;", (todo_id,))
+        row = cursor.fetchone()
+        if not row or self._ensure_stats_row(cursor, row[0]):
+            return
+
+        cursor.execute(
             """
-            INSERT INTO todo_status_history (todo_id, old_status, new_status, changed_by, changed_at)
-            VALUES (%s, %s, %s, %s, NOW())
-            RETURNING id, todo_id, old_status, new_status, changed_by, changed_at;
+            UPDATE todo_user_stats AS s
+            SET total_completed = s.total_completed + 1,
+                current_streak = CASE
+                    WHEN s.last_completed_date = CURRENT_DATE THEN GREATEST(s.current_streak, 1)
+                    WHEN s.last_completed_date = CURRENT_DATE - 1 THEN s.current_streak + 1
+                    ELSE 1
+                END,
+                longest_streak = GREATEST(s.longest_streak, CASE
+                    WHEN s.last_completed_date = CURRENT_DATE THEN GREATEST(s.current_streak, 1)
+                    WHEN s.last_completed_date = CURRENT_DATE - 1 THEN s.current_streak + 1
+                    ELSE 1
+                END),
+                last_completed_date = CURRENT_DATE,
+                updated_at = NOW()
+            WHERE s.user_id = %s;
         """,
-            (todo_id, old_status, new_status, changed_by),
+            (row[0],),
         )
-        self.db.connection.commit()
-        return self._safe_fetchone()
 
     # ===========================
     #    STREAK CALCULATION
     # ===========================
     def get_completion_dates(self, user_id: int, days: int = 365):
         """Fetch distinct dates when user completed todos (for streak calculation)"""
-        self.db.cursor.execute(
-            """
-            SELECT DISTINCT DATE(tsh.changed_at) as completion_date
-            FROM todo_status_history tsh
-            INNER JOIN todo t ON tsh.todo_id = t.id
-            WHERE t.user_id = %s 
-              AND tsh.new_status = 'completed'
-              AND tsh.changed_at >= NOW() - INTERVAL '%s days'
-            ORDER BY completion_date DESC;
-        """,
-            (user_id, days),
-        )
-        return self._safe_fetchall()
-
-    def get_streak_summary_raw(self, user_id: int):
-        """
-        Calculate streak directly in SQL for better performance.
-        Returns: current_streak, longest_streak, total_completed, last_completed_date
-        """
-        self.db.cursor.execute(
-            """
-            WITH completion_dates AS (
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
                 SELECT DISTINCT DATE(tsh.changed_at) as completion_date
                 FROM todo_status_history tsh
                 INNER JOIN todo t ON tsh.todo_id = t.id
-                WHERE t.user_id = %s AND tsh.new_status = 'completed'
-                ORDER BY completion_date DESC
-            ),
-            date_with_gaps AS (
-                SELECT 
-                    completion_date,
-                    completion_date - (ROW_NUMBER() OVER (ORDER BY completion_date DESC))::int as grp
-                FROM completion_dates
-            ),
-            streaks AS (
-                SELECT 
-                    grp,
-                    COUNT(*) as streak_length,
-                    MAX(completion_date) as streak_end,
-                    MIN(completion_date) as streak_start
-                FROM date_with_gaps
-                GROUP BY grp
-            ),
-            current_streak AS (
-                SELECT 
-                    CASE 
-                        WHEN MAX(completion_date) >= CURRENT_DATE - 1 THEN 
-                            (SELECT streak_length FROM streaks ORDER BY streak_end DESC LIMIT 1)
-                        ELSE 0
-                    END as current_streak
-                FROM completion_dates
-            ),
-            stats AS (
-                SELECT 
-                    (SELECT current_streak FROM current_streak) as current_streak,
-                    COALESCE((SELECT MAX(streak_length) FROM streaks), 0) as longest_streak,
-                    (SELECT COUNT(*) FROM todo_status_history tsh 
-                     INNER JOIN todo t ON tsh.todo_id = t.id 
-                     WHERE t.user_id = %s AND tsh.new_status = 'completed') as total_completed,
-                    (SELECT MAX(completion_date) FROM completion_dates) as last_completed_date
-            )
-            SELECT current_streak, longest_streak, total_completed, last_completed_date FROM stats;
-        """,
-            (user_id, user_id),
-        )
-        try:
-            result = self._safe_fetchone()
-            return result if result else (0, 0, 0, None)
-        except Exception:
-            return (0, 0, 0, None)
+                WHERE t.user_id = %s 
+                  AND tsh.new_status = 'completed'
+                  AND tsh.changed_at >= NOW() - INTERVAL '%s days'
+                ORDER BY completion_date DESC;
+            """,
+                (user_id, days),
+            )
+            return self._safe_fetchall(cursor)
 
     # ===========================
     #    ANALYTICS
     # ===========================
-    def get_todo_stats(self, user_id: int):
-        """Get todo statistics for a user"""
-        try:
-            self.db.cursor.execute(
+    def get_user_stats(self, user_id: int):
+        """
+        Read the incrementally maintained counters for a user.
+
+        Returns (total, completed, pending, in_progress, cancelled,
+        current_streak, longest_streak, total_completed, last_completed_date)
+        or None if the user has no stats row yet. current_streak is already
+        zeroed when the last completion is older than yesterday.
+        """
+        with self.db.cursor() as cursor:
+            cursor.execute(
                 """
-                SELECT 
-                    COUNT(*) FILTER (WHERE deleted_status = FALSE) as total_todos,
-                    COUNT(*) FILTER (WHERE status = 'completed' AND deleted_status = FALSE) as completed_todos,
-                    COUNT(*) FILTER (WHERE status = 'pending' AND deleted_status = FALSE) as pending_todos,
-                    COUNT(*) FILTER (WHERE status = 'in_progress' AND deleted_status = FALSE) as in_progress_todos,
-                    COUNT(*) FILTER (WHERE status = 'cancelled' AND deleted_status = FALSE) as cancelled_todos
-                FROM todo
+                SELECT total_todos, completed_todos, pending_todos,
+                       in_progress_todos, cancelled_todos,
+                       CASE WHEN last_completed_date >= CURRENT_DATE - 1
+                            THEN current_streak ELSE 0 END,
+                       longest_streak, total_completed, last_completed_date
+                FROM todo_user_stats
                 WHERE user_id = %s;
             """,
                 (user_id,),
             )
-            result = self._safe_fetchone()
-            return result if result else (0, 0, 0, 0, 0)
-        except Exception:
-            return (0, 0, 0, 0, 0)
+            return self._safe_fetchone(cursor)
+
+    def get_analytics_raw(self, user_id: int):
+        """
+        Compute status counts and streak for a user in a single query.
+
+        Fallback for users without a todo_user_stats row; returns the same
+        column layout as get_user_stats.
+        """
+        with self.db.cursor() as cursor:
+            cursor.execute(USER_ANALYTICS_QUERY, (user_id, user_id))
+            return self._safe_fetchone(cursor)
+
+    # ===========================
+    #    RECURRING TODOS
+    # ===========================
+    def materialize_recurring_todos(self, horizon: datetime):
+        """
+        Create upcoming occurrences of every repeating todo up to `horizon`.
+
+        Templates are repeating todos that are not themselves occurrences
+        (repeat_parent_id IS NULL) and have a due_date to anchor the series.
+        Occurrence n is due at due_date + n * step, which keeps month-end
+        anchors stable (Jan 31 -> Feb 28 -> Mar 31). Only future periods are
+        generated; missed past periods are skipped.
+
+        Idempotent per period through the unique (repeat_parent_id,
+        occurrence_date) index: re-running inserts nothing new, and only
+        newly inserted occurrences get checklist items and tags cloned.
+
+        Returns:
+            List of (new_todo_id, template_id) rows that were created
+        """
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                WITH templates AS (
+                    SELECT t.*,
+                           CASE t.repeat_type
+                               WHEN 'daily' THEN INTERVAL '1 day'
+                               WHEN 'weekly' THEN INTERVAL '1 week'
+                               ELSE INTERVAL '1 month'
+                           END AS step,
+                           -- Shortest/longest real length of one step, used
+                           -- only to bound generate_series
+                           CASE t.repeat_type
+                               WHEN 'daily' THEN 86400
+                               WHEN 'weekly' THEN 604800
+                               ELSE 2419200
+                           END AS min_step_seconds,
+                           CASE t.repeat_type
+                               WHEN 'daily' THEN 86400
+                               WHEN 'weekly' THEN 604800
+                               ELSE 2678400
+                           END AS max_step_seconds
+                    FROM todo t
+                    WHERE t.is_repeat = TRUE
+                      AND t.repeat_type IS NOT NULL
+                      AND t.repeat_parent_id IS NULL
+                      AND t.deleted_status = FALSE
+                      AND t.due_date IS NOT NULL
+                      AND t.due_date < %(horizon)s
+                ),
+                occurrences AS (
+                    SELECT tp.*, tp.due_date + n * tp.step AS occurrence_due
+                    FROM templates tp
+                    CROSS JOIN LATERAL generate_series(
+                        GREATEST(
+                            1,
+                            FLOOR(EXTRACT(EPOCH FROM (NOW() - tp.due_date)) / tp.max_step_seconds)::int - 1
+                        ),
+                        CEIL(EXTRACT(EPOCH FROM (%(horizon)s - tp.due_date)) / tp.min_step_seconds)::int + 1
+                    ) AS n
+                )
+                INSERT INTO todo (
+                    title, description, status, priority, due_date,
+                    is_repeat, repeat_type, mood, user_id, deleted_status, created_at,
+                    repeat_parent_id, occurrence_date
+                )
+                SELECT title, description, 'pending', priority, occurrence_due,
+                       TRUE, repeat_type, NULL, user_id, FALSE, NOW(),
+                       id, (occurrence_due AT TIME ZONE 'UTC')::date
+                FROM occurrences
+                WHERE occurrence_due > NOW() AND occurrence_due <= %(horizon)s
+                ORDER BY id, occurrence_due
+                ON CONFLICT (repeat_parent_id, occurrence_date) DO NOTHING
+                RETURNING id, repeat_parent_id;
+            """,
+                {"horizon": horizon},
+            )
+            created = cursor.fetchall()
+            if not created:
+                return []
+
+            new_ids = [row[0] for row in created]
+            template_ids = [row[1] for row in created]
+
+            # New occurrences are pending; add them to each owner's counters
+            # (owners seeded from a recount here already include them)
+            cursor.execute(
+                "SELECT DISTINCT user_id FROM todo WHERE id = ANY(%s);", (new_ids,)
+            )
+            seeded = [
+                owner_id
+                for (owner_id,) in cursor.fetchall()
+                if self._ensure_stats_row(cursor, owner_id)
+            ]
+            cursor.execute(
+                """
+                UPDATE todo_user_stats AS s
+                SET total_todos = s.total_todos + n.created,
+                    pending_todos = s.pending_todos + n.created,
+                    updated_at = NOW()
+                FROM (
+                    SELECT user_id, COUNT(*) AS created
+                    FROM todo
+                    WHERE id = ANY(%s) AND NOT (user_id = ANY(%s))
+                    GROUP BY user_id
+                ) AS n
+                WHERE s.user_id = n.user_id;
+            """,
+                (new_ids, seeded),
+            )
+            bump_collection_version(
+                cursor,
+                TODO_COLLECTION,
+                "SELECT user_id FROM todo WHERE id = ANY(%s)",
+                (new_ids,),
+            )
+
+            # Clone checklist items (reset to not done) for every new occurrence
+            cursor.execute(
+                """
+                INSERT INTO todo_item (todo_id, content, is_done, created_at)
+                SELECT occ.id, ti.content, FALSE, NOW()
+                FROM unnest(%s::int[], %s::int[]) AS occ(id, template_id)
+                INNER JOIN todo_item ti ON ti.todo_id = occ.template_id
+                ORDER BY occ.id, ti.id;
+            """,
+                (new_ids, template_ids),
+            )
+
+            # Clone tag assignments
+            cursor.execute(
+                """
+                INSERT INTO todo_tag_pivot (todo_id, tag_id)
+                SELECT occ.id, ttp.tag_id
+                FROM unnest(%s::int[], %s::int[]) AS occ(id, template_id)
+                INNER JOIN todo_tag_pivot ttp ON ttp.todo_id = occ.template_id
+                ON CONFLICT DO NOTHING;
+            """,
+                (new_ids, template_ids),
+            )
+            return created
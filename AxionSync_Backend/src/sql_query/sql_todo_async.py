@@ -0,0 +1,136 @@
+from src.database.connect import AsyncDatabase
+from typing import Any
+
+
+class AsyncSQLTodo:
+    """Async (asyncpg) counterparts of the hot SQLTodo read queries"""
+
+    def __init__(self):
+        self.db = AsyncDatabase()
+
+    # ===========================
+    #    TODO READ OPERATIONS
+    # ===========================
+    async def get_todos(
+        self,
+        user_id: int,
+        limit: int = 100,
+        status: str | None = None,
+        priority: str | None = None,
+        include_deleted: bool = False,
+        after: tuple | None = None,
+    ):
+        """Fetch todos for a user with optional filters, including shared todos"""
+        query = """
+            SELECT DISTINCT t.id, t.title, t.description, t.status, t.priority, 
+                   t.due_date, t.completed_at, t.is_repeat, t.repeat_type, t.mood,
+                   t.user_id, t.deleted_status, t.created_at, t.updated_at,
+                   u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                   u.role, u.tel, u.created_at, u.picture_url
+            FROM todo t
+            INNER JOIN "user" u ON t.user_id = u.id
+            LEFT JOIN todo_share ts ON t.id = ts.todo_id AND ts.shared_with_user_id = $1
+            WHERE (t.user_id = $1 OR ts.shared_with_user_id = $1)
+        """
+        params: list[Any] = [user_id]
+
+        if not include_deleted:
+            query += " AND t.deleted_status = FALSE"
+
+        if status is not None:
+            params.append(status)
+            query += f" AND t.status = ${len(params)}"
+
+        if priority is not None:
+            params.append(priority)
+            query += f" AND t.priority = ${len(params)}"
+
+        if after is not None:
+            after_due, after_created, after_id = after
+            params.extend([after_created, after_id])
+            key = f"(t.created_at, t.id) < (${len(params) - 1}, ${len(params)})"
+            if after_due is not None:
+                params.append(after_due)
+                query += f""" AND (t.due_date > ${len(params)} OR t.due_date IS NULL
+                    OR (t.due_date = ${len(params)} AND {key}))"""
+            else:
+                query += f" AND t.due_date IS NULL AND {key}"
+
+        params.append(limit)
+        query += f" ORDER BY t.due_date ASC NULLS LAST, t.created_at DESC, t.id DESC LIMIT ${len(params)};"
+
+        async with self.db.connection() as conn:
+            return await conn.fetch(query, *params)
+
+    async def get_todo_by_id(self, todo_id: int, include_deleted: bool = False):
+        """Fetch a single todo by ID with user info"""
+        query = """
+            SELECT t.id, t.title, t.description, t.status, t.priority, 
+                   t.due_date, t.completed_at, t.is_repeat, t.repeat_type, t.mood,
+                   t.user_id, t.deleted_status, t.created_at, t.updated_at,
+                   u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                   u.role, u.tel, u.created_at, u.picture_url
+            FROM todo t
+            INNER JOIN "user" u ON t.user_id = u.id
+            WHERE t.id = $1
+        """
+        if not include_deleted:
+            query += " AND t.deleted_status = FALSE"
+        query += ";"
+
+        async with self.db.connection() as conn:
+            return await conn.fetchrow(query, todo_id)
+
+    # ===========================
+    #    BULK RELATION OPERATIONS
+    # ===========================
+    async def get_todo_items_for_todos(self, todo_ids: list[int]):
+        """Fetch checklist items for a page of todos in one query"""
+        if not todo_ids:
+            return []
+        async with self.db.connection() as conn:
+            return await conn.fetch(
+                """
+                SELECT id, todo_id, content, is_done, created_at, COALESCE(updated_at, created_at) as updated_at
+                FROM todo_item
+                WHERE todo_id = ANY($1::int[])
+                ORDER BY todo_id, created_at ASC;
+            """,
+                list(todo_ids),
+            )
+
+    async def get_tags_for_todos(self, todo_ids: list[int]):
+        """Fetch tags for a page of todos in one query (todo_id is the last column)"""
+        if not todo_ids:
+            return []
+        async with self.db.connection() as conn:
+            return await conn.fetch(
+                """
+                SELECT tt.id, tt.name, COALESCE(tt.color, '#808080') as color, tt.user_id, 
+                       COALESCE(tt.created_at, CURRENT_TIMESTAMP) as created_at,
+                       ttp.todo_id
+                FROM todo_tag tt
+                INNER JOIN todo_tag_pivot ttp ON tt.id = ttp.tag_id
+                WHERE ttp.todo_id = ANY($1::int[])
+                ORDER BY ttp.todo_id, tt.name ASC;
+            """,
+                list(todo_ids),
+            )
+
+    async def get_shares_for_todos(self, todo_ids: list[int]):
+        """Fetch shares for a page of todos in one query"""
+        if not todo_ids:
+            return []
+        async with self.db.connection() as conn:
+            return await conn.fetch(
+                """
+                SELECT ts.id, ts.todo_id, ts.shared_with_user_id, ts.permission, ts.created_at,
+                       u.id, u.username, u.firstname, u.lastname, u.nickname, 
+                       u.role, u.tel, u.created_at, u.picture_url
+                FROM todo_share ts
+                INNER JOIN "user" u ON ts.shared_with_user_id = u.id
+                WHERE ts.todo_id = ANY($1::int[])
+                ORDER BY ts.todo_id, ts.id;
+            """,
+                list(todo_ids),
+            )
@@ -1,4 +1,11 @@
 from src.database.connect import Database
+from src.sql_query.sql_blob import RELEASE_BLOB_QUERY
+from src.sql_query.sql_collection_version import (
+    TODO_COLLECTION,
+    TODO_SHARE_PARTNER_AUDIENCE,
+    bump_collection_version,
+    bump_user_versions,
+)
 
 
 class SQLUser:
@@ -6,24 +13,26 @@ class SQLUser:
         self.db = Database()
 
     def get_users(self):
-        self.db.cursor.execute(
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id, username, firstname, lastname, nickname, role, tel, picture_url, created_at, picture_thumbnail
+                FROM "user";
             """
-            SELECT id, username, firstname, lastname, nickname, role, tel, picture_url, created_at
-            FROM "user";
-        """
-        )
-        return self.db.cursor.fetchall()
+            )
+            return cursor.fetchall()
 
     def get_user_by_id(self, user_id: int):
-        self.db.cursor.execute(
-            """
-            SELECT id, username, firstname, lastname, nickname, role, tel, picture_url, created_at, updated_at
-            FROM "user"
-            WHERE id = %s;
-        """,
-            (user_id,),
-        )
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id, username, firstname, lastname, nickname, role, tel, picture_url, created_at, updated_at, picture_thumbnail
+                FROM "user"
+                WHERE id = %s;
+            """,
+                (user_id,),
+            )
+            return cursor.fetchone()
 
     def create_user(
         self,
@@ -38,34 +47,35 @@ class SQLUser:
     ):
         # Use provided picture_url or default to 'unidentified.jpg'
         pic_url = picture_url if picture_url else "unidentified.jpg"
-        self.db.cursor.execute(
-            """
-                INSERT INTO "user" (username, password_hash, firstname, lastname, nickname, role, tel, picture_url, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
-                RETURNING id, username, firstname, lastname, nickname, role, tel, picture_url, created_at;
-                """,
-            (
-                username,
-                password_hash,
-                firstname,
-                lastname,
-                nickname,
-                role,
-                tel,
-                pic_url,
-            ),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                    INSERT INTO "user" (username, password_hash, firstname, lastname, nickname, role, tel, picture_url, created_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                    RETURNING id, username, firstname, lastname, nickname, role, tel, picture_url, created_at;
+                    """,
+                (
+                    username,
+                    password_hash,
+                    firstname,
+                    lastname,
+                    nickname,
+                    role,
+                    tel,
+                    pic_url,
+                ),
+            )
+            return cursor.fetchone()
 
     def check_username_exists(self, username: str):
-        self.db.cursor.execute(
-            """
-            SELECT id FROM "user" WHERE username = %s;
-            """,
-            (username,),
-        )
-        return self.db.cursor.fetchone() is not None
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id FROM "user" WHERE username = %s;
+                """,
+                (username,),
+            )
+            return cursor.fetchone() is not None
 
     def update_user(
         self,
@@ -76,17 +86,20 @@ class SQLUser:
         role=None,
         tel=None,
     ):
-        self.db.cursor.execute(
-            """
-                UPDATE "user"
-                SET firstname = %s, lastname = %s, nickname = %s, role = %s, tel = %s, updated_at = NOW()
-                WHERE id = %s
-                RETURNING id, username, firstname, lastname, nickname, role, tel, picture_url, created_at, updated_at;
-                """,
-            (firstname, lastname, nickname, role, tel, user_id),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                    UPDATE "user"
+                    SET firstname = %s, lastname = %s, nickname = %s, role = %s, tel = %s, updated_at = NOW()
+                    WHERE id = %s
+                    RETURNING id, username, firstname, lastname, nickname, role, tel, picture_url, created_at, updated_at;
+                    """,
+                (firstname, lastname, nickname, role, tel, user_id),
+            )
+            row = cursor.fetchone()
+            if row:
+                bump_user_versions(cursor, user_id)
+            return row
 
     def update_user_profile(
         self,
@@ -96,43 +109,75 @@ class SQLUser:
         nickname=None,
         tel=None,
     ):
-        self.db.cursor.execute(
-            """
-                UPDATE "user"
-                SET firstname = COALESCE(%s, firstname), 
-                    lastname = COALESCE(%s, lastname), 
-                    nickname = COALESCE(%s, nickname), 
-                    tel = COALESCE(%s, tel), 
-                    updated_at = NOW()
-                WHERE id = %s
-                RETURNING id, username, firstname, lastname, nickname, role, tel, picture_url, created_at, updated_at;
-                """,
-            (firstname, lastname, nickname, tel, user_id),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                    UPDATE "user"
+                    SET firstname = COALESCE(%s, firstname), 
+                        lastname = COALESCE(%s, lastname), 
+                        nickname = COALESCE(%s, nickname), 
+                        tel = COALESCE(%s, tel), 
+                        updated_at = NOW()
+                    WHERE id = %s
+                    RETURNING id, username, firstname, lastname, nickname, role, tel, picture_url, created_at, updated_at;
+                    """,
+                (firstname, lastname, nickname, tel, user_id),
+            )
+            row = cursor.fetchone()
+            if row:
+                bump_user_versions(cursor, user_id)
+            return row
 
     def update_user_picture(self, user_id: int, picture_url: str):
-        self.db.cursor.execute(
-            """
-                UPDATE "user"
-                SET picture_url = %s, updated_at = NOW()
-                WHERE id = %s
-                RETURNING id, username, firstname, lastname, nickname, role, tel, picture_url, created_at, updated_at;
-                """,
-            (picture_url, user_id),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        # Release the previous picture in the same transaction
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                'SELECT picture_url FROM "user" WHERE id = %s FOR UPDATE;',
+                (user_id,),
+            )
+            previous = cursor.fetchone()
+            cursor.execute(
+                """
+                    UPDATE "user"
+                    SET picture_url = %s, picture_thumbnail = NULL, updated_at = NOW()
+                    WHERE id = %s
+                    RETURNING id, username, firstname, lastname, nickname, role, tel, picture_url, created_at, updated_at;
+                    """,
+                (picture_url, user_id),
+            )
+            row = cursor.fetchone()
+            if row and previous and previous[0]:
+                cursor.execute(RELEASE_BLOB_QUERY, ("avatar", previous[0]))
+            if row:
+                bump_user_versions(cursor, user_id)
+            return row
+
+    def update_picture_thumbnail(self, user_id: int, picture_url: str, thumbnail: str):
+        # Only if picture_url is still current (a newer upload may have replaced it)
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                """
+                    UPDATE "user"
+                    SET picture_thumbnail = %s
+                    WHERE id = %s AND picture_url = %s
+                    RETURNING id;
+                    """,
+                (thumbnail, user_id, picture_url),
+            )
+            return cursor.fetchone()
 
     def delete_user(self, user_id: int):
-        self.db.cursor.execute(
-            """
-                DELETE FROM "user"
-                WHERE id = %s
-                RETURNING id;
-                """,
-            (user_id,),
-        )
-        self.db.connection.commit()
-        return self.db.cursor.fetchone()
+        with self.db.cursor() as cursor:
+            # Todos shared with or by this user disappear from other lists
+            bump_collection_version(
+                cursor, TODO_COLLECTION, TODO_SHARE_PARTNER_AUDIENCE, (user_id, user_id)
+            )
+            cursor.execute(
+                """
+                    DELETE FROM "user"
+                    WHERE id = %s
+                    RETURNING id;
+                    """,
+                (user_id,),
+            )
+            return cursor.fetchone()
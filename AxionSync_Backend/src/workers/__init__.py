@@ -3,9 +3,25 @@ AxionSync Workers Module
 
 This package contains background job workers for:
 - Notification scheduling and delivery via Redis queue
+- Materializing occurrences of recurring todos
+- Garbage-collecting unreferenced uploaded images
+- Relaying the notification outbox into the Redis queue
 """
 
 from src.workers.redis_queue import RedisQueue
 from src.workers.notification_worker import NotificationWorker, run_worker
+from src.workers.recurring_worker import RecurringTodoWorker, run_recurring_worker
+from src.workers.blob_gc_worker import BlobGCWorker, run_blob_gc_worker
+from src.workers.outbox_relay_worker import OutboxRelayWorker, run_outbox_relay_worker
 
-__all__ = ["RedisQueue", "NotificationWorker", "run_worker"]
+__all__ = [
+    "RedisQueue",
+    "NotificationWorker",
+    "run_worker",
+    "RecurringTodoWorker",
+    "run_recurring_worker",
+    "BlobGCWorker",
+    "run_blob_gc_worker",
+    "OutboxRelayWorker",
+    "run_outbox_relay_worker",
+]
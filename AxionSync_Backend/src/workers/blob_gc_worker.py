@@ -0,0 +1,103 @@
+"""
+Blob GC Worker Module
+
+This module deletes uploaded images (and their thumbnails/WebP variants)
+that no cover or profile picture references any more.
+
+Usage:
+    python -m src.workers.blob_gc_worker
+
+    Or with custom settings:
+    BLOB_GC_INTERVAL=600 BLOB_GC_GRACE=7200 python -m src.workers.blob_gc_worker
+"""
+
+import signal
+import threading
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.services.sv_blob import collect_garbage
+
+
+class BlobGCWorker:
+    """
+    Worker process that periodically sweeps unreferenced image blobs.
+
+    A blob becomes collectable once its reference count has been zero for
+    BLOB_GC_GRACE seconds; the grace period leaves time for an in-flight
+    upload of the same content to re-reference it. Each sweep deletes in
+    batches of BLOB_GC_BATCH until nothing is left.
+
+    Environment Variables:
+        BLOB_GC_INTERVAL: Seconds between sweeps (default: 3600)
+        BLOB_GC_GRACE: Seconds an unreferenced blob is kept (default: 3600)
+        BLOB_GC_BATCH: Blobs deleted per transaction (default: 500)
+    """
+
+    def __init__(self):
+        self.interval = int(os.getenv("BLOB_GC_INTERVAL", 3600))
+        self.grace = float(os.getenv("BLOB_GC_GRACE", 3600))
+        self.batch_size = int(os.getenv("BLOB_GC_BATCH", 500))
+
+        self.running = False
+        self._stop_event = threading.Event()
+        self._setup_signal_handlers()
+
+    def _setup_signal_handlers(self):
+        """Setup graceful shutdown handlers"""
+        signal.signal(signal.SIGINT, self._handle_shutdown)
+        signal.signal(signal.SIGTERM, self._handle_shutdown)
+
+    def _handle_shutdown(self, signum, frame):
+        """Handle shutdown signal"""
+        print(f"\n[BlobGC] Received shutdown signal ({signum}). Gracefully stopping...")
+        self.running = False
+        self._stop_event.set()
+
+    def start(self):
+        """Start the worker loop"""
+        print("[BlobGC] Starting blob GC worker...")
+        print(f"[BlobGC] Interval: {self.interval}s, grace: {self.grace}s")
+        self.running = True
+
+        while self.running:
+            self.run_once()
+            self._stop_event.wait(self.interval)
+
+        print("[BlobGC] Worker stopped.")
+
+    def run_once(self) -> int:
+        """Run one sweep, returning the number of blobs deleted"""
+        removed = 0
+        try:
+            while not self._stop_event.is_set():
+                batch = collect_garbage(self.grace, self.batch_size)
+                removed += batch
+                if batch < self.batch_size:
+                    break
+            if removed:
+                print(f"[BlobGC] Removed {removed} unreferenced blobs")
+        except Exception as e:
+            print(f"[BlobGC] Error collecting blobs: {e}")
+        return removed
+
+    def get_stats(self) -> dict:
+        """Get worker statistics"""
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "grace": self.grace,
+            "batch_size": self.batch_size,
+        }
+
+
+def run_blob_gc_worker():
+    """Entry point for running the blob GC worker"""
+    worker = BlobGCWorker()
+    worker.start()
+
+
+if __name__ == "__main__":
+    run_blob_gc_worker()
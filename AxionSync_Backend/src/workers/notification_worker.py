@@ -9,12 +9,20 @@ Usage:
 
     Or with custom settings:
     WORKER_POLL_INTERVAL=5 WORKER_BATCH_SIZE=50 python -m src.workers.notification_worker
+
+    Fixed-interval polling (previous behaviour):
+    WORKER_MODE=poll python -m src.workers.notification_worker
+
+    Rebuild the Redis queue from Postgres once and exit (after a Redis flush):
+    WORKER_MODE=reconcile python -m src.workers.notification_worker
 """
 
 import time
 import signal
 import sys
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Callable
 from dotenv import load_dotenv
@@ -26,32 +34,147 @@ from src.services.sv_notification import NotificationService
 from src.sql_query.sql_notification import SQLNotification
 
 
+class _SentBuffer:
+    """
+    Collects delivered notification IDs so they are marked sent together.
+
+    Flushed once it holds `max_size` IDs or its oldest ID has waited
+    `max_delay` seconds, independent of which claim batch or channel the
+    jobs came from, so a slow delivery never holds back finished ones.
+    """
+
+    def __init__(self, max_size: int, max_delay: float):
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._ids: list[int] = []
+        self._oldest = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, notification_id: int) -> list[int] | None:
+        """Record one delivered job; returns the IDs to flush once full"""
+        with self._lock:
+            if not self._ids:
+                self._oldest = time.monotonic()
+            self._ids.append(notification_id)
+            if len(self._ids) >= self.max_size:
+                return self._take()
+            return None
+
+    def take_due(self) -> list[int] | None:
+        """Return the buffered IDs if the oldest has waited max_delay"""
+        with self._lock:
+            if self._ids and time.monotonic() - self._oldest >= self.max_delay:
+                return self._take()
+            return None
+
+    def take_all(self) -> list[int]:
+        with self._lock:
+            return self._take()
+
+    def _take(self) -> list[int]:
+        ids, self._ids = self._ids, []
+        return ids
+
+
 class NotificationWorker:
     """
     Worker process that polls Redis queue and processes notification jobs.
 
     Features:
-    - Graceful shutdown on SIGINT/SIGTERM
+    - Graceful shutdown on SIGINT/SIGTERM (in-flight jobs are drained)
+    - Concurrent delivery with a bounded thread pool per channel
     - Automatic retry with exponential backoff
     - Dead letter queue for failed jobs
     - Support for multiple notification channels
     - Health monitoring
+    - Startup reconciliation: pending notifications missing from Redis
+      are re-enqueued before processing starts
+    - Leased claims: a heartbeat thread extends the leases of jobs this
+      worker holds and reaps expired leases left by crashed workers
 
     Environment Variables:
-        WORKER_POLL_INTERVAL: Seconds between queue polls (default: 10)
+        WORKER_MODE: "event" sleeps until the next job is due and wakes
+            early when a job is scheduled; "poll" sleeps a fixed interval;
+            "reconcile" only runs the reconciliation pass and exits
+            (default: event)
+        WORKER_POLL_INTERVAL: Seconds between queue polls; in event mode the
+            longest the worker idles before re-checking (default: 10)
         WORKER_BATCH_SIZE: Max jobs to process per poll (default: 100)
         WORKER_RETRY_DELAY: Base delay for retries in seconds (default: 60)
+        WORKER_CONCURRENCY_IN_APP: Parallel in-app deliveries (default: 8)
+        WORKER_CONCURRENCY_EMAIL: Parallel email deliveries (default: 4)
+        WORKER_CONCURRENCY_PUSH: Parallel push deliveries (default: 4)
+        WORKER_DRAIN_TIMEOUT: Seconds to wait for in-flight jobs on
+            shutdown (default: 30)
+        WORKER_RECONCILE_ON_START: Reconcile Redis with Postgres before
+            processing (default: true)
+        WORKER_RECONCILE_CHUNK: Pending notifications diffed against Redis
+            per round trip (default: 5000)
+        WORKER_LEASE_TIMEOUT: Seconds a claimed job stays leased without a
+            heartbeat before another worker may reclaim it (default: 300)
+        WORKER_REAP_INTERVAL: Seconds between expired-lease reaps (default: 30)
+        WORKER_SENT_FLUSH_SIZE: Delivered jobs marked sent per write
+            (default: 50)
+        WORKER_SENT_FLUSH_INTERVAL: Longest a delivered job waits to be
+            marked sent, in seconds (default: 0.5)
     """
 
+    # Back-off when the head of the queue is due but nothing could be claimed
+    STALLED_BACKOFF = 1.0
+
+    # Default parallel deliveries per channel
+    CHANNEL_CONCURRENCY = {"in_app": 8, "email": 4, "push": 4}
+
     def __init__(self):
         """Initialize worker components"""
         self.redis_queue = RedisQueue()
         self.sv_notification = NotificationService()
         self.sql_notification = SQLNotification()
 
+        self.mode = os.getenv("WORKER_MODE", "event")
         self.poll_interval = int(os.getenv("WORKER_POLL_INTERVAL", 10))
         self.batch_size = int(os.getenv("WORKER_BATCH_SIZE", 100))
         self.retry_delay = int(os.getenv("WORKER_RETRY_DELAY", 60))
+        self.drain_timeout = int(os.getenv("WORKER_DRAIN_TIMEOUT", 30))
+        self.reconcile_on_start = (
+            os.getenv("WORKER_RECONCILE_ON_START", "true").lower() == "true"
+        )
+        self.reconcile_chunk = int(os.getenv("WORKER_RECONCILE_CHUNK", 5000))
+        self.lease_timeout = float(
+            os.getenv("WORKER_LEASE_TIMEOUT", RedisQueue.LEASE_TIMEOUT)
+        )
+        self.reap_interval = float(os.getenv("WORKER_REAP_INTERVAL", 30))
+        self._sent = _SentBuffer(
+            int(os.getenv("WORKER_SENT_FLUSH_SIZE", 50)),
+            float(os.getenv("WORKER_SENT_FLUSH_INTERVAL", 0.5)),
+        )
+
+        # One pool per channel so slow email/push I/O can't starve in-app.
+        # Each channel accepts up to 2x its concurrency before dispatch blocks.
+        self.channel_limits = {
+            channel: int(os.getenv(f"WORKER_CONCURRENCY_{channel.upper()}", default))
+            for channel, default in self.CHANNEL_CONCURRENCY.items()
+        }
+        self._executors = {
+            channel: ThreadPoolExecutor(
+                max_workers=limit, thread_name_prefix=f"notify-{channel}"
+            )
+            for channel, limit in self.channel_limits.items()
+        }
+        self._slots = {
+            channel: threading.BoundedSemaphore(limit * 2)
+            for channel, limit in self.channel_limits.items()
+        }
+        self._in_flight: dict[Future, dict] = {}
+        self._in_flight_lock = threading.Lock()
+        self._in_flight_done = threading.Condition(self._in_flight_lock)
+
+        # Claimed jobs not yet finished or handed back; their leases are
+        # kept alive by the heartbeat thread
+        self._leased: set[int] = set()
+        self._leased_lock = threading.Lock()
+        self._heartbeat_stop = threading.Event()
+        self.reaped_count = 0
 
         self.running = False
         self._setup_signal_handlers()
@@ -76,72 +199,297 @@ class NotificationWorker:
     def start(self):
         """Start the worker loop"""
         print(f"[Worker] Starting notification worker...")
+        print(f"[Worker] Mode: {self.mode}")
         print(f"[Worker] Poll interval: {self.poll_interval}s")
         print(f"[Worker] Batch size: {self.batch_size}")
+        print(f"[Worker] Channel concurrency: {self.channel_limits}")
+        print(
+            f"[Worker] Lease timeout: {self.lease_timeout}s, reap interval: {self.reap_interval}s"
+        )
 
         # Check Redis connection
         if not self.redis_queue.health_check():
             print("[Worker] ERROR: Cannot connect to Redis. Exiting.")
             sys.exit(1)
 
+        if self.mode == "reconcile":
+            self.reconcile()
+            self.redis_queue.close()
+            return
+
+        if self.reconcile_on_start:
+            self.reconcile()
+
         print("[Worker] Connected to Redis. Starting job processing...")
         self.running = True
 
+        heartbeat = threading.Thread(
+            target=self._heartbeat, name="notify-lease-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        sent_flusher = threading.Thread(
+            target=self._flush_sent_loop, name="notify-sent-flusher", daemon=True
+        )
+        sent_flusher.start()
+
         while self.running:
+            processed = 0
             try:
-                self._process_batch()
+                processed = self._process_batch()
             except Exception as e:
                 print(f"[Worker] Error in processing loop: {e}")
 
-            if self.running:
+            if not self.running:
+                break
+            if self.mode == "poll":
                 time.sleep(self.poll_interval)
+            else:
+                self._wait_for_next_job(processed)
 
+        self._drain()
+        self._heartbeat_stop.set()
+        heartbeat.join(timeout=5)
+        sent_flusher.join(timeout=5)
+        self._flush_sent(self._sent.take_all())
         print("[Worker] Worker stopped.")
         self.redis_queue.close()
 
-    def _process_batch(self):
-        """Process a batch of due jobs"""
-        jobs = self.redis_queue.get_due_jobs(limit=self.batch_size)
+    def reconcile(self) -> dict | None:
+        """Re-enqueue pending notifications whose Redis job was lost"""
+        print("[Worker] Reconciling Redis queue with pending notifications...")
+        started = time.monotonic()
+        try:
+            result = self.sv_notification.reconcile_pending(
+                self.redis_queue, self.reconcile_chunk
+            )
+        except Exception as e:
+            print(f"[Worker] Reconciliation failed: {e}")
+            return None
+
+        print(
+            f"[Worker] Reconciled {result['scanned']} pending notifications, "
+            f"restored {result['restored']} jobs in {time.monotonic() - started:.1f}s"
+        )
+        return result
+
+    def _heartbeat(self):
+        """Extend leases of held jobs and reap expired ones until stopped"""
+        extend_every = self.lease_timeout / 3
+        next_reap = time.monotonic()
+        while not self._heartbeat_stop.wait(min(extend_every, self.reap_interval)):
+            with self._leased_lock:
+                held = list(self._leased)
+            if held:
+                self.redis_queue.extend_leases(held, self.lease_timeout)
+
+            if time.monotonic() >= next_reap:
+                next_reap = time.monotonic() + self.reap_interval
+                reaped = self.redis_queue.reap_expired_leases()
+                if reaped["requeued"] or reaped["dead_letter"]:
+                    self.reaped_count += reaped["requeued"] + reaped["dead_letter"]
+                    print(
+                        f"[Worker] Expired leases: re-queued {reaped['requeued']}, "
+                        f"dead-lettered {reaped['dead_letter']}"
+                    )
 
-        if not jobs:
-            return
+    def _flush_sent_loop(self):
+        """Mark delivered jobs sent once they have waited the flush interval"""
+        while not self._heartbeat_stop.wait(self._sent.max_delay / 2):
+            sent_ids = self._sent.take_due()
+            if sent_ids:
+                self._flush_sent(sent_ids)
+
+    def _release_leases(self, notification_ids: list[int]):
+        """Stop extending leases of jobs this worker no longer holds"""
+        with self._leased_lock:
+            self._leased.difference_update(notification_ids)
+
+    def _drain(self):
+        """Wait for in-flight jobs, handing back any that never started"""
+        deadline = time.monotonic() + self.drain_timeout
+        with self._in_flight_done:
+            if self._in_flight:
+                print(f"[Worker] Draining {len(self._in_flight)} in-flight jobs...")
+            while self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._in_flight_done.wait(remaining)
+            pending = dict(self._in_flight)
+
+        still_running = 0
+        for future, job in pending.items():
+            if future.cancel():
+                self.redis_queue.release_job(job["notification_id"])
+            else:
+                still_running += 1
+        if still_running:
+            print(
+                f"[Worker] {still_running} jobs still running after {self.drain_timeout}s"
+            )
 
-        print(f"[Worker] Processing {len(jobs)} jobs...")
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        for job in jobs:
-            if not self.running:
-                break
-            self._process_job(job)
+    def _wait_for_next_job(self, processed: int):
+        """
+        Sleep until the earliest scheduled job is due.
 
-    def _process_job(self, job: dict):
-        """Process a single notification job"""
-        notification_id = job.get("notification_id")
+        The wait is capped at poll_interval and cut short when
+        schedule_notification signals a newly scheduled job.
+        """
+        if processed >= self.batch_size:
+            return  # Full batch: more jobs are probably already due
+
+        next_due = self.redis_queue.get_next_due_time()
+        if next_due is None:
+            wait = self.poll_interval
+        else:
+            wait = min(max(next_due - time.time(), 0), self.poll_interval)
+            if wait <= 0 and processed == 0:
+                # Due job we could not pick up; avoid spinning on Redis
+                wait = self.STALLED_BACKOFF
+
+        if wait > 0:
+            self.redis_queue.wait_for_wakeup(wait)
+
+    def _process_batch(self) -> int:
+        """Process a batch of due jobs, returning how many were picked up"""
+        # Claimed jobs are already in the processing queue, leased to us
+        jobs = self.redis_queue.claim_due_jobs(
+            limit=self.batch_size, lease_seconds=self.lease_timeout
+        )
 
-        if not notification_id:
-            print(f"[Worker] Invalid job - missing notification_id: {job}")
-            return
+        if not jobs:
+            return 0
 
-        try:
-            # Move to processing queue
-            self.redis_queue.move_to_processing(notification_id)
+        with self._leased_lock:
+            self._leased.update(
+                job["notification_id"] for job in jobs if job.get("notification_id")
+            )
 
-            # Get notification from database
-            notification = self.sv_notification.get_notification_by_id(notification_id)
+        print(f"[Worker] Processing {len(jobs)} jobs...")
+
+        # One query for the whole batch instead of one per job
+        notifications = self.sv_notification.get_notifications_by_ids(
+            [job["notification_id"] for job in jobs if job.get("notification_id")]
+        )
+
+        deliverable = []
+        finished_ids = []
+        for job in jobs:
+            notification_id = job.get("notification_id")
+            if not notification_id:
+                print(f"[Worker] Invalid job - missing notification_id: {job}")
+                continue
+
+            notification = notifications.get(notification_id)
             if not notification:
                 print(
                     f"[Worker] Notification {notification_id} not found in database. Removing job."
                 )
-                self.redis_queue.complete_job(notification_id)
-                return
-
-            # Skip if already sent
-            if notification.is_sent:
+                finished_ids.append(notification_id)
+            elif notification.is_sent:
                 print(
                     f"[Worker] Notification {notification_id} already sent. Removing job."
                 )
-                self.redis_queue.complete_job(notification_id)
-                return
+                finished_ids.append(notification_id)
+            else:
+                deliverable.append((job, notification))
+
+        self.redis_queue.complete_jobs(finished_ids)
+        self._release_leases(finished_ids)
+
+        for index, (job, notification) in enumerate(deliverable):
+            if not self.running or not self._dispatch(job, notification):
+                # Hand undispatched claims back for another worker
+                for pending, _ in deliverable[index:]:
+                    self.redis_queue.release_job(pending["notification_id"])
+                    self._finish(pending["notification_id"], False)
+                break
+
+        return len(jobs)
+
+    def _dispatch(self, job: dict, notification) -> bool:
+        """
+        Submit a job to its channel's pool.
+
+        Blocks while the channel is saturated (backpressure on claiming more
+        jobs). Returns False if the worker is stopped while waiting.
+        """
+        channel = job.get("channel", "in_app")
+        if channel not in self._executors:
+            channel = "in_app"
+
+        slots = self._slots[channel]
+        while not slots.acquire(timeout=1):
+            if not self.running:
+                return False
+
+        with self._in_flight_lock:
+            future = self._executors[channel].submit(
+                self._process_job, job, notification
+            )
+            self._in_flight[future] = job
+        future.add_done_callback(
+            lambda done: self._on_job_done(done, slots, job["notification_id"])
+        )
+        return True
+
+    def _on_job_done(
+        self,
+        future: Future,
+        slots: threading.BoundedSemaphore,
+        notification_id: int,
+    ):
+        """Record a finished job, then release its channel slot"""
+        sent = (
+            not future.cancelled()
+            and future.exception() is None
+            and future.result() is True
+        )
+        self._finish(notification_id, sent)
+
+        with self._in_flight_done:
+            self._in_flight.pop(future, None)
+            self._in_flight_done.notify_all()
+        slots.release()
+
+    def _finish(self, notification_id: int, sent: bool):
+        """Record a finished job, flushing delivered ones once the buffer is full"""
+        if not sent:
+            # Retried, dead-lettered or released: no longer in processing
+            self._release_leases([notification_id])
+            return
+        sent_ids = self._sent.add(notification_id)
+        if sent_ids:
+            self._flush_sent(sent_ids)
+
+    def _flush_sent(self, notification_ids: list[int]):
+        """Mark delivered notifications sent, then drop their jobs"""
+        if not notification_ids:
+            return
+        try:
+            self.sql_notification.mark_notifications_sent(notification_ids)
+            self.redis_queue.complete_jobs(notification_ids)
+            print(f"[Worker] Marked {len(notification_ids)} notifications as sent")
+        except Exception as e:
+            # Jobs stay in the processing queue; once their lease expires the
+            # reaper re-queues them and they are delivered again
+            print(f"[Worker] Error marking notifications sent: {e}")
+        finally:
+            self._release_leases(notification_ids)
 
+    def _process_job(self, job: dict, notification) -> bool:
+        """
+        Deliver a single notification job.
+
+        Returns True when delivered; the caller marks delivered jobs sent
+        in bulk. Failed deliveries are rescheduled here.
+        """
+        notification_id = job["notification_id"]
+
+        try:
             # Send notification via appropriate channel
             channel = job.get("channel", "in_app")
             handler = self.channel_handlers.get(channel, self._send_in_app_notification)
@@ -149,30 +497,30 @@ class NotificationWorker:
             success = handler(notification, job)
 
             if success:
-                # Mark as sent in database
-                self.sql_notification.mark_notification_sent(notification_id)
-                self.redis_queue.complete_job(notification_id)
                 print(
                     f"[Worker] Notification {notification_id} sent successfully via {channel}"
                 )
-            else:
-                # Retry with exponential backoff
-                retry_count = job.get("retry_count", 0)
-                delay = self.retry_delay * (2**retry_count)  # Exponential backoff
+                return True
 
-                if self.redis_queue.retry_job(notification_id, delay):
-                    print(
-                        f"[Worker] Notification {notification_id} scheduled for retry in {delay}s"
-                    )
-                else:
-                    print(
-                        f"[Worker] Notification {notification_id} moved to dead letter queue"
-                    )
+            # Retry with exponential backoff
+            retry_count = job.get("retry_count", 0)
+            delay = self.retry_delay * (2**retry_count)  # Exponential backoff
+
+            if self.redis_queue.retry_job(notification_id, delay):
+                print(
+                    f"[Worker] Notification {notification_id} scheduled for retry in {delay}s"
+                )
+            else:
+                print(
+                    f"[Worker] Notification {notification_id} moved to dead letter queue"
+                )
+            return False
 
         except Exception as e:
             print(f"[Worker] Error processing notification {notification_id}: {e}")
             # Attempt retry
             self.redis_queue.retry_job(notification_id, self.retry_delay)
+            return False
 
     def _send_in_app_notification(self, notification, job: dict) -> bool:
         """
@@ -291,8 +639,13 @@ class NotificationWorker:
         queue_stats = self.redis_queue.get_queue_stats()
         return {
             "running": self.running,
+            "mode": self.mode,
             "poll_interval": self.poll_interval,
             "batch_size": self.batch_size,
+            "channel_concurrency": self.channel_limits,
+            "in_flight": len(self._in_flight),
+            "leased": len(self._leased),
+            "reaped_count": self.reaped_count,
             "queues": queue_stats,
         }
 
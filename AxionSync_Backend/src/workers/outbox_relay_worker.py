@@ -0,0 +1,114 @@
+"""
+Notification Outbox Relay Module
+
+This module moves notification schedule changes from the notification_outbox
+table (written in the same transaction as each todo_notification change) into
+the Redis delayed-job queue, in batches.
+
+Usage:
+    python -m src.workers.outbox_relay_worker
+
+    Or with custom settings:
+    OUTBOX_RELAY_INTERVAL=0.5 OUTBOX_RELAY_BATCH=1000 python -m src.workers.outbox_relay_worker
+"""
+
+import signal
+import threading
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.services.sv_notification import NotificationService
+from src.workers.redis_queue import RedisQueue
+
+
+class OutboxRelayWorker:
+    """
+    Worker process that drains the notification outbox into Redis.
+
+    API requests only write the outbox row, so their latency does not
+    depend on Redis and a Redis outage delays schedules instead of losing
+    them. Each batch of up to OUTBOX_RELAY_BATCH entries is applied with
+    one pipelined MSET/ZADD; the relay keeps draining while batches come
+    back full and otherwise polls every OUTBOX_RELAY_INTERVAL seconds.
+
+    Environment Variables:
+        OUTBOX_RELAY_INTERVAL: Seconds between polls when idle (default: 1)
+        OUTBOX_RELAY_BATCH: Outbox entries per batch (default: 500)
+    """
+
+    def __init__(self):
+        self.interval = float(os.getenv("OUTBOX_RELAY_INTERVAL", 1))
+        self.batch_size = int(os.getenv("OUTBOX_RELAY_BATCH", 500))
+
+        self.notification_service = NotificationService()
+        self.redis_queue = RedisQueue()
+        self.running = False
+        self._stop_event = threading.Event()
+        self._setup_signal_handlers()
+
+        # Stats
+        self.relayed_count = 0
+        self.error_count = 0
+
+    def _setup_signal_handlers(self):
+        """Setup graceful shutdown handlers"""
+        signal.signal(signal.SIGINT, self._handle_shutdown)
+        signal.signal(signal.SIGTERM, self._handle_shutdown)
+
+    def _handle_shutdown(self, signum, frame):
+        """Handle shutdown signal"""
+        print(f"\n[Outbox] Received shutdown signal ({signum}). Gracefully stopping...")
+        self.running = False
+        self._stop_event.set()
+
+    def start(self):
+        """Start the worker loop"""
+        print("[Outbox] Starting notification outbox relay...")
+        print(f"[Outbox] Interval: {self.interval}s, batch size: {self.batch_size}")
+        self.running = True
+
+        while self.running:
+            self.run_once()
+            self._stop_event.wait(self.interval)
+
+        self.redis_queue.close()
+        print("[Outbox] Worker stopped.")
+
+    def run_once(self) -> int:
+        """Drain the outbox until a batch comes back short; returns entries relayed"""
+        relayed = 0
+        try:
+            while not self._stop_event.is_set():
+                batch = self.notification_service.relay_outbox(
+                    self.redis_queue, self.batch_size
+                )
+                relayed += batch
+                if batch < self.batch_size:
+                    break
+        except Exception as e:
+            self.error_count += 1
+            print(f"[Outbox] Error relaying outbox: {e}")
+        self.relayed_count += relayed
+        return relayed
+
+    def get_stats(self) -> dict:
+        """Get worker statistics"""
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "batch_size": self.batch_size,
+            "relayed_count": self.relayed_count,
+            "error_count": self.error_count,
+        }
+
+
+def run_outbox_relay_worker():
+    """Entry point for running the outbox relay worker"""
+    worker = OutboxRelayWorker()
+    worker.start()
+
+
+if __name__ == "__main__":
+    run_outbox_relay_worker()
@@ -0,0 +1,107 @@
+"""
+Recurring Todo Worker Module
+
+This module materializes upcoming occurrences of repeating todos
+(is_repeat with repeat_type daily/weekly/monthly) on a schedule.
+Runs next to the notification worker as a separate process.
+
+Usage:
+    python -m src.workers.recurring_worker
+
+    Or with custom settings:
+    RECURRING_INTERVAL=600 RECURRING_HORIZON_DAYS=14 python -m src.workers.recurring_worker
+"""
+
+import signal
+import threading
+import time
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.services.sv_todo import TodoService
+
+
+class RecurringTodoWorker:
+    """
+    Worker process that periodically generates repeating todo occurrences.
+
+    Each run is a single set-based pass over all templates (see
+    SQLTodo.materialize_recurring_todos) and is idempotent per period,
+    so several replicas or an overlapping run never create duplicates.
+
+    Features:
+    - Graceful shutdown on SIGINT/SIGTERM (interrupts the idle wait)
+    - Generates a rolling window of occurrences ahead of time
+
+    Environment Variables:
+        RECURRING_INTERVAL: Seconds between materializer runs (default: 3600)
+        RECURRING_HORIZON_DAYS: How far ahead occurrences are created (default: 7)
+    """
+
+    def __init__(self):
+        """Initialize worker components"""
+        self.sv_todo = TodoService()
+
+        self.interval = int(os.getenv("RECURRING_INTERVAL", 3600))
+        self.horizon_days = int(os.getenv("RECURRING_HORIZON_DAYS", 7))
+
+        self.running = False
+        self._stop_event = threading.Event()
+        self._setup_signal_handlers()
+
+    def _setup_signal_handlers(self):
+        """Setup graceful shutdown handlers"""
+        signal.signal(signal.SIGINT, self._handle_shutdown)
+        signal.signal(signal.SIGTERM, self._handle_shutdown)
+
+    def _handle_shutdown(self, signum, frame):
+        """Handle shutdown signal"""
+        print(f"\n[Recurring] Received shutdown signal ({signum}). Gracefully stopping...")
+        self.running = False
+        self._stop_event.set()
+
+    def start(self):
+        """Start the worker loop"""
+        print("[Recurring] Starting recurring todo worker...")
+        print(f"[Recurring] Interval: {self.interval}s")
+        print(f"[Recurring] Horizon: {self.horizon_days} days")
+        self.running = True
+
+        while self.running:
+            self.run_once()
+            self._stop_event.wait(self.interval)
+
+        print("[Recurring] Worker stopped.")
+
+    def run_once(self) -> int:
+        """Run one materializer pass, returning the number of occurrences created"""
+        started = time.monotonic()
+        try:
+            created = self.sv_todo.materialize_recurring_todos(self.horizon_days)
+            print(
+                f"[Recurring] Created {created} occurrences in {time.monotonic() - started:.2f}s"
+            )
+            return created
+        except Exception as e:
+            print(f"[Recurring] Error materializing recurring todos: {e}")
+            return 0
+
+    def get_stats(self) -> dict:
+        """Get worker statistics"""
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "horizon_days": self.horizon_days,
+        }
+
+
+def run_recurring_worker():
+    """Entry point for running the recurring todo worker"""
+    worker = RecurringTodoWorker()
+    worker.start()
+
+
+if __name__ == "__main__":
+    run_recurring_worker()
@@ -7,13 +7,10 @@ Uses Redis sorted sets for efficient delayed job scheduling.
 
 import redis
 import json
-import os
 import time
 from datetime import datetime, timezone
 from typing import Any
-from dotenv import load_dotenv
-
-load_dotenv()
+from src.database.redis_pool import redis_connection_kwargs
 
 
 class RedisQueue:
@@ -21,7 +18,9 @@ class RedisQueue:
     Redis-based delayed job queue for notification scheduling.
 
     Uses Redis sorted sets with score = scheduled timestamp for efficient
-    retrieval of jobs that are due.
+    retrieval of jobs that are due. In the processing queue the score is the
+    claim's lease expiry instead, so jobs orphaned by a crashed worker can be
+    found and re-queued (see reap_expired_leases).
 
     Environment Variables:
         REDIS_HOST: Redis server host (default: localhost)
@@ -35,23 +34,118 @@ class RedisQueue:
     NOTIFICATION_PROCESSING = "axionsync:notifications:processing"
     NOTIFICATION_DEAD_LETTER = "axionsync:notifications:dead_letter"
 
-    def __init__(self):
-        """Initialize Redis connection"""
-        self.redis_client = redis.Redis(
-            host=os.getenv("REDIS_HOST", "localhost"),
-            port=int(os.getenv("REDIS_PORT", 6379)),
-            password=os.getenv("REDIS_PASSWORD", None),
-            db=int(os.getenv("REDIS_DB", 0)),
-            decode_responses=True,
+    # Single-slot list pushed on every schedule so sleeping workers wake early
+    NOTIFICATION_WAKEUP = "axionsync:notifications:wakeup"
+
+    # Seconds a claimed job may stay in the processing queue before the
+    # reaper hands it back, unless its worker extends the lease
+    LEASE_TIMEOUT = 300
+
+    # max_retries assumed for payloads that do not carry one (as retry_job)
+    DEFAULT_MAX_RETRIES = 3
+
+    # Atomically move up to ARGV[2] due members (score <= ARGV[1]) from the
+    # scheduled zset (KEYS[1]) to the processing zset (KEYS[2]), leased until
+    # ARGV[3], and return their payloads. Members whose payload is missing
+    # are dropped.
+    CLAIM_DUE_JOBS_SCRIPT = """
+        local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+        local jobs = {}
+        for _, member in ipairs(members) do
+            redis.call('ZREM', KEYS[1], member)
+            local data = redis.call('GET', 'job:' .. member)
+            if data then
+                redis.call('ZADD', KEYS[2], ARGV[3], member)
+                table.insert(jobs, data)
+            end
+        end
+        return jobs
+    """
+
+    # Atomically take up to ARGV[2] processing members (KEYS[1]) whose lease
+    # expired (score <= ARGV[1]). Each expiry counts as a failed attempt, as
+    # in retry_job: retry_count is incremented in the payload and the job
+    # goes to the dead letter zset (KEYS[4]) once it reaches max_retries
+    # (default ARGV[3]), otherwise back to the scheduled zset (KEYS[2]), due
+    # immediately, waking sleeping workers (KEYS[3]). Members whose payload
+    # is missing are dropped. Returns {requeued, dead_lettered}.
+    REAP_EXPIRED_LEASES_SCRIPT = """
+        local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+        local requeued = 0
+        local dead = 0
+        local last
+        for _, member in ipairs(members) do
+            redis.call('ZREM', KEYS[1], member)
+            local data = redis.call('GET', 'job:' .. member)
+            if data then
+                local job = cjson.decode(data)
+                job['retry_count'] = (tonumber(job['retry_count']) or 0) + 1
+                redis.call('SET', 'job:' .. member, cjson.encode(job))
+                if job['retry_count'] >= (tonumber(job['max_retries']) or tonumber(ARGV[3])) then
+                    redis.call('ZADD', KEYS[4], ARGV[1], member)
+                    dead = dead + 1
+                else
+                    redis.call('ZADD', KEYS[2], ARGV[1], member)
+                    requeued = requeued + 1
+                    last = member
+                end
+            end
+        end
+        if last then
+            redis.call('LPUSH', KEYS[3], last)
+            redis.call('LTRIM', KEYS[3], 0, 0)
+        end
+        return {requeued, dead}
+    """
+
+    def __init__(self, client: redis.Redis | None = None):
+        """
+        Initialize Redis connection.
+
+        Args:
+            client: Shared client (e.g. the API's RedisPool); the queue then
+                leaves closing it to its owner. Workers omit it and get a
+                client of their own.
+        """
+        self._owns_client = client is None
+        self.redis_client = client or redis.Redis(
+            **self._connection_kwargs(),
             socket_timeout=5,
-            socket_connect_timeout=5,
             retry_on_timeout=True,
         )
+        # Blocking pops need a connection without a read timeout
+        self._wakeup_client: redis.Redis | None = None
+        self._claim_due_jobs = self.redis_client.register_script(
+            self.CLAIM_DUE_JOBS_SCRIPT
+        )
+        self._reap_expired_leases = self.redis_client.register_script(
+            self.REAP_EXPIRED_LEASES_SCRIPT
+        )
+
+    def _connection_kwargs(self) -> dict:
+        """Connection settings shared by every client"""
+        return redis_connection_kwargs()
 
     def _get_job_key(self, notification_id: int) -> str:
         """Generate unique job key for a notification"""
         return f"notification:{notification_id}"
 
+    def _job_data(self, payload: Any) -> dict:
+        """Serialize a NotificationJobPayload into the stored job record"""
+        return {
+            "notification_id": payload.notification_id,
+            "todo_id": payload.todo_id,
+            "user_id": payload.user_id,
+            "channel": payload.channel,
+            "message": payload.message,
+            "scheduled_at": (
+                payload.scheduled_at.isoformat() if payload.scheduled_at else None
+            ),
+            "retry_count": payload.retry_count,
+            "max_retries": payload.max_retries,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+
     def schedule_notification(self, payload: Any, delay_seconds: int) -> bool:
         """
         Schedule a notification job with delay.
@@ -67,23 +161,8 @@ class RedisQueue:
             # Calculate execution time (Unix timestamp)
             execute_at = time.time() + delay_seconds
 
-            # Serialize payload
-            job_data = {
-                "notification_id": payload.notification_id,
-                "todo_id": payload.todo_id,
-                "user_id": payload.user_id,
-                "channel": payload.channel,
-                "message": payload.message,
-                "scheduled_at": (
-                    payload.scheduled_at.isoformat() if payload.scheduled_at else None
-                ),
-                "retry_count": payload.retry_count,
-                "max_retries": payload.max_retries,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-            }
-
             job_key = self._get_job_key(payload.notification_id)
-            job_json = json.dumps(job_data)
+            job_json = json.dumps(self._job_data(payload))
 
             # Use pipeline for atomic operation
             pipe = self.redis_client.pipeline()
@@ -94,6 +173,10 @@ class RedisQueue:
             # Add to scheduled queue with score = execute_at
             pipe.zadd(self.NOTIFICATION_QUEUE, {job_key: execute_at})
 
+            # Wake sleeping workers so they re-read the earliest due time
+            pipe.lpush(self.NOTIFICATION_WAKEUP, job_key)
+            pipe.ltrim(self.NOTIFICATION_WAKEUP, 0, 0)
+
             pipe.execute()
 
             return True
@@ -101,6 +184,136 @@ class RedisQueue:
             print(f"Redis error scheduling notification: {e}")
             return False
 
+    def apply_schedule_batch(
+        self, payloads: list[Any], cancelled_ids: list[int]
+    ) -> bool:
+        """
+        Schedule and cancel many notifications in one pipelined round trip.
+
+        Scheduled jobs are written with a single MSET (payloads) and a single
+        ZADD (due at payload.scheduled_at); re-scheduling a job replaces its
+        payload and due time. Cancelled jobs are removed from both queues.
+        Every command is idempotent, so replaying a batch is harmless.
+
+        Args:
+            payloads: NotificationJobPayload objects to (re)schedule
+            cancelled_ids: Notification IDs whose jobs should be removed
+
+        Returns:
+            True if the whole batch was applied, False on error
+        """
+        if not payloads and not cancelled_ids:
+            return True
+        try:
+            pipe = self.redis_client.pipeline()
+
+            if payloads:
+                job_keys = [self._get_job_key(p.notification_id) for p in payloads]
+                pipe.mset(
+                    {
+                        f"job:{job_key}": json.dumps(self._job_data(payload))
+                        for job_key, payload in zip(job_keys, payloads)
+                    }
+                )
+                pipe.zadd(
+                    self.NOTIFICATION_QUEUE,
+                    {
+                        job_key: payload.scheduled_at.timestamp()
+                        for job_key, payload in zip(job_keys, payloads)
+                    },
+                )
+                pipe.lpush(self.NOTIFICATION_WAKEUP, job_keys[-1])
+                pipe.ltrim(self.NOTIFICATION_WAKEUP, 0, 0)
+
+            if cancelled_ids:
+                job_keys = [self._get_job_key(i) for i in cancelled_ids]
+                pipe.zrem(self.NOTIFICATION_QUEUE, *job_keys)
+                pipe.zrem(self.NOTIFICATION_PROCESSING, *job_keys)
+                pipe.delete(*[f"job:{job_key}" for job_key in job_keys])
+
+            pipe.execute()
+            return True
+        except redis.RedisError as e:
+            print(f"Redis error applying schedule batch: {e}")
+            return False
+
+    def find_missing_jobs(self, notification_ids: list[int]) -> list[int] | None:
+        """
+        Find notifications with no live job in Redis, in one round trip.
+
+        A job counts as present if its payload exists and it sits in the
+        scheduled, processing or dead letter queue (dead-lettered jobs are
+        not resurrected).
+
+        Args:
+            notification_ids: Notification IDs to check
+
+        Returns:
+            IDs without a job, or None on error
+        """
+        if not notification_ids:
+            return []
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for notification_id in notification_ids:
+                job_key = self._get_job_key(notification_id)
+                pipe.exists(f"job:{job_key}")
+                pipe.zscore(self.NOTIFICATION_QUEUE, job_key)
+                pipe.zscore(self.NOTIFICATION_PROCESSING, job_key)
+                pipe.zscore(self.NOTIFICATION_DEAD_LETTER, job_key)
+            results = pipe.execute()
+
+            missing = []
+            for index, notification_id in enumerate(notification_ids):
+                has_data, scheduled, processing, dead = results[index * 4 : index * 4 + 4]
+                if not has_data or (
+                    scheduled is None and processing is None and dead is None
+                ):
+                    missing.append(notification_id)
+            return missing
+        except redis.RedisError as e:
+            print(f"Redis error checking jobs: {e}")
+            return None
+
+    def restore_jobs(self, payloads: list[Any]) -> bool:
+        """
+        Re-enqueue jobs lost from Redis in one pipelined round trip.
+
+        Unlike apply_schedule_batch this only fills gaps (SET NX, ZADD NX):
+        a payload or due time written meanwhile by the outbox relay is kept.
+        Jobs already past their scheduled_at become due immediately.
+
+        Args:
+            payloads: NotificationJobPayload objects to restore
+
+        Returns:
+            True if restored successfully
+        """
+        if not payloads:
+            return True
+        try:
+            job_keys = [self._get_job_key(p.notification_id) for p in payloads]
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            for job_key, payload in zip(job_keys, payloads):
+                pipe.set(f"job:{job_key}", json.dumps(self._job_data(payload)), nx=True)
+            pipe.zadd(
+                self.NOTIFICATION_QUEUE,
+                {
+                    job_key: payload.scheduled_at.timestamp()
+                    for job_key, payload in zip(job_keys, payloads)
+                },
+                nx=True,
+            )
+            pipe.lpush(self.NOTIFICATION_WAKEUP, job_keys[-1])
+            pipe.ltrim(self.NOTIFICATION_WAKEUP, 0, 0)
+            pipe.execute()
+
+            return True
+        except redis.RedisError as e:
+            print(f"Redis error restoring jobs: {e}")
+            return False
+
     def cancel_notification(self, notification_id: int) -> bool:
         """
         Cancel a scheduled notification.
@@ -151,33 +364,111 @@ class RedisQueue:
                 return []
 
             jobs = []
+            orphaned = []
             for job_key in job_keys:
                 job_data = self.redis_client.get(f"job:{job_key}")
                 if job_data:
                     jobs.append(json.loads(job_data))
+                else:
+                    orphaned.append(job_key)
+
+            # Drop members whose payload is gone so they don't stay due forever
+            if orphaned:
+                self.redis_client.zrem(self.NOTIFICATION_QUEUE, *orphaned)
 
             return jobs
         except redis.RedisError as e:
             print(f"Redis error getting due jobs: {e}")
             return []
 
-    def move_to_processing(self, notification_id: int) -> bool:
+    def claim_due_jobs(
+        self, limit: int = 100, lease_seconds: float | None = None
+    ) -> list[dict]:
+        """
+        Claim jobs that are due, moving them to the processing queue.
+
+        Runs as a single server-side script, so concurrent workers never
+        receive the same job and a batch costs one round trip. Each claim
+        is a lease: its processing score is the lease expiry, after which
+        reap_expired_leases returns the job to the scheduled queue.
+
+        Args:
+            limit: Maximum number of jobs to claim
+            lease_seconds: Lease length (default: LEASE_TIMEOUT)
+
+        Returns:
+            List of claimed job payloads
+        """
+        try:
+            current_time = time.time()
+            lease_expiry = current_time + (lease_seconds or self.LEASE_TIMEOUT)
+            results = self._claim_due_jobs(
+                keys=[self.NOTIFICATION_QUEUE, self.NOTIFICATION_PROCESSING],
+                args=[current_time, limit, lease_expiry],
+            )
+            return [json.loads(job_data) for job_data in results]
+        except redis.RedisError as e:
+            print(f"Redis error claiming due jobs: {e}")
+            return []
+
+    def get_next_due_time(self) -> float | None:
         """
-        Move a job from scheduled to processing queue.
+        Get the execution time of the earliest scheduled job.
+
+        Returns:
+            Unix timestamp of the next job, or None if the queue is empty
+        """
+        try:
+            head = self.redis_client.zrange(
+                self.NOTIFICATION_QUEUE, 0, 0, withscores=True
+            )
+            return head[0][1] if head else None
+        except redis.RedisError as e:
+            print(f"Redis error getting next due time: {e}")
+            return None
+
+    def wait_for_wakeup(self, timeout: float) -> bool:
+        """
+        Block until a job is scheduled or `timeout` seconds pass.
+
+        Args:
+            timeout: Maximum seconds to wait (must be > 0)
+
+        Returns:
+            True if woken by a newly scheduled job, False on timeout or error
+        """
+        try:
+            if self._wakeup_client is None:
+                self._wakeup_client = redis.Redis(**self._connection_kwargs())
+            return (
+                self._wakeup_client.blpop(self.NOTIFICATION_WAKEUP, timeout=timeout)
+                is not None
+            )
+        except redis.RedisError as e:
+            print(f"Redis error waiting for wakeup: {e}")
+            time.sleep(timeout)
+            return False
+
+    def move_to_processing(
+        self, notification_id: int, lease_seconds: float | None = None
+    ) -> bool:
+        """
+        Move a job from scheduled to processing queue under a lease.
 
         Args:
             notification_id: ID of the notification
+            lease_seconds: Lease length (default: LEASE_TIMEOUT)
 
         Returns:
             True if moved successfully
         """
         try:
             job_key = self._get_job_key(notification_id)
-            current_time = time.time()
+            lease_expiry = time.time() + (lease_seconds or self.LEASE_TIMEOUT)
 
             pipe = self.redis_client.pipeline()
             pipe.zrem(self.NOTIFICATION_QUEUE, job_key)
-            pipe.zadd(self.NOTIFICATION_PROCESSING, {job_key: current_time})
+            pipe.zadd(self.NOTIFICATION_PROCESSING, {job_key: lease_expiry})
             pipe.execute()
 
             return True
@@ -185,6 +476,93 @@ class RedisQueue:
             print(f"Redis error moving to processing: {e}")
             return False
 
+    def extend_leases(
+        self, notification_ids: list[int], lease_seconds: float | None = None
+    ) -> int:
+        """
+        Push back the lease expiry of jobs still being processed.
+
+        Only jobs still in the processing queue are touched (ZADD XX), so a
+        job already reaped, completed or retried is not re-leased.
+
+        Args:
+            notification_ids: IDs of the claimed notifications
+            lease_seconds: New lease length from now (default: LEASE_TIMEOUT)
+
+        Returns:
+            Number of leases extended
+        """
+        if not notification_ids:
+            return 0
+        try:
+            lease_expiry = time.time() + (lease_seconds or self.LEASE_TIMEOUT)
+            return self.redis_client.zadd(
+                self.NOTIFICATION_PROCESSING,
+                {self._get_job_key(i): lease_expiry for i in notification_ids},
+                xx=True,
+                ch=True,
+            )
+        except redis.RedisError as e:
+            print(f"Redis error extending leases: {e}")
+            return 0
+
+    def reap_expired_leases(self, limit: int = 1000) -> dict:
+        """
+        Return jobs whose lease expired (crashed or stalled worker) to the
+        scheduled queue, due immediately.
+
+        An expired lease counts as a failed attempt: retry_count is bumped
+        and jobs that reach max_retries go to the dead letter queue, so a
+        job that kills its worker every time is not retried forever.
+        Runs as a single server-side script, so concurrent reapers never
+        move the same job twice. Safe to call from every worker.
+
+        Args:
+            limit: Maximum number of jobs to reap in one call
+
+        Returns:
+            {"requeued": count, "dead_letter": count}
+        """
+        try:
+            requeued, dead_lettered = self._reap_expired_leases(
+                keys=[
+                    self.NOTIFICATION_PROCESSING,
+                    self.NOTIFICATION_QUEUE,
+                    self.NOTIFICATION_WAKEUP,
+                    self.NOTIFICATION_DEAD_LETTER,
+                ],
+                args=[time.time(), limit, self.DEFAULT_MAX_RETRIES],
+            )
+            return {"requeued": requeued, "dead_letter": dead_lettered}
+        except redis.RedisError as e:
+            print(f"Redis error reaping expired leases: {e}")
+            return {"requeued": 0, "dead_letter": 0}
+
+    def release_job(self, notification_id: int) -> bool:
+        """
+        Return a claimed job to the scheduled queue, due immediately.
+
+        Used when a worker stops before processing everything it claimed.
+
+        Args:
+            notification_id: ID of the notification
+
+        Returns:
+            True if released successfully
+        """
+        try:
+            job_key = self._get_job_key(notification_id)
+
+            pipe = self.redis_client.pipeline()
+            pipe.zrem(self.NOTIFICATION_PROCESSING, job_key)
+            pipe.zadd(self.NOTIFICATION_QUEUE, {job_key: time.time()})
+            pipe.execute()
+
+            return True
+        except redis.RedisError as e:
+            print(f"Redis error releasing job: {e}")
+            return False
+
     def complete_job(self, notification_id: int) -> bool:
         """
         Mark a job as completed and remove from queues.
@@ -208,6 +586,31 @@ class RedisQueue:
             print(f"Redis error completing job: {e}")
             return False
 
+    def complete_jobs(self, notification_ids: list[int]) -> bool:
+        """
+        Mark several jobs as completed in one round trip.
+
+        Args:
+            notification_ids: IDs of the notifications
+
+        Returns:
+            True if completed successfully
+        """
+        if not notification_ids:
+            return True
+        try:
+            job_keys = [self._get_job_key(i) for i in notification_ids]
+
+            pipe = self.redis_client.pipeline()
+            pipe.zrem(self.NOTIFICATION_PROCESSING, *job_keys)
+            pipe.delete(*[f"job:{job_key}" for job_key in job_keys])
+            pipe.execute()
+
+            return True
+        except redis.RedisError as e:
+            print(f"Redis error completing jobs: {e}")
+            return False
+
     def retry_job(self, notification_id: int, delay_seconds: int = 60) -> bool:
         """
         Reschedule a failed job for retry.
@@ -231,7 +634,7 @@ class RedisQueue:
             job["retry_count"] = job.get("retry_count", 0) + 1
 
             # Check max retries
-            if job["retry_count"] >= job.get("max_retries", 3):
+            if job["retry_count"] >= job.get("max_retries", self.DEFAULT_MAX_RETRIES):
                 return self.move_to_dead_letter(notification_id)
 
             # Reschedule
@@ -304,8 +707,11 @@ class RedisQueue:
             return False
 
     def close(self):
-        """Close Redis connection"""
+        """Close Redis connection (a shared client is left to its owner)"""
         try:
-            self.redis_client.close()
+            if self._owns_client:
+                self.redis_client.close()
+            if self._wakeup_client is not None:
+                self._wakeup_client.close()
         except Exception:
             pass
@@ -175,7 +175,6 @@ export type CreateBookmarkRequest = {
   short_review?: string | null;
   status?: BookmarkStatus;
   public?: boolean;
-  cover_image?: string | null;
   tag_ids?: number[];
 };
 
@@ -196,7 +195,6 @@ export type UpdateBookmarkRequest = {
   short_review?: string | null;
   status?: BookmarkStatus;
   public?: boolean;
-  cover_image?: string | null;
   tag_ids?: number[];
 };
 